@@ -5,14 +5,23 @@ Upper-Envelope Scan for Solving Dynamic Optimization Problems',
 https://dx.doi.org/10.2139/ssrn.4181302
 
 """
+from functools import partial
 from typing import Callable
 from typing import Optional
 from typing import Tuple
 
-import jax.numpy as jnp  # noqa: F401
+import jax.numpy as jnp
 import numpy as np
-from jax import jit  # noqa: F401
+from dcegm.ragged_array import RaggedArray
+from jax import jit
+from jax import lax
 from numba import njit
+from numba import prange
+
+# Width of the per-row buffers holding the refined arrays during the parallel
+# scan, relative to the size of the wealth grid. Rows with more refined points are
+# scanned again and written directly to the output.
+REFINED_BUFFER_SIZE_FACTOR = 1.1
 
 
 def fast_upper_envelope_wrapper(
@@ -121,6 +130,187 @@ def fast_upper_envelope_wrapper(
     )
 
 
+def fast_upper_envelope_wrapper_batch(
+    endog_grid: np.ndarray,
+    policy: np.ndarray,
+    value: np.ndarray,
+    expected_value_zero_savings: np.ndarray,
+    choices: np.ndarray,
+    exog_grid: np.ndarray,
+    compute_value: Callable,
+) -> Tuple[RaggedArray, RaggedArray, RaggedArray]:
+    """Run the upper envelope for all state-choice combinations of a period.
+
+    The candidate arrays of the whole period are transferred to the host once.
+    Grid augmentation to the left of the first grid point is computed for all
+    state-choice combinations in a single call of ``compute_value``. Combinations
+    that do not need to be augmented are padded with missing values, which are
+    dropped inside the fast upper envelope scan. The scan itself runs as a compiled
+    kernel in parallel over all state-choice combinations. The refined arrays are
+    stored back to back without padding. There is no upper limit on the number of
+    points a refined array can have.
+
+    Args:
+        endog_grid (np.ndarray): 2d array of shape (n_state_choices, n_grid_wealth)
+            containing the candidate endogenous grids of the current period.
+        policy (np.ndarray): 2d array of shape (n_state_choices, n_grid_wealth)
+            containing the candidate policy functions of the current period.
+        value (np.ndarray): 2d array of shape (n_state_choices, n_grid_wealth)
+            containing the candidate value functions of the current period.
+        expected_value_zero_savings (np.ndarray): 1d array of shape
+            (n_state_choices,) containing the expected value given zero savings.
+        choices (np.ndarray): 1d array of shape (n_state_choices,) containing the
+            current choice of each state-choice combination.
+        exog_grid (np.ndarray): 1d array of shape (n_grid_wealth,) of the
+            exogenous savings grid.
+        compute_value (callable): Function to compute the agent's value.
+
+    Returns:
+        tuple:
+
+        - endog_grid_refined (RaggedArray): Ragged array with one row per
+            state-choice combination containing the refined endogenous grid.
+        - policy_refined (RaggedArray): Ragged array with one row per state-choice
+            combination containing the refined policy function.
+        - value_refined (RaggedArray): Ragged array with one row per state-choice
+            combination containing the refined value function.
+
+    """
+    n_cols_buffer = int(REFINED_BUFFER_SIZE_FACTOR * np.shape(endog_grid)[1])
+
+    (
+        endog_grid_augmented,
+        policy_augmented,
+        value_augmented,
+        exog_grid_augmented,
+    ) = _augment_grids_batch(
+        endog_grid=np.asarray(endog_grid),
+        policy=np.asarray(policy),
+        value=np.asarray(value),
+        expected_value_zero_savings=np.asarray(expected_value_zero_savings),
+        choices=np.asarray(choices),
+        exog_grid=np.asarray(exog_grid),
+        compute_value=compute_value,
+    )
+
+    (
+        endog_grid_refined,
+        value_refined,
+        policy_refined,
+        offsets,
+        n_refined,
+    ) = _fast_upper_envelope_batch_kernel(
+        endog_grid=endog_grid_augmented,
+        value=value_augmented,
+        policy=policy_augmented,
+        exog_grid=exog_grid_augmented,
+        jump_thresh=2,
+        lower_bound_wealth=1e-10,
+        n_points_to_scan=10,
+        n_cols_buffer=n_cols_buffer,
+    )
+
+    return tuple(
+        RaggedArray(data=data, offsets=offsets, lengths=n_refined)
+        for data in (endog_grid_refined, policy_refined, value_refined)
+    )
+
+
+def fast_upper_envelope_wrapper_jax(
+    endog_grid: jnp.ndarray,
+    policy: jnp.ndarray,
+    value: jnp.ndarray,
+    expected_value_zero_savings: float,
+    choice: int,
+    exog_grid: jnp.ndarray,
+    compute_value: Callable,
+    n_refined_max: Optional[int] = None,
+) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+    """Drop suboptimal points and refine the endogenous grid, policy, and value.
+
+    Pure JAX counterpart of :func:`fast_upper_envelope_wrapper`. All intermediate
+    arrays have a fixed shape, such that the function can be traced inside
+    ``jax.jit`` and mapped over state-choice combinations with ``jax.vmap``.
+    The ancillary grid points to the left of the first grid point are always
+    computed and set to missing values if no augmentation is needed.
+
+    Args:
+        endog_grid (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the current state- and choice-specific endogenous grid.
+        policy (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the current state- and choice-specific policy function.
+        value (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the current state- and choice-specific value function.
+        expected_value_zero_savings (float): The agent's expected value given that she
+            saves zero.
+        choice (int): The current choice.
+        exog_grid (jnp.ndarray): 1d array of shape (n_grid_wealth,) of the
+            exogenous savings grid.
+        compute_value (callable): Function to compute the agent's value.
+        n_refined_max (int): Length of the refined arrays. Defaults to three times
+            the number of candidate points including the ancillary points, which
+            is the upper bound of the number of refined points, as in
+            :func:`scan_value_function`.
+
+    Returns:
+        tuple:
+
+        - endog_grid_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined state- and choice-specific endogenous grid,
+            padded with missing values.
+        - policy_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined state- and choice-specific consumption policy,
+            padded with missing values.
+        - value_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined state- and choice-specific value function,
+            padded with missing values.
+        - n_refined (jnp.ndarray): Number of points of the refined arrays. If it
+            exceeds ``n_refined_max``, the points beyond are dropped.
+
+    """
+    n_grid_wealth = exog_grid.shape[0]
+    n_grid_to_add = n_grid_wealth // 10 - 1
+
+    min_wealth_grid = jnp.min(endog_grid)
+    is_augmented = endog_grid[0] > min_wealth_grid
+
+    grid_points_to_add = jnp.linspace(
+        min_wealth_grid, endog_grid[0], n_grid_wealth // 10
+    )[:-1]
+    values_to_add = compute_value(
+        grid_points_to_add,
+        expected_value_zero_savings,
+        choice,
+    )
+    values_to_add = jnp.where(is_augmented, values_to_add, jnp.nan)
+
+    endog_grid = jnp.concatenate([jnp.zeros(1), grid_points_to_add, endog_grid])
+    policy = jnp.concatenate([jnp.zeros(1), grid_points_to_add, policy])
+    value = jnp.concatenate(
+        [jnp.atleast_1d(expected_value_zero_savings), values_to_add, value]
+    )
+    exog_grid = jnp.concatenate([jnp.zeros(n_grid_to_add + 1), exog_grid])
+
+    if n_refined_max is None:
+        n_refined_max = 3 * endog_grid.shape[0]
+
+    (
+        endog_grid_refined,
+        value_refined,
+        policy_refined,
+        n_refined,
+    ) = fast_upper_envelope_jax(
+        endog_grid,
+        value,
+        policy,
+        exog_grid,
+        jump_thresh=2,
+        n_refined_max=n_refined_max,
+    )
+
+    return endog_grid_refined, policy_refined, value_refined, n_refined
+
+
 def fast_upper_envelope(
     endog_grid: np.ndarray,
     value: np.ndarray,
@@ -157,24 +347,232 @@ def fast_upper_envelope(
             the optimal points are kept.
 
     """
+    return _fast_upper_envelope_kernel(
+        endog_grid=endog_grid,
+        value=value,
+        policy=policy,
+        exog_grid=exog_grid,
+        jump_thresh=jump_thresh,
+        lower_bound_wealth=lower_bound_wealth,
+        n_points_to_scan=10,
+    )
+
+
+@partial(jit, static_argnames=("n_points_to_scan", "n_refined_max"))
+def fast_upper_envelope_jax(
+    endog_grid: jnp.ndarray,
+    value: jnp.ndarray,
+    policy: jnp.ndarray,
+    exog_grid: jnp.ndarray,
+    jump_thresh: Optional[float] = 2,
+    lower_bound_wealth: Optional[float] = 1e-10,
+    n_points_to_scan: Optional[int] = 10,
+    n_refined_max: Optional[int] = None,
+) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+    """Remove suboptimal points with a fixed-shape JAX implementation of the scan.
+
+    Instead of dropping missing values, they are sorted to the end of the arrays
+    and the scan stops at the last valid point. The refined arrays are padded with
+    missing values.
+
+    Args:
+        endog_grid (jnp.ndarray): 1d array containing the unrefined endogenous wealth
+            grid of shape (n_candidates,).
+        value (jnp.ndarray): 1d array containing the unrefined value correspondence
+            of shape (n_candidates,).
+        policy (jnp.ndarray): 1d array containing the unrefined policy correspondence
+            of shape (n_candidates,).
+        exog_grid (jnp.ndarray): 1d array containing the exogenous wealth grid
+            of shape (n_candidates,).
+        jump_thresh (float): Jump detection threshold.
+        lower_bound_wealth (float): Lower bound on wealth.
+        n_points_to_scan (int): Number of points to scan for suboptimal points.
+        n_refined_max (int): Length of the refined arrays. Defaults to
+            n_candidates. Points beyond this length are dropped.
+
+    Returns:
+        tuple:
+
+        - endog_grid_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined endogenous wealth grid, padded with missing
+            values.
+        - value_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined value function, padded with missing values.
+        - policy_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined policy function, padded with missing values.
+        - n_refined (jnp.ndarray): Number of points of the refined arrays,
+            including the points beyond ``n_refined_max`` that were dropped.
+
+    """
+    if n_refined_max is None:
+        n_refined_max = endog_grid.shape[0]
+
+    mask = endog_grid <= lower_bound_wealth
+    max_value_lower_bound = jnp.nanmax(jnp.where(mask, value, -jnp.inf))
+    value = jnp.where(mask & (value < max_value_lower_bound), jnp.nan, value)
+
+    # Sort missing values to the end. As jnp.argsort is stable, the order of the
+    # valid points is the same as in the mergesort of the numba implementation.
+    is_valid = ~jnp.isnan(value)
+    n_valid = jnp.sum(is_valid)
+    idx_sort = jnp.argsort(jnp.where(is_valid, endog_grid, jnp.inf))
+    value = jnp.take(value, idx_sort)
+    policy = jnp.take(policy, idx_sort)
+    exog_grid = jnp.take(exog_grid, idx_sort)
+    endog_grid = jnp.take(endog_grid, idx_sort)
+
+    return _scan_value_function_jax(
+        endog_grid=endog_grid,
+        value=value,
+        policy=policy,
+        exog_grid=exog_grid,
+        n_valid=n_valid,
+        jump_thresh=jump_thresh,
+        n_points_to_scan=n_points_to_scan,
+        n_refined_max=n_refined_max,
+    )
+
+
+@njit(parallel=True, nogil=True)
+def _fast_upper_envelope_batch_kernel(
+    endog_grid: np.ndarray,
+    value: np.ndarray,
+    policy: np.ndarray,
+    exog_grid: np.ndarray,
+    jump_thresh: float,
+    lower_bound_wealth: float,
+    n_points_to_scan: int,
+    n_cols_buffer: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Run the fast upper envelope scan on many rows in parallel.
+
+    Each row is refined independently, hence the rows are distributed across
+    cores. In a first pass, the refined arrays are written to buffers with
+    ``n_cols_buffer`` columns and the number of refined points of each row is
+    counted. In a second pass, the rows are copied back to back into output arrays
+    of exactly the total number of refined points. Rows that do not fit into the
+    buffers are scanned again in the second pass and written to the output
+    directly.
+
+    Args:
+        endog_grid (np.ndarray): 2d array of shape (n_rows, n_candidates)
+            containing the unrefined endogenous wealth grids.
+        value (np.ndarray): 2d array of shape (n_rows, n_candidates) containing
+            the unrefined value correspondences.
+        policy (np.ndarray): 2d array of shape (n_rows, n_candidates) containing
+            the unrefined policy correspondences.
+        exog_grid (np.ndarray): 1d array of shape (n_candidates,) containing the
+            exogenous wealth grid.
+        jump_thresh (float): Jump detection threshold.
+        lower_bound_wealth (float): Lower bound on wealth.
+        n_points_to_scan (int): Number of points to scan for suboptimal points.
+        n_cols_buffer (int): Number of columns of the buffers of the first pass.
+
+    Returns:
+        tuple:
+
+        - endog_grid_refined (np.ndarray): 1d array of shape (sum(n_refined),)
+            containing the refined endogenous grids of all rows.
+        - value_refined (np.ndarray): 1d array of shape (sum(n_refined),)
+            containing the refined value functions of all rows.
+        - policy_refined (np.ndarray): 1d array of shape (sum(n_refined),)
+            containing the refined policy functions of all rows.
+        - offsets (np.ndarray): 1d array of shape (n_rows,) containing the position
+            of the first refined point of each row.
+        - n_refined (np.ndarray): 1d array of shape (n_rows,) containing the number
+            of points of each refined array.
+
+    """
+    n_rows = endog_grid.shape[0]
+    endog_grid_buffer = np.empty((n_rows, n_cols_buffer))
+    value_buffer = np.empty((n_rows, n_cols_buffer))
+    policy_buffer = np.empty((n_rows, n_cols_buffer))
+    n_refined = np.zeros(n_rows, dtype=np.int64)
+
+    for row in prange(n_rows):
+        endog_grid_row, value_row, policy_row = _fast_upper_envelope_kernel(
+            endog_grid=endog_grid[row],
+            value=value[row],
+            policy=policy[row],
+            exog_grid=exog_grid,
+            jump_thresh=jump_thresh,
+            lower_bound_wealth=lower_bound_wealth,
+            n_points_to_scan=n_points_to_scan,
+        )
+        n_refined[row] = len(endog_grid_row)
+
+        if n_refined[row] <= n_cols_buffer:
+            endog_grid_buffer[row, : n_refined[row]] = endog_grid_row
+            value_buffer[row, : n_refined[row]] = value_row
+            policy_buffer[row, : n_refined[row]] = policy_row
+
+    offsets = np.cumsum(n_refined) - n_refined
+    endog_grid_refined = np.empty(n_refined.sum())
+    value_refined = np.empty(n_refined.sum())
+    policy_refined = np.empty(n_refined.sum())
+
+    for row in prange(n_rows):
+        start = offsets[row]
+        stop = start + n_refined[row]
+
+        if n_refined[row] <= n_cols_buffer:
+            endog_grid_refined[start:stop] = endog_grid_buffer[row, : n_refined[row]]
+            value_refined[start:stop] = value_buffer[row, : n_refined[row]]
+            policy_refined[start:stop] = policy_buffer[row, : n_refined[row]]
+        else:
+            endog_grid_row, value_row, policy_row = _fast_upper_envelope_kernel(
+                endog_grid=endog_grid[row],
+                value=value[row],
+                policy=policy[row],
+                exog_grid=exog_grid,
+                jump_thresh=jump_thresh,
+                lower_bound_wealth=lower_bound_wealth,
+                n_points_to_scan=n_points_to_scan,
+            )
+            endog_grid_refined[start:stop] = endog_grid_row
+            value_refined[start:stop] = value_row
+            policy_refined[start:stop] = policy_row
+
+    return endog_grid_refined, value_refined, policy_refined, offsets, n_refined
+
+
+@njit(nogil=True)
+def _fast_upper_envelope_kernel(
+    endog_grid: np.ndarray,
+    value: np.ndarray,
+    policy: np.ndarray,
+    exog_grid: np.ndarray,
+    jump_thresh: float,
+    lower_bound_wealth: float,
+    n_points_to_scan: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sort, filter, scan, and compact a single value correspondence.
+
+    See :func:`fast_upper_envelope` for a description of the arguments and
+    return values.
+
+    """
+    value = value.copy()
+
     # TODO: determine locations where endogenous grid points are # noqa: T000
     # equal to the lower bound
     mask = endog_grid <= lower_bound_wealth
     if np.any(mask):
         max_value_lower_bound = np.nanmax(value[mask])
-        mask &= value < max_value_lower_bound
+        mask = mask & (value < max_value_lower_bound)
         value[mask] = np.nan
 
-    endog_grid = endog_grid[np.where(~np.isnan(value))[0]]
-    policy = policy[np.where(~np.isnan(value))]
-    exog_grid = exog_grid[np.where(~np.isnan(value))]
-    value = value[np.where(~np.isnan(value))]
+    not_nan = ~np.isnan(value)
+    endog_grid = endog_grid[not_nan]
+    policy = policy[not_nan]
+    exog_grid = exog_grid[not_nan]
+    value = value[not_nan]
 
     idx_sort = np.argsort(endog_grid, kind="mergesort")
-    value = np.take(value, idx_sort)
-    policy = np.take(policy, idx_sort)
-    exog_grid = np.take(exog_grid, idx_sort)
-    endog_grid = np.take(endog_grid, idx_sort)
+    value = value[idx_sort]
+    policy = policy[idx_sort]
+    exog_grid = exog_grid[idx_sort]
+    endog_grid = endog_grid[idx_sort]
 
     (
         value_clean_with_nans,
@@ -186,7 +584,7 @@ def fast_upper_envelope(
         policy=policy,
         exog_grid=exog_grid,
         jump_thresh=jump_thresh,
-        n_points_to_scan=10,
+        n_points_to_scan=n_points_to_scan,
     )
 
     endog_grid_refined = endog_grid_clean_with_nans[
@@ -198,6 +596,7 @@ def fast_upper_envelope(
     return endog_grid_refined, value_refined, policy_refined
 
 
+@njit(nogil=True)
 def scan_value_function(
     endog_grid: np.ndarray,
     value: np.ndarray,
@@ -228,9 +627,11 @@ def scan_value_function(
             the optimal points are kept.
 
     """
+    # Each scanned point adds at most three points to the refined arrays
+    n_refined_max = 3 * len(endog_grid)
 
     value_refined, policy_refined, endog_grid_refined = _initialize_refined_arrays(
-        value, policy, endog_grid
+        value, policy, endog_grid, n_refined_max
     )
 
     suboptimal_points = np.zeros(n_points_to_scan, dtype=np.int64)
@@ -723,6 +1124,344 @@ def _append_index(x_array: np.ndarray, m: int):
     return x_array
 
 
+def _scan_value_function_jax(
+    endog_grid: jnp.ndarray,
+    value: jnp.ndarray,
+    policy: jnp.ndarray,
+    exog_grid: jnp.ndarray,
+    n_valid: int,
+    jump_thresh: float,
+    n_points_to_scan: int,
+    n_refined_max: int,
+) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+    """Scan the value function with a fixed-shape loop.
+
+    Mirrors :func:`scan_value_function`. The branches of the scan are evaluated
+    for every point and the outcome is selected according to the case the point
+    falls into:
+
+    (0) the point is suboptimal and added to the suboptimal points.
+    (1) the point is kept and lies on a new segment, i.e. the intersection of the
+        current and the new segment is added to the left of the point.
+    (2) the point is kept and the current point is replaced by the intersection
+        of the current and the new segment.
+    (3) the point is kept without adding an intersection.
+
+    Args:
+        endog_grid (jnp.ndarray): 1d array of shape (n_candidates,) containing the
+            sorted endogenous wealth grid. Missing points are at the end.
+        value (jnp.ndarray): 1d array of shape (n_candidates,) containing the
+            sorted value correspondence.
+        policy (jnp.ndarray): 1d array of shape (n_candidates,) containing the
+            sorted policy correspondence.
+        exog_grid (jnp.ndarray): 1d array of shape (n_candidates,) containing the
+            sorted exogenous wealth grid.
+        n_valid (int): Number of non-missing points.
+        jump_thresh (float): Jump detection threshold.
+        n_points_to_scan (int): Number of points to scan for suboptimal points.
+        n_refined_max (int): Length of the refined arrays.
+
+    Returns:
+        tuple:
+
+        - endog_grid_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined endogenous wealth grid.
+        - value_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined value function.
+        - policy_refined (jnp.ndarray): 1d array of shape (n_refined_max,)
+            containing the refined policy function.
+        - n_refined (jnp.ndarray): Number of points of the refined arrays.
+
+    """
+    idx_max = n_valid - 1
+
+    refined = jnp.full((3, n_refined_max), jnp.nan)
+    refined = refined.at[:, :2].set(jnp.stack([endog_grid, value, policy])[:, :2])
+
+    def scan_point(i, carry):
+        endog_grid, value, policy, refined, suboptimal_points, j, k, idx_refined = carry
+        idx_next = i + 1
+
+        grad_before = (value[j] - value[k]) / (endog_grid[j] - endog_grid[k])
+        grad_next = (value[idx_next] - value[j]) / (
+            endog_grid[idx_next] - endog_grid[j]
+        )
+        switch_value_func = (
+            jnp.abs(
+                (exog_grid[idx_next] - exog_grid[j])
+                / (endog_grid[idx_next] - endog_grid[j])
+            )
+            > jump_thresh
+        )
+
+        (
+            grad_next_forward,
+            idx_next_on_lower_curve,
+            found_next_point_on_same_value,
+        ) = _forward_scan_jax(
+            value=value,
+            endog_grid=endog_grid,
+            exog_grid=exog_grid,
+            jump_thresh=jump_thresh,
+            idx_current=j,
+            idx_next=idx_next,
+            idx_max=idx_max,
+            n_points_to_scan=n_points_to_scan,
+        )
+        grad_next_backward, sub_idx_point_before_on_same_value = _backward_scan_jax(
+            value=value,
+            endog_grid=endog_grid,
+            exog_grid=exog_grid,
+            suboptimal_points=suboptimal_points,
+            jump_thresh=jump_thresh,
+            idx_current=j,
+            idx_next=idx_next,
+        )
+        idx_before_on_upper_curve = suboptimal_points[
+            sub_idx_point_before_on_same_value
+        ]
+
+        right_turn = grad_before > grad_next
+        is_decreasing = value[idx_next] - value[j] < 0
+        keep_next = found_next_point_on_same_value & (grad_next > grad_next_forward)
+        keep_current = ~(
+            (grad_before < grad_next)
+            & (grad_next >= grad_next_backward)
+            & switch_value_func
+        )
+
+        is_suboptimal = (
+            is_decreasing
+            | (right_turn & (exog_grid[idx_next] - exog_grid[j] < 0))
+            | (right_turn & switch_value_func & ~keep_next)
+            | (~right_turn & switch_value_func & (grad_next_forward > grad_next))
+        )
+        is_jump_to_new_segment = right_turn & switch_value_func & keep_next
+        case = jnp.where(
+            is_suboptimal,
+            0,
+            jnp.where(
+                is_jump_to_new_segment,
+                1,
+                jnp.where(keep_current, 3, 2),
+            ),
+        )
+        add_intersection = (case == 1) | (
+            (case == 3) & (grad_next > grad_before) & switch_value_func
+        )
+        overwrite_last_refined = (case == 2) & (idx_before_on_upper_curve > 0) & (i > 1)
+
+        # Intersection of the segment the current point lies on and the new segment
+        # of the next point
+        intersect_grid_new, intersect_value_new = _linear_intersection.py_func(
+            x1=endog_grid[idx_next_on_lower_curve],
+            y1=value[idx_next_on_lower_curve],
+            x2=endog_grid[j],
+            y2=value[j],
+            x3=endog_grid[idx_next],
+            y3=value[idx_next],
+            x4=endog_grid[idx_before_on_upper_curve],
+            y4=value[idx_before_on_upper_curve],
+        )
+        intersect_policy_left_new = _evaluate_point_on_line.py_func(
+            x1=endog_grid[idx_next_on_lower_curve],
+            y1=policy[idx_next_on_lower_curve],
+            x2=endog_grid[j],
+            y2=policy[j],
+            point_to_evaluate=intersect_grid_new,
+        )
+
+        # Intersection of the segment through the current and the previous optimal
+        # point and the new segment of the next point
+        intersect_grid_current, intersect_value_current = _linear_intersection.py_func(
+            x1=endog_grid[j],
+            y1=value[j],
+            x2=endog_grid[k],
+            y2=value[k],
+            x3=endog_grid[idx_next],
+            y3=value[idx_next],
+            x4=endog_grid[idx_before_on_upper_curve],
+            y4=value[idx_before_on_upper_curve],
+        )
+        intersect_policy_left_current = _evaluate_point_on_line.py_func(
+            x1=endog_grid[k],
+            y1=policy[k],
+            x2=endog_grid[j],
+            y2=policy[j],
+            point_to_evaluate=intersect_grid_current,
+        )
+
+        intersect_grid = jnp.where(
+            case == 2, intersect_grid_current, intersect_grid_new
+        )
+        intersect_value = jnp.where(
+            case == 2, intersect_value_current, intersect_value_new
+        )
+        intersect_policy_left = jnp.where(
+            case == 2, intersect_policy_left_current, intersect_policy_left_new
+        )
+        intersect_policy_right = _evaluate_point_on_line.py_func(
+            x1=endog_grid[idx_next],
+            y1=policy[idx_next],
+            x2=endog_grid[idx_before_on_upper_curve],
+            y2=policy[idx_before_on_upper_curve],
+            point_to_evaluate=intersect_grid,
+        )
+
+        # Write the two intersection points (if any) and the next point
+        point_next = jnp.array(
+            [endog_grid[idx_next], value[idx_next], policy[idx_next]]
+        )
+        points_to_write = jnp.stack(
+            [
+                jnp.array([intersect_grid, intersect_value, intersect_policy_left]),
+                jnp.array([intersect_grid, intersect_value, intersect_policy_right]),
+                point_next,
+            ],
+            axis=1,
+        )
+        has_intersection = add_intersection | overwrite_last_refined
+        n_points_to_write = jnp.where(case == 0, 0, jnp.where(has_intersection, 3, 1))
+        idx_first_point = jnp.where(has_intersection, 0, 2)
+        idx_start = idx_refined - overwrite_last_refined
+
+        positions = idx_start + jnp.arange(3)
+        is_written = jnp.arange(3) < n_points_to_write
+        points_to_write = jnp.roll(points_to_write, -idx_first_point, axis=1)
+        refined = refined.at[:, positions].set(
+            jnp.where(
+                is_written,
+                points_to_write,
+                refined[:, positions.clip(max=n_refined_max - 1)],
+            ),
+            mode="drop",
+        )
+        idx_refined = idx_start + n_points_to_write
+
+        # Replace the current point by the intersection
+        is_current_replaced = case == 2
+        value = value.at[j].set(
+            jnp.where(is_current_replaced, intersect_value, value[j])
+        )
+        policy = policy.at[j].set(
+            jnp.where(is_current_replaced, intersect_policy_right, policy[j])
+        )
+        endog_grid = endog_grid.at[j].set(
+            jnp.where(is_current_replaced, intersect_grid, endog_grid[j])
+        )
+
+        suboptimal_points = jnp.where(
+            case == 0,
+            jnp.append(suboptimal_points[1:], idx_next),
+            suboptimal_points,
+        )
+        k = jnp.where((case == 1) | (case == 3), j, k)
+        j = jnp.where(case == 0, j, idx_next)
+
+        return endog_grid, value, policy, refined, suboptimal_points, j, k, idx_refined
+
+    carry = (
+        endog_grid,
+        value,
+        policy,
+        refined,
+        jnp.zeros(n_points_to_scan, dtype=int),
+        1,
+        0,
+        2,
+    )
+    endog_grid, value, policy, refined, _, _, _, idx_refined = lax.fori_loop(
+        1, n_valid - 2, scan_point, carry
+    )
+
+    point_last = jnp.array([endog_grid[idx_max], value[idx_max], policy[idx_max]])
+    refined = refined.at[:, idx_refined].set(point_last, mode="drop")
+    refined = jnp.where(jnp.arange(n_refined_max) <= idx_refined, refined, jnp.nan)
+
+    return refined[0], refined[1], refined[2], idx_refined + 1
+
+
+def _forward_scan_jax(
+    value: jnp.ndarray,
+    endog_grid: jnp.ndarray,
+    exog_grid: jnp.ndarray,
+    jump_thresh: float,
+    idx_current: int,
+    idx_next: int,
+    idx_max: int,
+    n_points_to_scan: int,
+) -> Tuple[float, int, bool]:
+    """Scan forward to check whether next point is optimal.
+
+    Vectorized counterpart of :func:`_forward_scan`. The first of the next
+    ``n_points_to_scan`` points which lies on the same value function as the
+    current point is selected.
+
+    """
+    idx_to_check = jnp.minimum(idx_next + jnp.arange(1, n_points_to_scan + 1), idx_max)
+
+    is_on_same_value = (endog_grid[idx_current] < endog_grid[idx_to_check]) & (
+        jnp.abs(
+            (exog_grid[idx_current] - exog_grid[idx_to_check])
+            / (endog_grid[idx_current] - endog_grid[idx_to_check])
+        )
+        < jump_thresh
+    )
+    is_next_on_same_value = jnp.any(is_on_same_value)
+    idx_on_same_value = jnp.where(
+        is_next_on_same_value, idx_to_check[jnp.argmax(is_on_same_value)], 0
+    )
+    grad_next_on_same_value = jnp.where(
+        is_next_on_same_value,
+        (value[idx_next] - value[idx_on_same_value])
+        / (endog_grid[idx_next] - endog_grid[idx_on_same_value]),
+        0,
+    )
+
+    return grad_next_on_same_value, idx_on_same_value, is_next_on_same_value
+
+
+def _backward_scan_jax(
+    value: jnp.ndarray,
+    endog_grid: jnp.ndarray,
+    exog_grid: jnp.ndarray,
+    suboptimal_points: jnp.ndarray,
+    jump_thresh: float,
+    idx_current: int,
+    idx_next: int,
+) -> Tuple[float, int]:
+    """Scan backward to check whether current point is optimal.
+
+    Vectorized counterpart of :func:`_backward_scan`. The most recent suboptimal
+    point which lies on the same value function as the next point is selected.
+
+    """
+    n_points = suboptimal_points.shape[0]
+
+    is_on_same_value = (endog_grid[idx_current] > endog_grid[suboptimal_points]) & (
+        jnp.abs(
+            (exog_grid[idx_next] - exog_grid[suboptimal_points])
+            / (endog_grid[idx_next] - endog_grid[suboptimal_points])
+        )
+        < jump_thresh
+    )
+    is_before_on_same_value = jnp.any(is_on_same_value)
+    sub_idx_point_before_on_same_value = jnp.where(
+        is_before_on_same_value,
+        n_points - 1 - jnp.argmax(is_on_same_value[::-1]),
+        0,
+    )
+    idx_before = suboptimal_points[sub_idx_point_before_on_same_value]
+    grad_before_on_same_value = jnp.where(
+        is_before_on_same_value,
+        (value[idx_current] - value[idx_before])
+        / (endog_grid[idx_current] - endog_grid[idx_before]),
+        0,
+    )
+
+    return grad_before_on_same_value, sub_idx_point_before_on_same_value
+
+
 def _augment_grids(
     endog_grid: np.ndarray,
     value: np.ndarray,
@@ -786,16 +1525,107 @@ def _augment_grids(
     return grid_augmented, value_augmented, policy_augmented
 
 
+def _augment_grids_batch(
+    endog_grid: np.ndarray,
+    policy: np.ndarray,
+    value: np.ndarray,
+    expected_value_zero_savings: np.ndarray,
+    choices: np.ndarray,
+    exog_grid: np.ndarray,
+    compute_value: Callable,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Augment the candidate grids of all state-choice combinations of a period.
+
+    All rows are brought to the common length (1 + n_grid_wealth // 10 - 1 +
+    n_grid_wealth) and the point of zero savings is prepended. For rows whose
+    non-concave region coincides with the credit constraint, the ancillary points
+    to the left of the first grid point are added as in :func:`_augment_grids`.
+    All other rows are padded with missing values at these positions.
+
+    Args:
+        endog_grid (np.ndarray): 2d array of shape (n_state_choices, n_grid_wealth)
+            containing the candidate endogenous grids.
+        policy (np.ndarray): 2d array of shape (n_state_choices, n_grid_wealth)
+            containing the candidate policy functions.
+        value (np.ndarray): 2d array of shape (n_state_choices, n_grid_wealth)
+            containing the candidate value functions.
+        expected_value_zero_savings (np.ndarray): 1d array of shape
+            (n_state_choices,) containing the expected value given zero savings.
+        choices (np.ndarray): 1d array of shape (n_state_choices,) containing the
+            current choices.
+        exog_grid (np.ndarray): 1d array of shape (n_grid_wealth,) of the
+            exogenous savings grid.
+        compute_value (callable): Function to compute the agent's value.
+
+    Returns:
+        tuple:
+
+        - endog_grid_augmented (np.ndarray): 2d array of shape
+            (n_state_choices, n_candidates) containing the augmented endogenous
+            grids.
+        - policy_augmented (np.ndarray): 2d array of shape
+            (n_state_choices, n_candidates) containing the augmented policy
+            functions.
+        - value_augmented (np.ndarray): 2d array of shape
+            (n_state_choices, n_candidates) containing the augmented value
+            functions. Padded positions are set to missing values.
+        - exog_grid_augmented (np.ndarray): 1d array of shape (n_candidates,)
+            containing the exogenous grid belonging to each candidate.
+
+    """
+    n_state_choices, n_grid_wealth = endog_grid.shape
+    n_grid_to_add = n_grid_wealth // 10 - 1
+    n_candidates = 1 + n_grid_to_add + n_grid_wealth
+
+    endog_grid_augmented = np.full((n_state_choices, n_candidates), np.nan)
+    policy_augmented = np.full((n_state_choices, n_candidates), np.nan)
+    value_augmented = np.full((n_state_choices, n_candidates), np.nan)
+
+    endog_grid_augmented[:, 0] = 0
+    policy_augmented[:, 0] = 0
+    value_augmented[:, 0] = expected_value_zero_savings
+
+    endog_grid_augmented[:, n_grid_to_add + 1 :] = endog_grid
+    policy_augmented[:, n_grid_to_add + 1 :] = policy
+    value_augmented[:, n_grid_to_add + 1 :] = value
+
+    min_wealth_grid = np.min(endog_grid, axis=1)
+    idx_to_augment = np.where(endog_grid[:, 0] > min_wealth_grid)[0]
+
+    if len(idx_to_augment) > 0:
+        grid_points_to_add = np.linspace(
+            min_wealth_grid[idx_to_augment],
+            endog_grid[idx_to_augment, 0],
+            n_grid_wealth // 10,
+            axis=1,
+        )[:, :-1]
+        values_to_add = compute_value(
+            grid_points_to_add,
+            expected_value_zero_savings[idx_to_augment, np.newaxis],
+            choices[idx_to_augment, np.newaxis],
+        )
+
+        endog_grid_augmented[idx_to_augment, 1 : n_grid_to_add + 1] = grid_points_to_add
+        policy_augmented[idx_to_augment, 1 : n_grid_to_add + 1] = grid_points_to_add
+        value_augmented[idx_to_augment, 1 : n_grid_to_add + 1] = values_to_add
+
+    exog_grid_augmented = np.append(np.zeros(n_grid_to_add + 1), exog_grid)
+
+    return (
+        endog_grid_augmented,
+        policy_augmented,
+        value_augmented,
+        exog_grid_augmented,
+    )
+
+
+@njit(nogil=True)
 def _initialize_refined_arrays(
-    value: np.ndarray, policy: np.ndarray, endog_grid: np.ndarray
+    value: np.ndarray, policy: np.ndarray, endog_grid: np.ndarray, n_refined_max: int
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    value_refined = np.empty_like(value)
-    policy_refined = np.empty_like(policy)
-    endog_grid_refined = np.empty_like(endog_grid)
-
-    value_refined[:] = np.nan
-    policy_refined[:] = np.nan
-    endog_grid_refined[:] = np.nan
+    value_refined = np.full(n_refined_max, np.nan)
+    policy_refined = np.full(n_refined_max, np.nan)
+    endog_grid_refined = np.full(n_refined_max, np.nan)
 
     value_refined[:2] = value[:2]
     policy_refined[:2] = policy[:2]
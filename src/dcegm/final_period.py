@@ -62,33 +62,42 @@ def solve_final_period(
     )
 
 
-def save_final_period_solution(
-    value_container: jnp.ndarray,
-    endog_grid_container: jnp.ndarray,
-    policy_container: jnp.ndarray,
-    idx_state_choices_final_period: jnp.ndarray,
-    value_final_period: jnp.ndarray,
+def select_final_period_solution(
     endog_grid_final_period: jnp.ndarray,
     policy_final_period: jnp.ndarray,
-    num_income_shock_draws: jnp.ndarray,
-    num_wealth_grid_points: jnp.ndarray,
+    value_final_period: jnp.ndarray,
+    num_income_shock_draws: int,
 ) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray]:
-    """Saves the final period solution to the containers.
+    """Select the final period solution that is stored.
+
+    Args:
+        endog_grid_final_period (jnp.ndarray): 3d array of shape
+            (n_states, n_grid_wealth, n_income_shocks) of the resources of all final
+            states, end of period assets, and income shocks.
+        policy_final_period (jnp.ndarray): 3d array of shape
+            (n_states, n_grid_wealth, n_income_shocks) of the optimal policy.
+        value_final_period (jnp.ndarray): 3d array of shape
+            (n_states, n_grid_wealth, n_income_shocks) of the optimal value
+            function.
+        num_income_shock_draws (int): Number of income shock draws.
+
+    Returns:
+        tuple:
 
-    Soon this will be saved to disc.
+        - endog_grid (jnp.ndarray): 2d array of shape (n_states, n_grid_wealth) of
+            the endogenous grid of the final period.
+        - policy (jnp.ndarray): 2d array of shape (n_states, n_grid_wealth) of the
+            policy function of the final period.
+        - value (jnp.ndarray): 2d array of shape (n_states, n_grid_wealth) of the
+            value function of the final period.
 
     """
     # Choose which draw we take for policy and value function as those are note saved
     # with respect to the draws
     middle_of_draws = int(num_income_shock_draws + 1 / 2)
-    value_container[
-        idx_state_choices_final_period, ..., :num_wealth_grid_points
-    ] = value_final_period[:, :, middle_of_draws]
-    endog_grid_container[
-        idx_state_choices_final_period, ..., :num_wealth_grid_points
-    ] = endog_grid_final_period[:, :, middle_of_draws]
-    policy_container[
-        idx_state_choices_final_period, ..., :num_wealth_grid_points
-    ] = policy_final_period[:, :, middle_of_draws]
-
-    return value_container, endog_grid_container, policy_container
+
+    return (
+        endog_grid_final_period[:, :, middle_of_draws],
+        policy_final_period[:, :, middle_of_draws],
+        value_final_period[:, :, middle_of_draws],
+    )
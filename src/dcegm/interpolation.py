@@ -13,6 +13,7 @@ def interpolate_and_calc_marginal_utilities(
     endog_grid_child_state_choice: jnp.array,
     choice_policies_child_state_choice: jnp.ndarray,
     choice_values_child_state_choice: jnp.ndarray,
+    n_grid_child_state_choice: int,
 ):
     """Interpolate marginal utilities.
     Args:
@@ -32,6 +33,8 @@ def interpolate_and_calc_marginal_utilities(
         choice_values_child_state_choice (jnp.ndarray): 1d array containing the
             corresponding value function values of the endogenous wealth grid of the
             child state/choice pair. Shape (n_grid_wealth,).
+        n_grid_child_state_choice (int): Number of points of the endogenous wealth
+            grid of the child state/choice pair. Entries beyond are ignored.
 
     Returns:
         tuple:
@@ -42,7 +45,9 @@ def interpolate_and_calc_marginal_utilities(
 
     """
     ind_high, ind_low = get_index_high_and_low(
-        x=endog_grid_child_state_choice, x_new=next_period_wealth
+        x=endog_grid_child_state_choice,
+        x_new=next_period_wealth,
+        n_valid=n_grid_child_state_choice,
     )
     marg_utils, value_interp = vmap(
         vmap(
@@ -206,7 +211,7 @@ def linear_interpolation_with_extrapolation_jax(x, y, x_new):
     x = jnp.take(x, ind)
     y = jnp.take(y, ind)
 
-    ind_high, ind_low = get_index_high_and_low(x=x, x_new=x_new)
+    ind_high, ind_low = get_index_high_and_low(x=x, x_new=x_new, n_valid=x.shape[0])
 
     y_high = jnp.take(y, ind_high)
     y_low = jnp.take(y, ind_low)
@@ -220,20 +225,21 @@ def linear_interpolation_with_extrapolation_jax(x, y, x_new):
     return interpol_res
 
 
-def get_index_high_and_low(x, x_new):
+def get_index_high_and_low(x, x_new, n_valid):
     """Get index of the highest value in x that is smaller than x_new.
 
     Args:
-        x (np.ndarray): 1d array of shape (n,) containing the x-values.
+        x (np.ndarray): 1d array of shape (n,) containing the x-values. Only the first
+            ``n_valid`` entries are used, which must be sorted.
         x_new (float): The new x-value at which to evaluate the interpolation function.
+        n_valid (int): Number of valid entries of x.
 
     Returns:
         int: Index of the value in the wealth grid which is higher than x_new. Or in
-            case of extrapolation last or first index of not nan element.
+            case of extrapolation last or first index of the valid entries.
 
     """
-    ind_high = jnp.searchsorted(x, x_new).clip(max=(x.shape[0] - 1), min=1)
-    ind_high -= jnp.isnan(x[ind_high]).astype(int)
+    ind_high = jnp.clip(jnp.searchsorted(x, x_new), 1, n_valid - 1)
     return ind_high, ind_high - 1
 
 
@@ -1,11 +1,52 @@
 from functools import partial
+from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import NamedTuple
+from typing import Optional
 from typing import Tuple
 
+import jax.numpy as jnp
 import numpy as np
 import pandas as pd
-from dcegm.fast_upper_envelope import fast_upper_envelope_wrapper
+from dcegm.fast_upper_envelope import fast_upper_envelope_wrapper_batch
+from dcegm.fast_upper_envelope import fast_upper_envelope_wrapper_jax
+from dcegm.ragged_array import create_ragged_array
+from jax import vmap
+
+PRECISION_DTYPES = {"float32": np.float32, "float64": np.float64}
+
+
+class ModelFunctions(NamedTuple):
+    """User-supplied model functions without parameters partialled in.
+
+    The functions are called with the params dictionary as keyword argument
+    ``params_dict``. As a tuple of functions, the object is hashable and can be
+    passed as a static argument to jitted functions, which then receive the params
+    dictionary as a traced argument. Solving the model for another parameter vector
+    thus reuses the compiled functions.
+
+    Attributes:
+        utility (callable): User-defined utility function.
+        marginal_utility (callable): User-defined marginal utility function.
+        inverse_marginal_utility (callable): User-defined inverse marginal utility
+            function.
+        budget_constraint (callable): User-defined budget constraint, which is
+            called with the options as keyword argument ``options``.
+        transition_function (callable): User-defined function returning for each
+            state a transition matrix vector.
+        budget_table_function (callable, optional): User-defined function that
+            tabulates the inputs of the budget constraint by period and income
+            shock. See :func:`dcegm.solve.solve_dcegm`.
+
+    """
+
+    utility: Callable
+    marginal_utility: Callable
+    inverse_marginal_utility: Callable
+    budget_constraint: Callable
+    transition_function: Callable
+    budget_table_function: Optional[Callable] = None
 
 
 def convert_params_to_dict(params: pd.DataFrame) -> Dict[str, float]:
@@ -73,60 +114,228 @@ def get_partial_functions(
             ```savings_grid```, ```income_shocks```, ```params``` and ```options```
             are already partialled in.
         - compute_upper_envelope (Callable): Function for calculating the upper envelope
-            of the policy and value function. If the number of discrete choices is 1,
-            this function is a dummy function that returns the policy and value
-            function as is, without performing a fast upper envelope scan.
+            of the policy and value function for all state-choice combinations of a
+            period. It returns the refined endogenous grid, policy and value
+            function as ragged arrays. If the number of discrete choices is 1, this
+            function is a dummy function that returns the policy and value function
+            as is, without performing a fast upper envelope scan. If the backwards
+            induction is compiled as a scan over periods, the function is the JAX
+            implementation, which refines a single state-choice combination and is
+            mapped over all combinations of a period.
         - transition_function (Callable): Partialled transition function that returns
             transition probabilities for each state.
 
     """
-    compute_utility = partial(
-        user_utility_functions["utility"],
-        params_dict=params_dict,
+    (
+        compute_utility,
+        compute_marginal_utility,
+        compute_inverse_marginal_utility,
+        compute_value,
+        transition_function,
+    ) = partial_params_into_model_functions(
+        params_dict,
+        model_functions=get_model_functions(
+            user_utility_functions,
+            user_budget_constraint,
+            exogenous_transition_function,
+        ),
     )
 
-    compute_marginal_utility = partial(
-        user_utility_functions["marginal_utility"],
+    compute_next_period_wealth = partial(
+        user_budget_constraint,
         params_dict=params_dict,
+        options=options,
     )
 
-    compute_inverse_marginal_utility = partial(
-        user_utility_functions["inverse_marginal_utility"],
-        params_dict=params_dict,
+    return (
+        compute_utility,
+        compute_marginal_utility,
+        compute_inverse_marginal_utility,
+        compute_value,
+        compute_next_period_wealth,
+        get_upper_envelope_function(options),
+        transition_function,
     )
 
+
+def get_upper_envelope_function(options: Dict[str, Any]) -> Callable:
+    """Select the function for calculating the upper envelope.
+
+    Args:
+        options (dict): Options dictionary.
+
+    Returns:
+        callable: The JAX implementation of the fast upper envelope, which refines
+            a single state-choice combination, if the backwards induction is
+            compiled as a scan over periods. Otherwise, the batched implementation,
+            which refines all state-choice combinations of a period. If the number
+            of discrete choices is 1, a dummy function that returns the policy and
+            value function as is.
+
+    """
+    if options.get("backwards_induction_scan", False):
+        if options["n_discrete_choices"] == 1:
+            return _return_policy_and_value_jax
+
+        return fast_upper_envelope_wrapper_jax
+
+    if options["n_discrete_choices"] == 1:
+        return _return_policy_and_value_batch
+
+    return fast_upper_envelope_wrapper_batch
+
+
+def get_model_functions(
+    user_utility_functions: Dict[str, Callable],
+    user_budget_constraint: Callable,
+    exogenous_transition_function: Callable,
+    user_budget_table_function: Optional[Callable] = None,
+) -> ModelFunctions:
+    """Collect the user-supplied functions that depend on the parameters.
+
+    Args:
+        user_utility_functions (Dict[str, callable]): Dictionary of three user-supplied
+            functions for computation of:
+            (i) utility
+            (ii) inverse marginal utility
+            (iii) next period marginal utility
+        user_budget_constraint (callable): Callable budget constraint.
+        exogenous_transition_function (callable): User-supplied function returning for
+            each state a transition matrix vector.
+        user_budget_table_function (callable, optional): User-supplied function that
+            tabulates the inputs of the budget constraint by period and income
+            shock.
+
+    Returns:
+        ModelFunctions: The user-supplied functions.
+
+    """
+    return ModelFunctions(
+        utility=user_utility_functions["utility"],
+        marginal_utility=user_utility_functions["marginal_utility"],
+        inverse_marginal_utility=user_utility_functions["inverse_marginal_utility"],
+        budget_constraint=user_budget_constraint,
+        transition_function=exogenous_transition_function,
+        budget_table_function=user_budget_table_function,
+    )
+
+
+def get_float_dtype(options: Dict[str, Any]) -> np.dtype:
+    """Get the floating point dtype of the solution from the options.
+
+    Args:
+        options (dict): Options dictionary. The key "precision" is either
+            "float64", the default, or "float32".
+
+    Returns:
+        np.dtype: The floating point dtype.
+
+    """
+    precision = options.get("precision", "float64")
+    if precision not in PRECISION_DTYPES:
+        raise ValueError(
+            f"Unknown precision {precision!r}. Choose one of "
+            f"{sorted(PRECISION_DTYPES)}."
+        )
+
+    return np.dtype(PRECISION_DTYPES[precision])
+
+
+def freeze_options(options: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Convert the options dictionary into a hashable tuple of items.
+
+    The frozen options can be passed as a static argument to jitted functions,
+    which recover the dictionary with ``dict(options)``.
+
+    Args:
+        options (dict): Options dictionary with hashable values.
+
+    Returns:
+        tuple: The items of ``options`` sorted by key.
+
+    """
+    for key, value in options.items():
+        try:
+            hash(value)
+        except TypeError:
+            raise TypeError(
+                f"The value of options['{key}'] is not hashable. All option values "
+                "must be hashable, e.g. a tuple instead of a list or an array."
+            ) from None
+
+    return tuple(sorted(options.items()))
+
+
+def partial_params_into_model_functions(
+    params_dict: dict, model_functions: ModelFunctions
+) -> Tuple[Callable, Callable, Callable, Callable, Callable]:
+    """Partial the parameters into the user-supplied model functions.
+
+    Inside a jitted function, ``params_dict`` contains traced values and the
+    partialled functions are only used during tracing.
+
+    Args:
+        params_dict (dict): Dictionary containing model parameters.
+        model_functions (ModelFunctions): The user-supplied functions.
+
+    Returns:
+        tuple:
+
+        - compute_utility (callable): Function for computation of agent's utility.
+        - compute_marginal_utility (callable): Function for computation of the
+            agent's marginal utility.
+        - compute_inverse_marginal_utility (callable): Function for calculating the
+            inverse marginal utility, which takes the marginal utility as only input.
+        - compute_value (callable): Function for calculating the value from
+            consumption level, discrete choice and expected value.
+        - transition_function (callable): Function that returns transition
+            probabilities for each state.
+
+    """
+    compute_utility = partial(model_functions.utility, params_dict=params_dict)
+    compute_marginal_utility = partial(
+        model_functions.marginal_utility, params_dict=params_dict
+    )
+    compute_inverse_marginal_utility = partial(
+        model_functions.inverse_marginal_utility, params_dict=params_dict
+    )
     compute_value = partial(
         calc_current_value,
         discount_factor=params_dict["beta"],
         compute_utility=compute_utility,
     )
-
-    compute_next_period_wealth = partial(
-        user_budget_constraint,
-        params_dict=params_dict,
-        options=options,
-    )
-
     transition_function = partial(
-        exogenous_transition_function, params_dict=params_dict
+        model_functions.transition_function, params_dict=params_dict
     )
 
-    if options["n_discrete_choices"] == 1:
-        compute_upper_envelope = _return_policy_and_value
-    else:
-        compute_upper_envelope = fast_upper_envelope_wrapper
-
     return (
         compute_utility,
         compute_marginal_utility,
         compute_inverse_marginal_utility,
         compute_value,
-        compute_next_period_wealth,
-        compute_upper_envelope,
         transition_function,
     )
 
 
+def create_transition_matrix(
+    transition_vector_by_state: Callable, state_space: np.ndarray
+) -> jnp.ndarray:
+    """Create the transition matrix of the exogenous processes for all states.
+
+    Args:
+        transition_vector_by_state (callable): Partialled transition function that
+            returns transition probabilities for a given state.
+        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
+            which serves as a collection of all possible states.
+
+    Returns:
+        jnp.ndarray: 2d array of shape (n_states, n_exog_processes) containing for
+            each state the transition probabilities of the exogenous processes.
+
+    """
+    return vmap(transition_vector_by_state)(state_space)
+
+
 def calc_current_value(
     consumption: np.ndarray,
     next_period_value: np.ndarray,
@@ -158,62 +367,43 @@ def calc_current_value(
     return value
 
 
-def create_multi_dim_arrays(
-    state_choice_space: np.ndarray,
-    options: Dict[str, int],
-) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    """Create multi-dimensional arrays for endogenous grid, policy and value function.
-
-    We include one additional grid point (n_grid_wealth + 1) to M,
-    since we want to set the first position (j=0) to M_t = 0 for all time
-    periods.
-
-    Moreover, we add 10% extra space filled with nans, since, in the upper
-    envelope step, the endogenous wealth grid might be augmented to the left
-    in order to accurately describe potential non-monotonicities (and hence
-    discontinuities) near the start of the grid.
-
-
-    Note that, in the Upper Envelope step, we drop suboptimal points from the original
-    grid and add new ones (kink points as well as the corresponding interpolated values
-    of the policy and value functions).
-
-    Args:
-        state_space (np.ndarray): Collection of all possible state and choice
-            combinations.
-        options (dict): Options dictionary.
-
-    Returns:
-        tuple:
-
-        - endog_grid_container (np.ndarray): "Empty" 3d np.ndarray storing the
-            endogenous grid for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        - policy_container (np.ndarray): "Empty" 3d np.ndarray storing the
-            choice-specific policy function for each state and each discrete choice
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        - value_container (np.ndarray): "Empty" 3d np.ndarray storing the
-            choice-specific value functions for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-
-    """
-    n_grid_wealth = options["grid_points_wealth"]
-    n_state_choice_combs = state_choice_space.shape[0]
+def _return_policy_and_value_batch(
+    endog_grid,
+    policy,
+    value,
+    expected_value_zero_savings,
+    **kwargs,
+):
+    n_state_choices, n_grid_wealth = endog_grid.shape
 
-    endog_grid_container = np.empty((n_state_choice_combs, int(1.1 * n_grid_wealth)))
-    policy_container = np.empty((n_state_choice_combs, int(1.1 * n_grid_wealth)))
-    value_container = np.empty((n_state_choice_combs, int(1.1 * n_grid_wealth)))
-    endog_grid_container[:] = np.nan
-    policy_container[:] = np.nan
-    value_container[:] = np.nan
+    endog_grid = np.column_stack([np.zeros(n_state_choices), endog_grid])
+    policy = np.column_stack([np.zeros(n_state_choices), policy])
+    value = np.column_stack([expected_value_zero_savings, value])
+    n_refined = np.full(n_state_choices, n_grid_wealth + 1)
 
-    return endog_grid_container, policy_container, value_container
+    return tuple(
+        create_ragged_array(array, n_refined) for array in (endog_grid, policy, value)
+    )
 
 
-def _return_policy_and_value(
-    endog_grid, policy, value, expected_value_zero_savings, **kwargs
+def _return_policy_and_value_jax(
+    endog_grid,
+    policy,
+    value,
+    expected_value_zero_savings,
+    choice,  # noqa: U100
+    exog_grid,
+    compute_value,  # noqa: U100
+    n_refined_max=None,
 ):
-    endog_grid = np.append(0, endog_grid)
-    policy = np.append(0, policy)
-    value = np.append(expected_value_zero_savings, value)
-    return endog_grid, policy, value
+    n_grid_wealth = exog_grid.shape[0]
+    if n_refined_max is None:
+        n_refined_max = int(1.1 * n_grid_wealth)
+    nans_to_append = jnp.full(n_refined_max - n_grid_wealth - 1, jnp.nan)
+
+    endog_grid = jnp.concatenate([jnp.zeros(1), endog_grid, nans_to_append])
+    policy = jnp.concatenate([jnp.zeros(1), policy, nans_to_append])
+    value = jnp.concatenate(
+        [jnp.atleast_1d(expected_value_zero_savings), value, nans_to_append]
+    )
+    return endog_grid, policy, value, n_grid_wealth + 1
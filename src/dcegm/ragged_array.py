@@ -0,0 +1,153 @@
+"""Ragged arrays for storing rows of different lengths without padding."""
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+
+
+class RaggedArray(NamedTuple):
+    """Rows of different lengths stored back to back in a flat buffer.
+
+    Attributes:
+        data (np.ndarray): 1d array of shape (sum(lengths),) containing the values
+            of all rows.
+        offsets (np.ndarray): 1d array of shape (n_rows,) containing the position
+            of the first value of each row in ``data``.
+        lengths (np.ndarray): 1d array of shape (n_rows,) containing the number of
+            values of each row.
+
+    """
+
+    data: np.ndarray
+    offsets: np.ndarray
+    lengths: np.ndarray
+
+
+def create_ragged_array(padded: np.ndarray, lengths: np.ndarray) -> RaggedArray:
+    """Create a ragged array from a padded 2d array.
+
+    Args:
+        padded (np.ndarray): 2d array of shape (n_rows, n_cols) whose rows contain
+            the values at the first ``lengths`` positions. The remaining positions
+            are ignored.
+        lengths (np.ndarray): 1d array of shape (n_rows,) containing the number of
+            values of each row.
+
+    Returns:
+        RaggedArray: The rows of ``padded`` without padding.
+
+    """
+    padded = np.asarray(padded)
+    lengths = np.asarray(lengths, dtype=int)
+
+    is_value = np.arange(padded.shape[1]) < lengths[:, np.newaxis]
+
+    return RaggedArray(
+        data=padded[is_value],
+        offsets=_get_offsets(lengths),
+        lengths=lengths,
+    )
+
+
+def concatenate_ragged_arrays(ragged_arrays: Sequence[RaggedArray]) -> RaggedArray:
+    """Stack the rows of several ragged arrays.
+
+    Args:
+        ragged_arrays (Sequence[RaggedArray]): Ragged arrays whose rows are stacked
+            in the given order.
+
+    Returns:
+        RaggedArray: Ragged array containing the rows of all ``ragged_arrays``.
+
+    """
+    lengths = np.concatenate([ragged.lengths for ragged in ragged_arrays])
+
+    return RaggedArray(
+        data=np.concatenate([ragged.data for ragged in ragged_arrays]),
+        offsets=_get_offsets(lengths),
+        lengths=lengths,
+    )
+
+
+def get_row(ragged: RaggedArray, idx_row: int) -> np.ndarray:
+    """Get a row of a ragged array.
+
+    Args:
+        ragged (RaggedArray): The ragged array.
+        idx_row (int): Index of the row.
+
+    Returns:
+        np.ndarray: 1d array of shape (lengths[idx_row],) containing the values of
+            the row. This is a view on ``ragged.data``.
+
+    """
+    start = ragged.offsets[idx_row]
+
+    return ragged.data[start : start + ragged.lengths[idx_row]]
+
+
+def get_rows(ragged: RaggedArray, idx_rows: np.ndarray) -> RaggedArray:
+    """Get rows of a ragged array as a new ragged array.
+
+    Args:
+        ragged (RaggedArray): The ragged array.
+        idx_rows (np.ndarray): 1d array of shape (n_rows,) containing the indices
+            of the rows.
+
+    Returns:
+        RaggedArray: Ragged array containing the rows ``idx_rows`` of ``ragged``.
+
+    """
+    idx_rows = np.asarray(idx_rows)
+    lengths = ragged.lengths[idx_rows]
+    offsets = _get_offsets(lengths)
+
+    idx_data = np.repeat(ragged.offsets[idx_rows] - offsets, lengths) + np.arange(
+        lengths.sum()
+    )
+
+    return RaggedArray(data=ragged.data[idx_data], offsets=offsets, lengths=lengths)
+
+
+def get_padded_rows(
+    ragged: RaggedArray,
+    idx_rows: np.ndarray,
+    fill_value: float = np.nan,
+    n_cols: Optional[int] = None,
+) -> np.ndarray:
+    """Get rows of a ragged array as a padded 2d array.
+
+    Args:
+        ragged (RaggedArray): The ragged array.
+        idx_rows (np.ndarray): 1d array of shape (n_rows,) containing the indices
+            of the rows.
+        fill_value (float): Value of the padded positions. Defaults to missing
+            values.
+        n_cols (int, optional): Number of columns of the padded array. Must be at
+            least the length of the longest row. Defaults to the length of the
+            longest row.
+
+    Returns:
+        np.ndarray: 2d array of shape (n_rows, n_cols) containing the values of the
+            rows at the first positions, padded with ``fill_value``.
+
+    """
+    idx_rows = np.asarray(idx_rows)
+    lengths = ragged.lengths[idx_rows]
+    if n_cols is None:
+        n_cols = lengths.max(initial=0)
+
+    cols = np.arange(n_cols)
+    is_value = cols < lengths[:, np.newaxis]
+
+    padded = np.full((idx_rows.shape[0], n_cols), fill_value, dtype=ragged.data.dtype)
+    padded[is_value] = ragged.data[
+        (ragged.offsets[idx_rows][:, np.newaxis] + cols)[is_value]
+    ]
+
+    return padded
+
+
+def _get_offsets(lengths: np.ndarray) -> np.ndarray:
+    return np.cumsum(lengths) - lengths
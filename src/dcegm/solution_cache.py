@@ -0,0 +1,325 @@
+"""Functions for caching solutions of the model on disk."""
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import os
+import shutil
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import jax
+import numpy as np
+import pandas as pd
+from dcegm.pre_processing import get_float_dtype
+from dcegm.ragged_array import RaggedArray
+from dcegm.solution_store import get_params_hash
+from dcegm.solution_store import SOLUTION_ARRAYS
+from dcegm.solve import solve_dcegm
+
+LENGTHS_FILE = "lengths.npy"
+
+# Types of global variables whose value enters the fingerprint of a function.
+FINGERPRINTED_CONSTANT_TYPES = (bool, int, float, complex, str, bytes, tuple, frozenset)
+
+
+def solve_dcegm_cached(
+    params: pd.DataFrame,
+    options: Dict[str, int],
+    utility_functions: Dict[str, Callable],
+    budget_constraint: Callable,
+    state_space_functions: Dict[str, Callable],
+    final_period_solution: Callable,
+    transition_function: Callable,
+    cache_dir: Union[str, Path],
+    max_cache_size: Optional[int] = None,
+    budget_table_function: Optional[Callable] = None,
+) -> Tuple[RaggedArray, RaggedArray, RaggedArray]:
+    """Solve the model or load its solution from an on-disk cache.
+
+    The solution is cached under a key that combines the hash of ``params``, the
+    options, the source code of all user-supplied functions, the version of dcegm
+    and the floating point precision. If a solution with the same key is in the
+    cache, it is returned with its data memory-mapped from disk. Otherwise, the
+    model is solved with :func:`dcegm.solve.solve_dcegm` and the solution is added
+    to the cache.
+
+    The source code of the functions and constants that the user-supplied
+    functions reference from their own package enters the key as well. Changes to
+    functions of other packages do not invalidate the cache.
+
+    Args:
+        params (pd.DataFrame): Params DataFrame.
+        options (dict): Options dictionary.
+        utility_functions (Dict[str, callable]): Dictionary of three user-supplied
+            functions for computation of:
+            (i) utility
+            (ii) inverse marginal utility
+            (iii) next period marginal utility
+        budget_constraint (callable): Callable budget constraint.
+        state_space_functions (Dict[str, callable]): Dictionary of user-supplied
+            functions for the state space. See :func:`dcegm.solve.solve_dcegm`.
+        final_period_solution (callable): User-supplied function for solving the agent's
+            last period.
+        transition_function (callable): User-supplied function returning for each
+            state a transition matrix vector.
+        cache_dir (str or pathlib.Path): Directory of the cache. It is created if it
+            does not exist.
+        max_cache_size (int, optional): Maximum size of the cache in bytes. If the
+            cache grows larger, the least recently used solutions are removed.
+            Defaults to no limit.
+        budget_table_function (callable, optional): User-supplied function that
+            tabulates the inputs of the budget constraint by period and income
+            shock. See :func:`dcegm.solve.solve_dcegm`.
+
+    Returns:
+        tuple:
+
+        - endog_grid (RaggedArray): Ragged array with one row per state-choice
+            combination containing the refined endogenous grid.
+        - policy (RaggedArray): Ragged array with one row per state-choice
+            combination containing the choice-specific policy function.
+        - value (RaggedArray): Ragged array with one row per state-choice
+            combination containing the choice-specific value function.
+
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    key = get_solution_cache_key(
+        params,
+        options,
+        utility_functions=utility_functions,
+        budget_constraint=budget_constraint,
+        state_space_functions=state_space_functions,
+        final_period_solution=final_period_solution,
+        transition_function=transition_function,
+        budget_table_function=budget_table_function,
+    )
+    entry_path = cache_dir / key
+
+    if not entry_path.is_dir():
+        solution = solve_dcegm(
+            params,
+            options,
+            utility_functions=utility_functions,
+            budget_constraint=budget_constraint,
+            state_space_functions=state_space_functions,
+            final_period_solution=final_period_solution,
+            transition_function=transition_function,
+            budget_table_function=budget_table_function,
+        )
+        _save_cache_entry(entry_path, solution)
+
+        if max_cache_size is not None:
+            evict_least_recently_used(cache_dir, max_cache_size, keep=key)
+
+    return _load_cache_entry(entry_path)
+
+
+def get_solution_cache_key(
+    params: pd.DataFrame,
+    options: Dict[str, int],
+    **model_functions,
+) -> str:
+    """Compute the key of a solution in the cache.
+
+    Args:
+        params (pd.DataFrame): Params DataFrame.
+        options (dict): Options dictionary.
+        **model_functions: The user-supplied functions or dictionaries of them.
+            Optional functions that are None do not enter the key.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash of the params, the options, the fingerprints
+            of the user-supplied functions, the version of dcegm and whether JAX
+            computes in double precision.
+
+    """
+    fingerprints = {
+        name: (
+            {key: get_function_fingerprint(func) for key, func in funcs.items()}
+            if isinstance(funcs, dict)
+            else get_function_fingerprint(funcs)
+        )
+        for name, funcs in model_functions.items()
+        if funcs is not None
+    }
+    content = json.dumps(
+        {
+            "params": get_params_hash(params),
+            "options": options,
+            "functions": fingerprints,
+            "dcegm_version": _get_dcegm_version(),
+            "jax_enable_x64": jax.config.jax_enable_x64,
+            "precision": get_float_dtype(options).name,
+        },
+        sort_keys=True,
+        default=_serialize_value,
+    )
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_function_fingerprint(func: Callable) -> str:
+    """Compute a fingerprint of a function that is stable across processes.
+
+    Functions and constants that ``func`` references as global variables are
+    fingerprinted as well if they are defined in the same package as ``func``. This
+    is done recursively, such that editing a helper function changes the
+    fingerprint.
+
+    Args:
+        func (callable): The function. Partialled functions are fingerprinted by
+            the underlying function and the partialled arguments.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash of the source code of the function and its
+            helpers. If the source code is not available, the bytecode is used
+            instead.
+
+    """
+    if isinstance(func, partial):
+        content = get_function_fingerprint(func.func) + repr(
+            (func.args, sorted(func.keywords.items()))
+        )
+    else:
+        func = inspect.unwrap(func)
+        sources = {}
+        _collect_sources(func, package=_get_package(func), sources=sources)
+        content = json.dumps(sources, sort_keys=True)
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def evict_least_recently_used(
+    cache_dir: Union[str, Path], max_cache_size: int, keep: Optional[str] = None
+) -> None:
+    """Remove the least recently used solutions until the cache is small enough.
+
+    Args:
+        cache_dir (str or pathlib.Path): Directory of the cache.
+        max_cache_size (int): Maximum size of the cache in bytes.
+        keep (str, optional): Key of a solution that is never removed.
+
+    """
+    entries = [
+        path
+        for path in Path(cache_dir).iterdir()
+        if path.is_dir() and not path.name.startswith(".")
+    ]
+    sizes = {
+        path: sum(file.stat().st_size for file in path.iterdir()) for path in entries
+    }
+    cache_size = sum(sizes.values())
+
+    for path in sorted(entries, key=lambda path: path.stat().st_mtime):
+        if cache_size <= max_cache_size:
+            break
+        if path.name == keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        cache_size -= sizes[path]
+
+
+def _save_cache_entry(
+    entry_path: Path, solution: Tuple[RaggedArray, RaggedArray, RaggedArray]
+) -> None:
+    # Write to a temporary directory first, such that concurrent solves never see
+    # a partially written entry.
+    tmp_path = Path(tempfile.mkdtemp(dir=entry_path.parent, prefix=".tmp_"))
+    np.save(tmp_path / LENGTHS_FILE, solution[0].lengths)
+    for name, ragged in zip(SOLUTION_ARRAYS, solution):
+        np.save(tmp_path / f"{name}.npy", ragged.data)
+
+    try:
+        tmp_path.rename(entry_path)
+    except OSError:
+        # Another process has added the same solution in the meantime.
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _load_cache_entry(entry_path: Path) -> Tuple[RaggedArray, RaggedArray, RaggedArray]:
+    # Mark the entry as recently used.
+    os.utime(entry_path)
+
+    lengths = np.load(entry_path / LENGTHS_FILE)
+    offsets = np.cumsum(lengths) - lengths
+
+    return tuple(
+        RaggedArray(
+            data=np.load(entry_path / f"{name}.npy", mmap_mode="r"),
+            offsets=offsets,
+            lengths=lengths,
+        )
+        for name in SOLUTION_ARRAYS
+    )
+
+
+def _collect_sources(func: Callable, package: str, sources: Dict[str, str]) -> None:
+    name = f"{getattr(func, '__module__', '')}:{getattr(func, '__qualname__', '')}"
+    if name in sources:
+        return
+    sources[name] = _get_source(func)
+
+    for global_name, value in _get_referenced_globals(func).items():
+        value = inspect.unwrap(value) if inspect.isfunction(value) else value
+        if inspect.isfunction(value) and _get_package(value) == package:
+            _collect_sources(value, package=package, sources=sources)
+        elif isinstance(value, FINGERPRINTED_CONSTANT_TYPES):
+            sources[f"{name}:{global_name}"] = repr(value)
+
+
+def _get_source(func: Callable) -> str:
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        return repr(func) if code is None else code.co_code.hex()
+
+
+def _get_referenced_globals(func: Callable) -> Dict[str, Any]:
+    code = getattr(func, "__code__", None)
+    func_globals = getattr(func, "__globals__", {})
+    if code is None:
+        return {}
+
+    names = set()
+    codes = [code]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+
+    return {name: func_globals[name] for name in sorted(names) if name in func_globals}
+
+
+def _get_package(func: Callable) -> str:
+    return (getattr(func, "__module__", None) or "").partition(".")[0]
+
+
+def _serialize_value(value: Any) -> str:
+    # The string representation of arrays is truncated. Arrays are identified by
+    # their dtype, shape and data instead.
+    if isinstance(value, (np.ndarray, jax.Array)):
+        value = np.asarray(value)
+        return (
+            f"array({value.dtype.str}, {value.shape}, "
+            f"{hashlib.sha256(value.tobytes()).hexdigest()})"
+        )
+
+    return str(value)
+
+
+def _get_dcegm_version() -> str:
+    try:
+        return importlib.metadata.version("dcegm")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
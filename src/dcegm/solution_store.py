@@ -0,0 +1,231 @@
+"""Functions for storing the solution on disk and loading it lazily by period."""
+import hashlib
+import json
+from functools import partial
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from dcegm.ragged_array import concatenate_ragged_arrays
+from dcegm.ragged_array import RaggedArray
+from dcegm.solve import get_model_structure
+from dcegm.state_space import ModelStructure
+
+METADATA_FILE = "metadata.json"
+STATE_CHOICE_SPACE_FILE = "state_choice_space.npy"
+SOLUTION_ARRAYS = ("endog_grid", "policy", "value")
+
+
+def initialize_solution_store(
+    path: Union[str, Path],
+    params: pd.DataFrame,
+    options: Dict[str, Any],
+    state_space_functions: Dict[str, Callable],
+    model_structure: Optional[ModelStructure] = None,
+) -> Callable:
+    """Initialize an on-disk solution store and return its period solution sink.
+
+    The store is a directory with one subdirectory per period, which contains the
+    endogenous grid, policy and value function of the period's state-choice
+    combinations as ``.npy`` files. The rows of a period are stored back to back
+    without padding, together with the number of points of each row. The params
+    hash, the options and the state-choice space are stored alongside as metadata.
+
+    The returned function can be passed as ``period_solution_sink`` to
+    :func:`dcegm.solve.solve_dcegm`.
+
+    Args:
+        path (str or pathlib.Path): Directory of the store. It is created if it
+            does not exist.
+        params (pd.DataFrame): Params DataFrame.
+        options (dict): Options dictionary.
+        state_space_functions (Dict[str, callable]): Dictionary of two user-supplied
+            functions to:
+            (i) create the state space
+            (ii) get the state specific choice set, or, under the key
+                "get_state_specific_choice_mask", the feasible choices of all
+                states as a boolean mask
+            (iii) optionally, under the key "get_next_period_state", get the next
+                period's state variables of all state-choice combinations
+            (iv) optionally, under the key "get_initial_states", get the states
+                the agents start in from the options
+        model_structure (ModelStructure, optional): The state space objects the
+            model is solved with. It must be the model structure passed to
+            :func:`dcegm.solve.solve_dcegm`, such that the stored state-choice
+            space matches the solution. By default, it is taken from
+            :func:`dcegm.solve.get_model_structure` like in
+            :func:`dcegm.solve.solve_dcegm`.
+
+    Returns:
+        callable: Function that writes the solution of a period to the store. It is
+            called as ``sink(period, idx_state_choices, endog_grid, policy, value)``.
+
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    if model_structure is None:
+        model_structure = get_model_structure(options, state_space_functions)
+    state_choice_space = model_structure.state_space_structure.state_choice_space
+    np.save(path / STATE_CHOICE_SPACE_FILE, state_choice_space)
+
+    metadata = {
+        "params_hash": get_params_hash(params),
+        "options": options,
+        "n_periods": options["n_periods"],
+    }
+    (path / METADATA_FILE).write_text(json.dumps(metadata, indent=4, default=str))
+
+    return partial(save_period_solution, path=path)
+
+
+def save_period_solution(
+    period: int,
+    idx_state_choices: np.ndarray,
+    endog_grid: RaggedArray,
+    policy: RaggedArray,
+    value: RaggedArray,
+    path: Union[str, Path],
+) -> None:
+    """Write the solution of a period to the store.
+
+    Args:
+        period (int): The period.
+        idx_state_choices (np.ndarray): 1d array of shape
+            (n_state_choice_combs_period,) containing the indices of the period's
+            state-choice combinations in the state-choice space.
+        endog_grid (RaggedArray): The endogenous grid of each state-choice
+            combination of the period.
+        policy (RaggedArray): The policy function of each state-choice combination
+            of the period.
+        value (RaggedArray): The value function of each state-choice combination of
+            the period.
+        path (str or pathlib.Path): Directory of the store.
+
+    """
+    period_path = _get_period_path(path, period)
+    period_path.mkdir(parents=True, exist_ok=True)
+
+    np.save(period_path / "idx_state_choices.npy", np.asarray(idx_state_choices))
+    np.save(period_path / "lengths.npy", endog_grid.lengths)
+    for name, ragged in zip(SOLUTION_ARRAYS, (endog_grid, policy, value)):
+        np.save(period_path / f"{name}.npy", ragged.data)
+
+
+def load_period_solution(
+    path: Union[str, Path], period: int
+) -> Tuple[np.ndarray, RaggedArray, RaggedArray, RaggedArray]:
+    """Load the solution of a period from the store.
+
+    The data of the ragged arrays is memory-mapped, i.e. only the parts that are
+    accessed are read from disk.
+
+    Args:
+        path (str or pathlib.Path): Directory of the store.
+        period (int): The period.
+
+    Returns:
+        tuple:
+
+        - idx_state_choices (np.ndarray): 1d array of shape
+            (n_state_choice_combs_period,) containing the indices of the period's
+            state-choice combinations in the state-choice space.
+        - endog_grid (RaggedArray): The endogenous grid of each state-choice
+            combination of the period.
+        - policy (RaggedArray): The policy function of each state-choice
+            combination of the period.
+        - value (RaggedArray): The value function of each state-choice combination
+            of the period.
+
+    """
+    period_path = _get_period_path(path, period)
+
+    idx_state_choices = np.load(period_path / "idx_state_choices.npy")
+    lengths = np.load(period_path / "lengths.npy")
+    offsets = np.cumsum(lengths) - lengths
+
+    return (idx_state_choices,) + tuple(
+        RaggedArray(
+            data=np.load(period_path / f"{name}.npy", mmap_mode="r"),
+            offsets=offsets,
+            lengths=lengths,
+        )
+        for name in SOLUTION_ARRAYS
+    )
+
+
+def load_solution_metadata(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load the metadata of the store.
+
+    Args:
+        path (str or pathlib.Path): Directory of the store.
+
+    Returns:
+        dict: Dictionary with the params hash, the options, the number of periods
+            and the memory-mapped state-choice space.
+
+    """
+    path = Path(path)
+
+    metadata = json.loads((path / METADATA_FILE).read_text())
+    metadata["state_choice_space"] = np.load(
+        path / STATE_CHOICE_SPACE_FILE, mmap_mode="r"
+    )
+
+    return metadata
+
+
+def load_solution(
+    path: Union[str, Path]
+) -> Tuple[RaggedArray, RaggedArray, RaggedArray]:
+    """Load the solution of all periods from the store into memory.
+
+    Args:
+        path (str or pathlib.Path): Directory of the store.
+
+    Returns:
+        tuple:
+
+        - endog_grid (RaggedArray): Ragged array with one row per state-choice
+            combination containing the refined endogenous grid.
+        - policy (RaggedArray): Ragged array with one row per state-choice
+            combination containing the choice-specific policy function.
+        - value (RaggedArray): Ragged array with one row per state-choice
+            combination containing the choice-specific value function.
+
+    """
+    metadata = load_solution_metadata(path)
+    period_solutions = [
+        load_period_solution(path, period)[1:]
+        for period in range(metadata["n_periods"])
+    ]
+
+    return tuple(
+        concatenate_ragged_arrays([solution[i] for solution in period_solutions])
+        for i in range(len(SOLUTION_ARRAYS))
+    )
+
+
+def get_params_hash(params: pd.DataFrame) -> str:
+    """Compute a hash of the params DataFrame.
+
+    Args:
+        params (pd.DataFrame): Params DataFrame.
+
+    Returns:
+        str: Hexadecimal SHA-256 hash of the index and values of ``params``.
+
+    """
+    row_hashes = pd.util.hash_pandas_object(params, index=True).to_numpy()
+
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def _get_period_path(path: Union[str, Path], period: int) -> Path:
+    return Path(path) / f"period_{period}"
@@ -1,13 +1,18 @@
 """Interface for the DC-EGM algorithm."""
+from functools import lru_cache
 from functools import partial
+from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 import numpy as np
 import pandas as pd
 from dcegm.egm import calculate_candidate_solutions_from_euler_equation
-from dcegm.final_period import save_final_period_solution
+from dcegm.final_period import select_final_period_solution
 from dcegm.final_period import solve_final_period
 from dcegm.integration import quadrature_legendre
 from dcegm.interpolation import interpolate_and_calc_marginal_utilities
@@ -15,13 +20,38 @@ from dcegm.marg_utilities_and_exp_value import (
     aggregate_marg_utils_exp_values,
 )
 from dcegm.pre_processing import convert_params_to_dict
-from dcegm.pre_processing import create_multi_dim_arrays
+from dcegm.pre_processing import create_transition_matrix
+from dcegm.pre_processing import freeze_options
+from dcegm.pre_processing import get_float_dtype
+from dcegm.pre_processing import get_model_functions
 from dcegm.pre_processing import get_partial_functions
+from dcegm.pre_processing import get_upper_envelope_function
+from dcegm.pre_processing import ModelFunctions
+from dcegm.pre_processing import partial_params_into_model_functions
+from dcegm.ragged_array import concatenate_ragged_arrays
+from dcegm.ragged_array import create_ragged_array
+from dcegm.ragged_array import get_padded_rows
+from dcegm.ragged_array import get_rows
+from dcegm.ragged_array import RaggedArray
 from dcegm.state_space import create_current_state_and_state_choice_objects
-from dcegm.state_space import create_state_choice_space
+from dcegm.state_space import create_period_padded_state_and_state_choice_objects
+from dcegm.state_space import create_state_choice_space_from_functions
+from dcegm.state_space import create_state_space_structure
+from dcegm.state_space import get_index_dtype
 from dcegm.state_space import get_map_from_state_to_child_nodes
+from dcegm.state_space import ModelStructure
+from dcegm.state_space import prune_unreachable_states
+from dcegm.state_space import StateSpace
+from dcegm.timing import create_timing_report
+from dcegm.timing import time_stage
+from jax import eval_shape
+from jax import jit
+from jax import lax
+from jax import numpy as jnp
 from jax import vmap
 
+MODEL_STRUCTURE_CACHE_SIZE = 8
+
 
 def solve_dcegm(
     params: pd.DataFrame,
@@ -31,61 +61,488 @@ def solve_dcegm(
     state_space_functions: Dict[str, Callable],
     final_period_solution: Callable,
     transition_function: Callable,
-) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    budget_table_function: Optional[Callable] = None,
+    period_solution_sink: Optional[Callable] = None,
+    model_structure: Optional[ModelStructure] = None,
+    previous_solution: Optional[Tuple[RaggedArray, RaggedArray, RaggedArray]] = None,
+    affected_periods: Optional[Sequence[int]] = None,
+    return_timings: bool = False,
+) -> Any:
     """Solve a discrete-continuous life-cycle model using the DC-EGM algorithm.
 
     Args:
         params (pd.DataFrame): Params DataFrame.
-        options (dict): Options dictionary.
+        options (dict): Options dictionary. All values must be hashable, as the
+            options are static arguments of the compiled functions.
         utility_functions (Dict[str, callable]): Dictionary of three user-supplied
             functions for computation of:
             (i) utility
             (ii) inverse marginal utility
             (iii) next period marginal utility
         budget_constraint (callable): Callable budget constraint.
-        state_space_functions (Dict[str, callable]): Dictionary of two user-supplied
+        state_space_functions (Dict[str, callable]): Dictionary of user-supplied
             functions to:
             (i) create the state space
-            (ii) get the state specific choice set
+            (ii) get the state specific choice set, or, under the key
+                "get_state_specific_choice_mask", the feasible choices of all
+                states as a boolean mask
+            (iii) optionally, under the key "get_next_period_state", get the next
+                period's state variables of all state-choice combinations
+            (iv) optionally, under the key "get_initial_states", get the states
+                the agents start in from the options. States that cannot be
+                reached with feasible choices are dropped from the state space.
+                Child states that are reached with zero probability are kept, as
+                the transition probabilities depend on the parameters.
         final_period_solution (callable): User-supplied function for solving the agent's
             last period.
         transition_function (callable): User-supplied function returning for each
             state a transition matrix vector.
+        budget_table_function (callable, optional): User-supplied function that
+            tabulates the inputs of the budget constraint which only depend on the
+            period and the income shock, e.g. the labor income. It is called once
+            per solve as ``budget_table_function(income_shock_draws, params_dict,
+            options)`` and returns an array, or a pytree of arrays, of shape
+            (n_periods, n_stochastic_quad_points). The budget constraint then
+            receives the column of its income shock, i.e. an array of shape
+            (n_periods,), as keyword argument ``budget_table`` and looks up the
+            entry of the period. If None, the budget constraint is called without
+            a table.
+        period_solution_sink (callable, optional): User-supplied function that
+            receives the solution of each period as soon as it is computed. It is
+            called as ``period_solution_sink(period, idx_state_choices, endog_grid,
+            policy, value)``, where ``idx_state_choices`` are the indices of the
+            period's state-choice combinations in the state-choice space and the
+            endogenous grid, policy and value function are
+            :class:`~dcegm.ragged_array.RaggedArray` with one row per state-choice
+            combination of the period. If provided, the solution is not collected
+            in memory and None is returned. Periods are passed in reverse order.
+        model_structure (ModelStructure, optional): The state space objects of the
+            model, e.g. loaded with :func:`dcegm.state_space.load_model_structure`.
+            By default, they are taken from :func:`get_model_structure`, which
+            creates them once per process for the same options and state space
+            functions. To also drop child states that are reached with zero
+            probability given ``params``, create them with
+            :func:`create_state_space_and_choice_objects` and the partialled
+            transition function, and pass the same model structure to
+            :func:`dcegm.solution_store.initialize_solution_store`.
+        previous_solution (tuple, optional): The endogenous grid, policy and value
+            function of a previous solution of the model with the same state space,
+            e.g. for different parameters. Requires ``affected_periods``.
+        affected_periods (Sequence[int], optional): The periods whose utility,
+            budget constraint or final period solution depend on the parameters
+            that differ from the ones of ``previous_solution``. The solution of all
+            periods after the last affected period is taken from
+            ``previous_solution`` and the backward induction resumes from the last
+            affected period. Parameters that enter all periods, e.g. the discount
+            factor, the interest rate or the taste and income shock scales, affect
+            all periods.
+        return_timings (bool): If True, the wall time of each stage of the backward
+            induction is measured in each period and returned alongside the
+            solution. Each stage waits until its arrays are computed, which slows
+            down the solution. Defaults to False.
+
+    If ``options["backwards_induction_scan"]`` is True, the recursion over periods
+    is compiled as a single ``jax.lax.scan`` (see :func:`backwards_induction_scan`),
+    unless the backward induction resumes from a previous solution. The refined
+    grids of the upper envelope inside the scan hold as many points as the upper
+    envelope can produce. To save memory, their length can be set to
+    ``options["upper_envelope_buffer_size_factor"]`` times the number of wealth
+    grid points. If the refined grid of a period has more points, the scan skips
+    all earlier periods and a ValueError is raised.
+
+    If ``options["precision"]`` is "float32", the model is solved and the solution
+    is stored in single precision. The upper envelope still computes the
+    intersections of the value function segments in double precision.
 
     Returns:
-        tuple:
+        tuple: None if ``period_solution_sink`` is provided. Otherwise
+
+        - endog_grid (RaggedArray): Ragged array with one row per state-choice
+            combination containing the refined endogenous grid.
+        - policy (RaggedArray): Ragged array with one row per state-choice
+            combination containing the choice-specific policy function.
+        - value (RaggedArray): Ragged array with one row per state-choice
+            combination containing the choice-specific value function.
+
+        If ``return_timings`` is True, a tuple of the above and a DataFrame with the
+        wall time of each stage of each period is returned. See
+        :func:`dcegm.timing.create_timing_report`.
+
+    """
+    if model_structure is None:
+        model_structure = get_model_structure(options, state_space_functions)
+
+    (
+        state_space_structure,
+        map_state_to_post_decision_child_nodes,
+    ) = model_structure
+
+    if previous_solution is None:
+        last_affected_period = None
+    elif affected_periods is None:
+        raise ValueError(
+            "The periods affected by the changed parameters must be given with a "
+            "previous solution."
+        )
+    elif (
+        previous_solution[0].lengths.shape[0]
+        != state_space_structure.state_choice_space.shape[0]
+    ):
+        raise ValueError(
+            "The previous solution does not match the state-choice space of the "
+            "model."
+        )
+    else:
+        affected_periods = np.asarray(affected_periods, dtype=int)
+        if affected_periods.size == 0:
+            raise ValueError(
+                "At least one period must be affected by the changed parameters."
+            )
+        if np.any((affected_periods < 0) | (affected_periods >= options["n_periods"])):
+            raise ValueError(
+                "The periods affected by the changed parameters must be between 0 "
+                f"and {options['n_periods'] - 1}."
+            )
+        last_affected_period = int(affected_periods.max())
+
+    timings = [] if return_timings else None
+
+    solution = solve_dcegm_given_state_space(
+        params=params,
+        options=options,
+        utility_functions=utility_functions,
+        budget_constraint=budget_constraint,
+        final_period_solution=final_period_solution,
+        transition_function=transition_function,
+        budget_table_function=budget_table_function,
+        state_space_structure=state_space_structure,
+        map_state_to_post_decision_child_nodes=map_state_to_post_decision_child_nodes,
+        period_solution_sink=period_solution_sink,
+        previous_solution=previous_solution,
+        last_affected_period=last_affected_period,
+        timings=timings,
+    )
+
+    if return_timings:
+        return solution, create_timing_report(timings)
+
+    return solution
+
+
+def solve_dcegm_batch(
+    params_list: List[pd.DataFrame],
+    options: Dict[str, int],
+    utility_functions: Dict[str, Callable],
+    budget_constraint: Callable,
+    state_space_functions: Dict[str, Callable],
+    final_period_solution: Callable,
+    transition_function: Callable,
+    budget_table_function: Optional[Callable] = None,
+) -> List[Tuple[RaggedArray, RaggedArray, RaggedArray]]:
+    """Solve a model for many parameter vectors in one vectorized call.
+
+    The state space, the state-choice space and the maps between them do not
+    depend on the parameters. They are taken from :func:`get_model_structure` and
+    shared by all solves, hence each solution has the same rows as the solution of
+    :func:`solve_dcegm`. The parameter vectors are stacked along a leading axis and
+    the backward induction, compiled as a single scan over periods as with
+    ``options["backwards_induction_scan"]``, is vectorized over this axis with
+    ``jax.vmap``. The compiled function is reused for batches of the same size.
+    The solutions of all parameter vectors are held in memory at once.
+
+    Args:
+        params_list (List[pd.DataFrame]): List of params DataFrames, which contain
+            the same parameters.
+        options (dict): Options dictionary. All values must be hashable, as the
+            options are static arguments of the compiled functions.
+        utility_functions (Dict[str, callable]): Dictionary of three user-supplied
+            functions for computation of:
+            (i) utility
+            (ii) inverse marginal utility
+            (iii) next period marginal utility
+        budget_constraint (callable): Callable budget constraint.
+        state_space_functions (Dict[str, callable]): Dictionary of user-supplied
+            functions to:
+            (i) create the state space
+            (ii) get the state specific choice set, or, under the key
+                "get_state_specific_choice_mask", the feasible choices of all
+                states as a boolean mask
+            (iii) optionally, under the key "get_next_period_state", get the next
+                period's state variables of all state-choice combinations
+            (iv) optionally, under the key "get_initial_states", get the states
+                the agents start in from the options. Unreachable states are
+                dropped from the state space.
+        final_period_solution (callable): User-supplied function for solving the agent's
+            last period.
+        transition_function (callable): User-supplied function returning for each
+            state a transition matrix vector.
+        budget_table_function (callable, optional): User-supplied function that
+            tabulates the inputs of the budget constraint by period and income
+            shock. See :func:`solve_dcegm`.
+
+    Returns:
+        list: List with the solution of each parameter vector, in the order of
+            ``params_list``. See :func:`solve_dcegm` for the solution of a single
+            parameter vector.
+
+    """
+    float_dtype = get_float_dtype(options)
+    params_dicts = [convert_params_to_dict(params) for params in params_list]
+    params_batch = {
+        key: jnp.asarray([params_dict[key] for params_dict in params_dicts]).astype(
+            float_dtype
+        )
+        for key in params_dicts[0]
+    }
+
+    (
+        state_space_structure,
+        map_state_to_post_decision_child_nodes,
+    ) = get_model_structure(options, state_space_functions)
+    (
+        idxs_state_choice_combs,
+        is_valid_state_choice_comb,
+        idxs_parent_states,
+        idxs_parent_states_period,
+        map_state_to_post_decision_child_nodes_period,
+        n_states_max,
+    ) = create_period_padded_state_and_state_choice_objects(
+        state_space_structure=state_space_structure,
+        map_state_to_post_decision_child_nodes=map_state_to_post_decision_child_nodes,
+    )
+
+    # The income shock draws scale with the standard deviation of the shocks.
+    standard_income_shock_draws, income_shock_weights = (
+        array.astype(float_dtype)
+        for array in quadrature_legendre(options["quadrature_points_stochastic"], 1)
+    )
+
+    final_period_solution_batch, solution_by_period_batch = solve_scan_batch(
+        params_batch,
+        state_space_structure.state_space,
+        (
+            state_space_structure.state_choice_space[idxs_state_choice_combs],
+            map_state_to_post_decision_child_nodes_period,
+            idxs_parent_states,
+            idxs_parent_states_period,
+        ),
+        standard_income_shock_draws,
+        income_shock_weights,
+        n_states_max=n_states_max,
+        model_functions=get_model_functions(
+            utility_functions,
+            budget_constraint,
+            transition_function,
+            user_budget_table_function=budget_table_function,
+        ),
+        options=freeze_options(options),
+        final_period_solution=final_period_solution,
+    )
+    final_period_solution_batch, solution_by_period_batch = (
+        tuple(np.asarray(array) for array in arrays)
+        for arrays in (final_period_solution_batch, solution_by_period_batch)
+    )
+
+    solutions = []
+    for idx_params in range(len(params_list)):
+        period_solutions = {}
+        _sink_scan_solution(
+            partial(collect_period_solution, period_solutions=period_solutions),
+            tuple(array[idx_params] for array in final_period_solution_batch),
+            tuple(array[idx_params] for array in solution_by_period_batch),
+            idxs_state_choice_combs=idxs_state_choice_combs,
+            is_valid_state_choice_comb=is_valid_state_choice_comb,
+        )
+        solutions.append(_concatenate_period_solutions(period_solutions))
+
+    return solutions
+
+
+def create_state_space_and_choice_objects(
+    options: Dict[str, int],
+    state_space_functions: Dict[str, Callable],
+    transition_vector_by_state: Optional[Callable] = None,
+) -> ModelStructure:
+    """Create the state space, the state-choice space and the maps between them.
+
+    If ``state_space_functions`` contains "get_initial_states", all states that
+    cannot be reached from the initial states are dropped.
+
+    Args:
+        options (dict): Options dictionary.
+        state_space_functions (Dict[str, callable]): Dictionary of user-supplied
+            functions to:
+            (i) create the state space
+            (ii) get the state specific choice set, or, under the key
+                "get_state_specific_choice_mask", the feasible choices of all
+                states as a boolean mask
+            (iii) optionally, under the key "get_next_period_state", get the next
+                period's state variables of all state-choice combinations
+            (iv) optionally, under the key "get_initial_states", get the states
+                the agents start in from the options. Unreachable states are
+                dropped from the state space.
+        transition_vector_by_state (callable, optional): Partialled transition
+            function that returns transition probabilities for a given state. If
+            given, child states that are reached with zero probability are not
+            considered reachable. As the transition probabilities depend on the
+            parameters, the pruned state space is then specific to them.
+
+    Returns:
+        ModelStructure: The state space objects of the model.
+
+    """
+    create_state_space = state_space_functions["create_state_space"]
+
+    state_space, map_state_to_state_space_index = create_state_space(options)
+    (
+        state_choice_space,
+        map_state_choice_vec_to_parent_state,
+    ) = create_state_choice_space_from_functions(
+        state_space, map_state_to_state_space_index, state_space_functions
+    )
+
+    map_state_to_post_decision_child_nodes = get_map_from_state_to_child_nodes(
+        state_space=state_space,
+        state_choice_space=state_choice_space,
+        map_state_to_index=map_state_to_state_space_index,
+        get_next_period_state=state_space_functions.get("get_next_period_state"),
+    )
+
+    if "get_initial_states" in state_space_functions:
+        if transition_vector_by_state is None:
+            transition_matrix = None
+        else:
+            transition_matrix = create_transition_matrix(
+                transition_vector_by_state, state_space
+            )
+
+        (
+            state_space,
+            map_state_to_state_space_index,
+            state_choice_space,
+            map_state_choice_vec_to_parent_state,
+            map_state_to_post_decision_child_nodes,
+        ) = prune_unreachable_states(
+            state_space=state_space,
+            state_choice_space=state_choice_space,
+            map_state_choice_vec_to_parent_state=map_state_choice_vec_to_parent_state,
+            map_state_to_post_decision_child_nodes=(
+                map_state_to_post_decision_child_nodes
+            ),
+            map_state_to_index=map_state_to_state_space_index,
+            initial_states=state_space_functions["get_initial_states"](options),
+            transition_matrix=transition_matrix,
+        )
+
+    state_space_structure = create_state_space_structure(
+        state_space=state_space,
+        state_choice_space=state_choice_space,
+        map_state_choice_vec_to_parent_state=map_state_choice_vec_to_parent_state,
+    )
+    map_state_to_post_decision_child_nodes = (
+        map_state_to_post_decision_child_nodes.astype(
+            get_index_dtype(state_space.shape[0])
+        )
+    )
+
+    return ModelStructure(
+        state_space_structure=state_space_structure,
+        map_state_to_post_decision_child_nodes=map_state_to_post_decision_child_nodes,
+    )
+
 
-        - endog_grid_container (np.ndarray): "Filled" 3d array containing the
-            endogenous grid for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        - policy_container (np.ndarray): "Filled" 3d array containing the
-            choice-specific policy function for each state and each discrete choice
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        - value_container (np.ndarray): "Filled" 3d array containing the
-            choice-specific value functions for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
+def get_model_structure(
+    options: Dict[str, Any], state_space_functions: Dict[str, Callable]
+) -> ModelStructure:
+    """Get the state space objects of a model, creating them only once per process.
+
+    The state space objects only depend on the options and the state space
+    functions. They are memoized with these as key, where functions are identified
+    by identity. The arrays of the returned model structure are shared between
+    calls and must not be modified.
+
+    Args:
+        options (dict): Options dictionary with hashable values.
+        state_space_functions (Dict[str, callable]): Dictionary of user-supplied
+            functions for the state space. See
+            :func:`create_state_space_and_choice_objects`.
+
+    Returns:
+        ModelStructure: The state space objects of the model.
 
     """
-    params_dict = convert_params_to_dict(params)
-    taste_shock_scale = params_dict["lambda"]
-    interest_rate = params_dict["interest_rate"]
-    discount_factor = params_dict["beta"]
+    return _create_model_structure_cached(
+        freeze_options(options), freeze_options(state_space_functions)
+    )
+
+
+@lru_cache(maxsize=MODEL_STRUCTURE_CACHE_SIZE)
+def _create_model_structure_cached(
+    options: Tuple[Tuple[str, Any], ...],
+    state_space_functions: Tuple[Tuple[str, Callable], ...],
+) -> ModelStructure:
+    model_structure = create_state_space_and_choice_objects(
+        dict(options), dict(state_space_functions)
+    )
+
+    for array in (
+        *model_structure.state_space_structure,
+        model_structure.map_state_to_post_decision_child_nodes,
+    ):
+        array.setflags(write=False)
+
+    return model_structure
+
+
+def solve_dcegm_given_state_space(
+    params: pd.DataFrame,
+    options: Dict[str, int],
+    utility_functions: Dict[str, Callable],
+    budget_constraint: Callable,
+    final_period_solution: Callable,
+    transition_function: Callable,
+    budget_table_function: Optional[Callable],
+    state_space_structure: StateSpace,
+    map_state_to_post_decision_child_nodes: np.ndarray,
+    period_solution_sink: Optional[Callable] = None,
+    previous_solution: Optional[Tuple[RaggedArray, RaggedArray, RaggedArray]] = None,
+    last_affected_period: Optional[int] = None,
+    timings: Optional[List[Tuple[Optional[int], str, float]]] = None,
+) -> Optional[Tuple[RaggedArray, RaggedArray, RaggedArray]]:
+    """Solve the model given the state space and state-choice objects.
+
+    See :func:`solve_dcegm` and :func:`create_state_space_and_choice_objects` for a
+    description of the arguments and return values.
+
+    """
+    # All floating point computations and the solution use the dtype of the
+    # chosen precision, as the parameters, grids and quadrature arrays share it.
+    float_dtype = get_float_dtype(options)
+    params_dict = {
+        key: jnp.asarray(value, dtype=float_dtype)
+        for key, value in convert_params_to_dict(params).items()
+    }
     max_wealth = params_dict["max_wealth"]
 
     n_periods = options["n_periods"]
     n_grid_wealth = options["grid_points_wealth"]
-    exogenous_savings_grid = np.linspace(0, max_wealth, n_grid_wealth)
+    exogenous_savings_grid = np.linspace(
+        0, max_wealth, n_grid_wealth, dtype=float_dtype
+    )
 
     # ToDo: Make interface with several draw possibilities.
     # ToDo: Some day make user supplied draw function.
-    income_shock_draws, income_shock_weights = quadrature_legendre(
-        options["quadrature_points_stochastic"], params_dict["sigma"]
+    income_shock_draws, income_shock_weights = (
+        array.astype(float_dtype)
+        for array in quadrature_legendre(
+            options["quadrature_points_stochastic"], params_dict["sigma"]
+        )
     )
 
     (
         compute_utility,
         compute_marginal_utility,
-        compute_inverse_marginal_utility,
+        _compute_inverse_marginal_utility,
         compute_value,
         compute_next_period_wealth,
         compute_upper_envelope,
@@ -97,26 +554,18 @@ def solve_dcegm(
         user_budget_constraint=budget_constraint,
         exogenous_transition_function=transition_function,
     )
-    create_state_space = state_space_functions["create_state_space"]
-
-    state_space, map_state_to_state_space_index = create_state_space(options)
-    (
-        state_choice_space,
-        map_state_choice_vec_to_parent_state,
-        reshape_state_choice_vec_to_mat,
-        transform_between_state_and_state_choice_space,
-    ) = create_state_choice_space(
-        state_space,
-        map_state_to_state_space_index,
-        state_space_functions["get_state_specific_choice_set"],
+    model_functions = get_model_functions(
+        utility_functions,
+        budget_constraint,
+        transition_function,
+        user_budget_table_function=budget_table_function,
     )
-
-    map_state_to_post_decision_child_nodes = get_map_from_state_to_child_nodes(
-        state_space=state_space,
-        state_choice_space=state_choice_space,
-        map_state_to_index=map_state_to_state_space_index,
+    budget_table = calc_budget_table(
+        income_shock_draws, params_dict, options, model_functions=model_functions
     )
-
+    transition_matrix = create_transition_matrix(
+        transition_vector_by_state, state_space_structure.state_space.astype(int)
+    ).astype(float_dtype)
     final_period_solution_partial = partial(
         final_period_solution,
         params_dict=params_dict,
@@ -125,92 +574,91 @@ def solve_dcegm(
         compute_marginal_utility=compute_marginal_utility,
     )
 
-    endog_grid_container, policy_container, value_container = create_multi_dim_arrays(
-        state_choice_space, options
-    )
+    if period_solution_sink is None:
+        period_solutions = {}
+        sink = partial(collect_period_solution, period_solutions=period_solutions)
+    else:
+        sink = period_solution_sink
 
-    endog_grid_container, policy_container, value_container = backwards_induction(
-        map_state_choice_vec_to_parent_state=map_state_choice_vec_to_parent_state,
-        reshape_state_choice_vec_to_mat=reshape_state_choice_vec_to_mat,
-        transform_between_state_and_state_choice_space=transform_between_state_and_state_choice_space,
-        endog_grid_container=endog_grid_container,
-        policy_container=policy_container,
-        value_container=value_container,
+    if previous_solution is not None:
+        solve_backwards = partial(
+            backwards_induction,
+            previous_solution=previous_solution,
+            last_affected_period=last_affected_period,
+        )
+    elif options.get("backwards_induction_scan", False):
+        solve_backwards = backwards_induction_scan
+    else:
+        solve_backwards = backwards_induction
+
+    solve_backwards(
+        state_space_structure=state_space_structure,
+        period_solution_sink=sink,
         exogenous_savings_grid=exogenous_savings_grid,
-        state_space=state_space,
-        state_choice_space=state_choice_space,
         map_state_to_post_decision_child_nodes=map_state_to_post_decision_child_nodes,
+        transition_matrix=transition_matrix,
         income_shock_draws=income_shock_draws,
         income_shock_weights=income_shock_weights,
+        budget_table=budget_table,
         n_periods=n_periods,
-        taste_shock_scale=taste_shock_scale,
-        discount_factor=discount_factor,
-        interest_rate=interest_rate,
-        compute_marginal_utility=compute_marginal_utility,
-        compute_inverse_marginal_utility=compute_inverse_marginal_utility,
+        params_dict=params_dict,
+        options=options,
+        model_functions=model_functions,
         compute_value=compute_value,
         compute_next_period_wealth=compute_next_period_wealth,
-        transition_vector_by_state=transition_vector_by_state,
         compute_upper_envelope=compute_upper_envelope,
         final_period_solution_partial=final_period_solution_partial,
+        timings=timings,
     )
 
-    # TODO: finalize output containers
+    if period_solution_sink is not None:
+        return None
 
-    return endog_grid_container, policy_container, value_container
+    return _concatenate_period_solutions(period_solutions)
 
 
 def backwards_induction(
-    map_state_choice_vec_to_parent_state: np.ndarray,
-    reshape_state_choice_vec_to_mat: np.ndarray,
-    transform_between_state_and_state_choice_space: np.ndarray,
-    endog_grid_container: np.ndarray,
-    policy_container: np.ndarray,
-    value_container: np.ndarray,
+    state_space_structure: StateSpace,
+    period_solution_sink: Callable,
     exogenous_savings_grid: np.ndarray,
-    state_space: np.ndarray,
-    state_choice_space,
     map_state_to_post_decision_child_nodes: np.ndarray,
+    transition_matrix: np.ndarray,
     income_shock_draws: np.ndarray,
     income_shock_weights: np.ndarray,
+    budget_table: Optional[Any],
     n_periods: int,
-    taste_shock_scale: float,
-    discount_factor: float,
-    interest_rate: float,
-    compute_marginal_utility: Callable,
-    compute_inverse_marginal_utility: Callable,
+    params_dict: dict,
+    options: Dict[str, int],
+    model_functions: ModelFunctions,
     compute_value: Callable,
     compute_next_period_wealth: Callable,
-    transition_vector_by_state: Callable,
     compute_upper_envelope: Callable,
     final_period_solution_partial: Callable,
-) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    timings: Optional[List[Tuple[Optional[int], str, float]]] = None,
+    previous_solution: Optional[Tuple[RaggedArray, RaggedArray, RaggedArray]] = None,
+    last_affected_period: Optional[int] = None,
+) -> None:
     """Do backwards induction and solve for optimal policy and value function.
 
+    Only the objects of the current and the next period are kept in memory. The
+    solution of each period is handed to ``period_solution_sink`` as soon as it is
+    computed.
+
+    If ``previous_solution`` is given, the solution of the periods after
+    ``last_affected_period`` is taken from it. The previous solution of the period
+    after the last affected one is interpolated to resume the backward induction.
+    The final period is always solved, as it does not require the Euler equation.
+
     Args:
-        endog_grid_container (np.ndarray): "Empty" 3d np.ndarray storing the
-            endogenous grid for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        policy_container (np.ndarray): "Empty" 3d np.ndarray storing the
-            choice-specific policy function for each state and each discrete choice
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        value_container (np.ndarray): "Empty" 3d np.ndarray storing the
-            choice-specific value functions for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
+        state_space_structure (StateSpace): The state space, the state-choice
+            space, the map from state-choice combinations to their parent states
+            and the period blocks of the spaces. The objects of each period are
+            sliced from it.
+        period_solution_sink (Callable): Function that receives the solution of a
+            period as ``period_solution_sink(period, idx_state_choices, endog_grid,
+            policy, value)``.
         exogenous_savings_grid (np.ndarray): 1d array of shape (n_grid_wealth,)
             containing the exogenous savings grid.
-        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
-            which serves as a collection of all possible states. By convention,
-            the first column must contain the period and the last column the
-            exogenous processes. Any other state variables are in between.
-            E.g. if the two state variables are period and lagged choice and all choices
-            are admissible in each period, the shape of the state space array is
-            (n_periods * n_choices, 3).
-        state_choice_space (np.ndarray): 2d array of shape
-            (n_feasible_states, n_state_and_exog_variables + 1) containing all
-            feasible state-choice combinations. By convention, the second to last
-            column contains the exogenous process. The last column always contains the
-            choice to be made (which is not a state variable).
         map_state_to_index (np.ndarray): Indexer array that maps states to indexes.
             The shape of this object is quite complicated. For each state variable it
             has the number of possible states as rows, i.e.
@@ -219,20 +667,22 @@ def backwards_induction(
             (n_feasible_state_choice_combs, n_choices * n_exog_processes)
             containing indices of all child nodes the agent can reach
             from any given state.
+        transition_matrix (np.ndarray): 2d array of shape
+            (n_states, n_exog_processes) containing for each state the transition
+            probabilities of the exogenous processes.
         income_shock_draws (np.ndarray): 1d array of shape (n_quad_points,)
             containing the Hermite quadrature points.
         income_shock_weights (np.ndarrray): 1d array of shape
             (n_stochastic_quad_points) with weights for each stoachstic shock draw.
+        budget_table (Any): The inputs of the budget constraint by period and
+            income shock. See :func:`calc_budget_table`.
         n_periods (int): Number of periods.
-        taste_shock_scale (float): The taste shock scale.
-        discount_factor (float): The discount factor.
-        interest_rate (float): The interest rate of capital.
-        compute_marginal_utility (callable): User-defined function to compute the
-            agent's marginal utility. The input ```params``` is already partialled
-            in.
-        compute_inverse_marginal_utility (Callable): Function for calculating the
-            inverse marginal utiFality, which takes the marginal utility as only
-             input.
+        params_dict (dict): Dictionary containing model parameters. It is passed as
+            traced argument to the jitted functions of each period.
+        options (dict): Options dictionary. It is passed as static argument to the
+            jitted functions of each period.
+        model_functions (ModelFunctions): The user-supplied functions without
+            parameters partialled in.
         compute_value (callable): Function for calculating the value from
             consumption level, discrete choice and expected value. The inputs
             ```discount_rate``` and ```compute_utility``` are already partialled in.
@@ -240,162 +690,1034 @@ def backwards_induction(
             agent's wealth of the next period (t + 1). The inputs
             ```saving```, ```shock```, ```params``` and ```options```
             are already partialled in.
-        transition_vector_by_state (Callable): Partialled transition function return
-            transition vector for each state.
         compute_upper_envelope (Callable): Function for calculating the upper
-            envelope of the policy and value function. If the number of discrete
-            choices is 1, this function is a dummy function that returns the policy
-            and value function as is, without performing a fast upper envelope scan.
+            envelope of the policy and value function for all state-choice
+            combinations of a period. It returns the refined endogenous grid, policy
+            and value function as ragged arrays. If the number of discrete choices
+            is 1, this function is a dummy function that returns the policy and
+            value function as is, without performing a fast upper envelope scan.
         final_period_partial (Callable): Partialled function for calculating the
             consumption as well as value function and marginal utility in the final
             period.
-
-    Returns:
-        tuple:
-
-        - endog_grid_container (np.ndarray): "Filled" 3d array containing the
-            endogenous grid for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        - policy_container (np.ndarray): "Filled" 3d array containing the
-            choice-specific policy function for each state and each discrete choice
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
-        - value_container (np.ndarray): "Filled" 3d array containing the
-            choice-specific value functions for each state and each discrete choice.
-            Has shape [n_states, n_discrete_choices, 1.1 * n_grid_wealth].
+        timings (list, optional): List to which the period, the name and the wall
+            time of each stage are appended. If None, no time is measured.
+        previous_solution (tuple, optional): The endogenous grid, policy and value
+            function of a previous solution with the same state-choice space.
+        last_affected_period (int, optional): The last period whose solution is not
+            taken from ``previous_solution``.
 
     """
-    # Calculate beginning of period resources for all periods, given exogenous savings
-    # and income shocks from last period
-    resources_beginning_of_period = vmap(
-        vmap(
-            vmap(compute_next_period_wealth, in_axes=(None, None, 0)),
-            in_axes=(None, 0, None),
-        ),
-        in_axes=(0, None, None),
-    )(state_space, exogenous_savings_grid, income_shock_draws)
+    options_frozen = freeze_options(options)
+    if previous_solution is None:
+        last_affected_period = n_periods - 1
 
     (
         idxs_state_choice_combs_final_period,
         state_choice_combs_final_period,
-        endog_grid_final_period,
-        reshape_current_state_choice_vec_to_mat,
-        transform_between_state_and_state_choice_vec,
+        idxs_parent_states,
+        n_states_period,
     ) = create_current_state_and_state_choice_objects(
-        period=n_periods - 1,
-        state_space=state_space,
-        state_choice_space=state_choice_space,
-        resources_beginning_of_period=resources_beginning_of_period,
-        map_state_choice_vec_to_parent_state=map_state_choice_vec_to_parent_state,
-        reshape_state_choice_vec_to_mat=reshape_state_choice_vec_to_mat,
-        transform_between_state_and_state_choice_space=transform_between_state_and_state_choice_space,
+        period=n_periods - 1, state_space_structure=state_space_structure
+    )
+    state_choice_combs_final_period = state_choice_combs_final_period.astype(int)
+    # Beginning of period resources of each state-choice combination, given
+    # exogenous savings and income shocks from last period
+    endog_grid_final_period = time_stage(
+        timings,
+        n_periods - 1,
+        "resources",
+        calc_resources_beginning_of_period,
+        state_choice_combs_final_period[:, :-1],
+        exogenous_savings_grid,
+        income_shock_draws,
+        compute_next_period_wealth,
+        budget_table,
     )
 
     (
         value_interpolated,
         policy_final_period,
         marg_util_interpolated,
-    ) = solve_final_period(
+    ) = time_stage(
+        timings,
+        n_periods - 1,
+        "final_period",
+        solve_final_period,
         final_period_choice_states=state_choice_combs_final_period,
         final_period_solution_partial=final_period_solution_partial,
         resources_last_period=endog_grid_final_period,
     )
 
-    (
-        value_container,
-        endog_grid_container,
-        policy_container,
-    ) = save_final_period_solution(
-        endog_grid_container=endog_grid_container,
-        policy_container=policy_container,
-        value_container=value_container,
-        idx_state_choices_final_period=idxs_state_choice_combs_final_period,
+    endog_grid, policy, value = select_final_period_solution(
         endog_grid_final_period=endog_grid_final_period,
         policy_final_period=policy_final_period,
         value_final_period=value_interpolated,
         num_income_shock_draws=income_shock_draws.shape[0],
-        num_wealth_grid_points=exogenous_savings_grid.shape[0],
+    )
+    n_grid = np.full(endog_grid.shape[0], endog_grid.shape[1])
+    period_solution_sink(
+        n_periods - 1,
+        idxs_state_choice_combs_final_period,
+        create_ragged_array(endog_grid, n_grid),
+        create_ragged_array(policy, n_grid),
+        create_ragged_array(value, n_grid),
     )
 
     for period in range(n_periods - 2, -1, -1):
-        # Aggregate the marginal utilities and expected values over all choices and
-        # income shock draws
-        marg_util, emax = aggregate_marg_utils_exp_values(
-            value_state_choice_specific=value_interpolated,
-            marg_util_state_choice_specific=marg_util_interpolated,
-            reshape_state_choice_vec_to_mat=reshape_current_state_choice_vec_to_mat,
-            transform_between_state_and_state_choice_vec=transform_between_state_and_state_choice_vec,
-            taste_shock_scale=taste_shock_scale,
-            income_shock_weights=income_shock_weights,
-        )
-
         (
             idx_state_choices_period,
             state_choices_period,
-            resources_period,
-            reshape_current_state_choice_vec_to_mat,
-            transform_between_state_and_state_choice_vec,
+            idxs_parent_states_period,
+            n_states_current_period,
         ) = create_current_state_and_state_choice_objects(
-            period=period,
+            period=period, state_space_structure=state_space_structure
+        )
+
+        if period > last_affected_period:
+            endog_grid, policy, value = (
+                get_rows(ragged, idx_state_choices_period)
+                for ragged in previous_solution
+            )
+        else:
+            # Aggregate the marginal utilities and expected values over all choices
+            # and income shock draws
+            marg_util, emax = time_stage(
+                timings,
+                period,
+                "aggregate",
+                aggregate_marg_utils_exp_values,
+                value_state_choice_specific=value_interpolated,
+                marg_util_state_choice_specific=marg_util_interpolated,
+                idxs_parent_states=idxs_parent_states,
+                n_states=n_states_period,
+                taste_shock_scale=params_dict["lambda"],
+                income_shock_weights=income_shock_weights,
+            )
+
+            (
+                endog_grid_candidate,
+                value_candidate,
+                policy_candidate,
+                expected_values,
+            ) = time_stage(
+                timings,
+                period,
+                "euler_equation",
+                calculate_candidate_solutions_period,
+                marg_util,
+                emax,
+                state_choices_period,
+                map_state_to_post_decision_child_nodes[idx_state_choices_period],
+                transition_matrix[
+                    state_space_structure.map_state_choice_vec_to_parent_state[
+                        idx_state_choices_period
+                    ]
+                ],
+                exogenous_savings_grid,
+                params_dict,
+                model_functions=model_functions,
+            )
+
+            # Run upper envolope to remove suboptimal candidates. The intersections
+            # of the value function segments are computed in double precision.
+            endog_grid, policy, value = time_stage(
+                timings,
+                period,
+                "upper_envelope",
+                compute_upper_envelope,
+                endog_grid=np.asarray(endog_grid_candidate, dtype=np.float64),
+                policy=np.asarray(policy_candidate, dtype=np.float64),
+                value=np.asarray(value_candidate, dtype=np.float64),
+                expected_value_zero_savings=np.asarray(
+                    expected_values[:, 0], dtype=np.float64
+                ),
+                choices=state_choices_period[:, -1].astype(int),
+                exog_grid=np.asarray(exogenous_savings_grid, dtype=np.float64),
+                compute_value=compute_value,
+            )
+            endog_grid, policy, value = (
+                ragged._replace(
+                    data=np.asarray(ragged.data, dtype=exogenous_savings_grid.dtype)
+                )
+                for ragged in (endog_grid, policy, value)
+            )
+
+        # Only the solution of the period after the last affected one is needed to
+        # resume the backward induction.
+        if period <= last_affected_period + 1:
+            # The number of refined points differs across periods and parameters.
+            # Pad the refined arrays to a multiple of the grid size, so that the
+            # compiled interpolation is reused.
+            marg_util_interpolated, value_interpolated = time_stage(
+                timings,
+                period,
+                "interpolate",
+                interpolate_period,
+                state_choices_period,
+                idxs_parent_states_period,
+                *_pad_rows_to_multiple(
+                    (endog_grid, policy, value),
+                    multiple=exogenous_savings_grid.shape[0],
+                ),
+                endog_grid.lengths,
+                exogenous_savings_grid,
+                income_shock_draws,
+                budget_table,
+                params_dict,
+                n_states=n_states_current_period,
+                model_functions=model_functions,
+                options=options_frozen,
+            )
+        idxs_parent_states = idxs_parent_states_period
+        n_states_period = n_states_current_period
+
+        period_solution_sink(
+            period, idx_state_choices_period, endog_grid, policy, value
+        )
+
+
+def backwards_induction_scan(
+    state_space_structure: StateSpace,
+    period_solution_sink: Callable,
+    exogenous_savings_grid: np.ndarray,
+    map_state_to_post_decision_child_nodes: np.ndarray,
+    transition_matrix: np.ndarray,
+    income_shock_draws: np.ndarray,
+    income_shock_weights: np.ndarray,
+    budget_table: Optional[Any],
+    n_periods: int,
+    params_dict: dict,
+    options: Dict[str, int],
+    model_functions: ModelFunctions,
+    compute_value: Callable,
+    compute_next_period_wealth: Callable,
+    compute_upper_envelope: Callable,
+    final_period_solution_partial: Callable,
+    timings: Optional[List[Tuple[Optional[int], str, float]]] = None,
+) -> None:
+    """Do backwards induction as a single scan over periods.
+
+    The state-choice objects of each period are padded to a common shape and
+    stacked along a leading period axis. The recursion over all periods but the
+    last one is expressed as one ``jax.lax.scan``, which is compiled once and runs
+    without any Python dispatch or transfer to the host in between periods. The
+    upper envelope is computed with the JAX implementation of the fast upper
+    envelope scan. The solution of each period is handed to
+    ``period_solution_sink`` after the scan has finished.
+
+    The arguments are the same as in :func:`backwards_induction`, except for
+    ``compute_upper_envelope``, which refines the candidate solution of a single
+    state-choice combination and is traceable by JAX. As all periods but the last
+    one are solved in a single call, their stages are timed together as one stage
+    without period.
+
+    """
+    (
+        idxs_state_choice_combs,
+        is_valid_state_choice_comb,
+        idxs_parent_states,
+        idxs_parent_states_period,
+        map_state_to_post_decision_child_nodes_period,
+        n_states_max,
+    ) = create_period_padded_state_and_state_choice_objects(
+        state_space_structure=state_space_structure,
+        map_state_to_post_decision_child_nodes=map_state_to_post_decision_child_nodes,
+    )
+    state_choices_period = state_space_structure.state_choice_space[
+        idxs_state_choice_combs
+    ]
+    state_choices_final_period = state_choices_period[-1].astype(int)
+    resources_final_period = time_stage(
+        timings,
+        n_periods - 1,
+        "resources",
+        calc_resources_beginning_of_period,
+        state_choices_final_period[:, :-1],
+        exogenous_savings_grid,
+        income_shock_draws,
+        compute_next_period_wealth,
+        budget_table,
+    )
+    transition_probs_period = jnp.take(transition_matrix, idxs_parent_states, axis=0)
+
+    (
+        value_interpolated,
+        policy_final_period,
+        marg_util_interpolated,
+    ) = time_stage(
+        timings,
+        n_periods - 1,
+        "final_period",
+        solve_final_period,
+        final_period_choice_states=state_choices_final_period,
+        final_period_solution_partial=final_period_solution_partial,
+        resources_last_period=resources_final_period,
+    )
+
+    solution_final_period = select_final_period_solution(
+        endog_grid_final_period=resources_final_period,
+        policy_final_period=policy_final_period,
+        value_final_period=value_interpolated,
+        num_income_shock_draws=income_shock_draws.shape[0],
+    )
+
+    marg_util, emax = time_stage(
+        timings,
+        n_periods - 2,
+        "aggregate",
+        aggregate_marg_utils_exp_values,
+        value_state_choice_specific=value_interpolated,
+        marg_util_state_choice_specific=marg_util_interpolated,
+        idxs_parent_states=idxs_parent_states_period[-1],
+        n_states=n_states_max,
+        taste_shock_scale=params_dict["lambda"],
+        income_shock_weights=income_shock_weights,
+    )
+
+    _, solution_by_period = time_stage(
+        timings,
+        None,
+        "solve_periods_scan",
+        solve_periods_scan,
+        marg_util,
+        emax,
+        (
+            state_choices_period[:-1],
+            map_state_to_post_decision_child_nodes_period[:-1],
+            transition_probs_period[:-1],
+            idxs_parent_states_period[:-1],
+        ),
+        exogenous_savings_grid,
+        income_shock_draws,
+        income_shock_weights,
+        budget_table,
+        params_dict,
+        n_states_max=n_states_max,
+        model_functions=model_functions,
+        options=freeze_options(options),
+        compute_upper_envelope=compute_upper_envelope,
+    )
+
+    _sink_scan_solution(
+        period_solution_sink,
+        tuple(np.asarray(array) for array in solution_final_period),
+        tuple(np.asarray(array) for array in solution_by_period),
+        idxs_state_choice_combs=idxs_state_choice_combs,
+        is_valid_state_choice_comb=is_valid_state_choice_comb,
+    )
+
+
+@partial(
+    jit,
+    static_argnames=(
+        "n_states_max",
+        "model_functions",
+        "options",
+        "final_period_solution",
+    ),
+)
+def solve_scan_batch(
+    params_batch: dict,
+    state_space: jnp.ndarray,
+    period_objects: Tuple[jnp.ndarray, ...],
+    standard_income_shock_draws: jnp.ndarray,
+    income_shock_weights: jnp.ndarray,
+    n_states_max: int,
+    model_functions: ModelFunctions,
+    options: Tuple[Tuple[str, Any], ...],
+    final_period_solution: Callable,
+) -> Tuple[Tuple[jnp.ndarray, ...], Tuple[jnp.ndarray, ...]]:
+    """Solve all periods for a batch of parameter vectors.
+
+    The backward induction is expressed as a pure function of the parameters,
+    which solves the final period and then all other periods with
+    :func:`solve_periods_scan`. It is vectorized over the leading axis of the
+    parameters.
+
+    Args:
+        params_batch (dict): Dictionary containing model parameters. Each value is
+            a 1d array of shape (n_params,) with the value of the parameter in each
+            parameter vector.
+        state_space (jnp.ndarray): 2d array of shape
+            (n_states, n_state_and_exog_variables) containing all states.
+        period_objects (tuple): Tuple of the state-choice combinations, the child
+            nodes, the parent states and the parent states as index of the period's
+            states of each period, stacked along a leading period axis. See
+            :func:`create_period_padded_state_and_state_choice_objects`.
+        standard_income_shock_draws (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points,) containing the income shock draws for a
+            standard deviation of one.
+        income_shock_weights (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points) with weights for each stochastic shock draw.
+        n_states_max (int): Maximum number of states in a period.
+        model_functions (ModelFunctions): The user-supplied functions without
+            parameters partialled in.
+        options (tuple): The frozen options dictionary.
+        final_period_solution (callable): User-supplied function for solving the
+            agent's last period.
+
+    Returns:
+        tuple:
+
+        - final_period_solution (tuple): The endogenous grid, policy and value
+            function of the padded state-choice combinations of the final period,
+            stacked along a leading parameter axis.
+        - solution_by_period (tuple): The refined endogenous grid, policy and value
+            function and the number of refined points of all other periods, stacked
+            along a leading parameter and period axis.
+
+    """
+    return vmap(
+        partial(
+            _solve_scan_given_params,
             state_space=state_space,
-            state_choice_space=state_choice_space,
-            resources_beginning_of_period=resources_beginning_of_period,
-            map_state_choice_vec_to_parent_state=map_state_choice_vec_to_parent_state,
-            reshape_state_choice_vec_to_mat=reshape_state_choice_vec_to_mat,
-            transform_between_state_and_state_choice_space=transform_between_state_and_state_choice_space,
+            period_objects=period_objects,
+            standard_income_shock_draws=standard_income_shock_draws,
+            income_shock_weights=income_shock_weights,
+            n_states_max=n_states_max,
+            model_functions=model_functions,
+            options=options,
+            final_period_solution=final_period_solution,
+        )
+    )(params_batch)
+
+
+def _solve_scan_given_params(
+    params_dict: dict,
+    state_space: jnp.ndarray,
+    period_objects: Tuple[jnp.ndarray, ...],
+    standard_income_shock_draws: jnp.ndarray,
+    income_shock_weights: jnp.ndarray,
+    n_states_max: int,
+    model_functions: ModelFunctions,
+    options: Tuple[Tuple[str, Any], ...],
+    final_period_solution: Callable,
+) -> Tuple[Tuple[jnp.ndarray, ...], Tuple[jnp.ndarray, ...]]:
+    options_dict = dict(options)
+    (
+        state_choices_period,
+        map_state_to_post_decision_child_nodes_period,
+        idxs_parent_states,
+        idxs_parent_states_period,
+    ) = period_objects
+
+    exogenous_savings_grid = jnp.linspace(
+        0, params_dict["max_wealth"], options_dict["grid_points_wealth"]
+    ).astype(params_dict["max_wealth"].dtype)
+    income_shock_draws = standard_income_shock_draws * params_dict["sigma"]
+    budget_table = calc_budget_table(
+        income_shock_draws, params_dict, options_dict, model_functions=model_functions
+    )
+
+    (
+        compute_utility,
+        compute_marginal_utility,
+        _compute_inverse_marginal_utility,
+        _compute_value,
+        transition_vector_by_state,
+    ) = partial_params_into_model_functions(params_dict, model_functions)
+    transition_matrix = create_transition_matrix(
+        transition_vector_by_state, state_space.astype(int)
+    ).astype(exogenous_savings_grid.dtype)
+
+    state_choices_final_period = state_choices_period[-1].astype(int)
+    resources_final_period = calc_resources_beginning_of_period(
+        state_choices_final_period[:, :-1],
+        exogenous_savings_grid,
+        income_shock_draws,
+        partial(
+            model_functions.budget_constraint,
+            params_dict=params_dict,
+            options=options_dict,
+        ),
+        budget_table,
+    )
+    (
+        value_interpolated,
+        policy_final_period,
+        marg_util_interpolated,
+    ) = solve_final_period(
+        final_period_choice_states=state_choices_final_period,
+        final_period_solution_partial=partial(
+            final_period_solution,
+            params_dict=params_dict,
+            options=options_dict,
+            compute_utility=compute_utility,
+            compute_marginal_utility=compute_marginal_utility,
+        ),
+        resources_last_period=resources_final_period,
+    )
+    solution_final_period = select_final_period_solution(
+        endog_grid_final_period=resources_final_period,
+        policy_final_period=policy_final_period,
+        value_final_period=value_interpolated,
+        num_income_shock_draws=income_shock_draws.shape[0],
+    )
+
+    marg_util, emax = aggregate_marg_utils_exp_values(
+        value_state_choice_specific=value_interpolated,
+        marg_util_state_choice_specific=marg_util_interpolated,
+        idxs_parent_states=idxs_parent_states_period[-1],
+        n_states=n_states_max,
+        taste_shock_scale=params_dict["lambda"],
+        income_shock_weights=income_shock_weights,
+    )
+
+    _, solution_by_period = solve_periods_scan(
+        marg_util,
+        emax,
+        (
+            state_choices_period[:-1],
+            map_state_to_post_decision_child_nodes_period[:-1],
+            jnp.take(transition_matrix, idxs_parent_states[:-1], axis=0),
+            idxs_parent_states_period[:-1],
+        ),
+        exogenous_savings_grid,
+        income_shock_draws,
+        income_shock_weights,
+        budget_table,
+        params_dict,
+        n_states_max=n_states_max,
+        model_functions=model_functions,
+        options=options,
+        compute_upper_envelope=get_upper_envelope_function(
+            {**options_dict, "backwards_induction_scan": True}
+        ),
+    )
+
+    return solution_final_period, solution_by_period
+
+
+def _sink_scan_solution(
+    period_solution_sink: Callable,
+    final_period_solution: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    solution_by_period: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    idxs_state_choice_combs: np.ndarray,
+    is_valid_state_choice_comb: np.ndarray,
+) -> None:
+    endog_grid_period, policy_period, value_period, n_grid_period = solution_by_period
+
+    is_overflow_period = np.any(n_grid_period > endog_grid_period.shape[2], axis=1)
+    if np.any(is_overflow_period):
+        raise ValueError(
+            "The refined endogenous grid of period "
+            f"{np.flatnonzero(is_overflow_period).max()} has more points than the "
+            "upper envelope inside the scan over periods can hold. Increase or "
+            "remove options['upper_envelope_buffer_size_factor']."
+        )
+
+    n_periods = is_valid_state_choice_comb.shape[0]
+    is_valid = is_valid_state_choice_comb[-1]
+    n_grid = np.full(is_valid.sum(), final_period_solution[0].shape[1])
+    period_solution_sink(
+        n_periods - 1,
+        idxs_state_choice_combs[-1][is_valid],
+        *(
+            create_ragged_array(array[is_valid], n_grid)
+            for array in final_period_solution
+        ),
+    )
+
+    for period in range(n_periods - 2, -1, -1):
+        is_valid = is_valid_state_choice_comb[period]
+        period_solution_sink(
+            period,
+            idxs_state_choice_combs[period][is_valid],
+            *(
+                create_ragged_array(
+                    array[period][is_valid], n_grid_period[period][is_valid]
+                )
+                for array in (endog_grid_period, policy_period, value_period)
+            ),
+        )
+
+
+def _concatenate_period_solutions(
+    period_solutions: Dict[int, Tuple[RaggedArray, RaggedArray, RaggedArray]]
+) -> Tuple[RaggedArray, RaggedArray, RaggedArray]:
+    return tuple(
+        concatenate_ragged_arrays(
+            [period_solutions[period][i] for period in range(len(period_solutions))]
+        )
+        for i in range(3)
+    )
+
+
+@partial(
+    jit,
+    static_argnames=(
+        "n_states_max",
+        "model_functions",
+        "options",
+        "compute_upper_envelope",
+    ),
+)
+def solve_periods_scan(
+    marg_util: jnp.ndarray,
+    emax: jnp.ndarray,
+    period_objects: Tuple[jnp.ndarray, ...],
+    exogenous_savings_grid: jnp.ndarray,
+    income_shock_draws: jnp.ndarray,
+    income_shock_weights: jnp.ndarray,
+    budget_table: Optional[Any],
+    params_dict: dict,
+    n_states_max: int,
+    model_functions: ModelFunctions,
+    options: Tuple[Tuple[str, Any], ...],
+    compute_upper_envelope: Callable,
+) -> Tuple[Tuple[jnp.ndarray, jnp.ndarray], Tuple[jnp.ndarray, ...]]:
+    """Solve all periods but the last one in a single scan over periods.
+
+    Args:
+        marg_util (jnp.ndarray): 2d array of shape (n_states_max, n_grid_wealth)
+            containing the marginal utilities of the last period's states.
+        emax (jnp.ndarray): 2d array of shape (n_states_max, n_grid_wealth)
+            containing the expected maximum values of the last period's states.
+        period_objects (tuple): Tuple of the state-choice combinations, the child
+            nodes, the transition probabilities of the exogenous processes and the
+            parent states of each period, stacked along a leading period axis.
+        exogenous_savings_grid (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the exogenous savings grid.
+        income_shock_draws (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points,) containing the income shock draws.
+        income_shock_weights (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points) with weights for each stochastic shock draw.
+        budget_table (Any): The inputs of the budget constraint by period and
+            income shock. See :func:`calc_budget_table`.
+        params_dict (dict): Dictionary containing model parameters.
+        n_states_max (int): Maximum number of states in a period.
+        model_functions (ModelFunctions): The user-supplied functions without
+            parameters partialled in.
+        options (tuple): The frozen options dictionary.
+        compute_upper_envelope (Callable): JAX implementation of the upper envelope
+            for a single state-choice combination.
+
+    Returns:
+        tuple:
+
+        - carry (tuple): The marginal utilities and expected maximum values of the
+            states of the first period and whether the refined grid of any period
+            has more points than the upper envelope can hold. The periods before
+            the first such period are not solved.
+        - solution_by_period (tuple): The refined endogenous grid, policy and value
+            function and the number of refined points of each period, stacked along
+            a leading period axis.
+
+    """
+    (
+        _compute_utility,
+        _compute_marginal_utility,
+        _compute_inverse_marginal_utility,
+        compute_value,
+        _transition_vector_by_state,
+    ) = partial_params_into_model_functions(params_dict, model_functions)
+
+    buffer_size_factor = dict(options).get("upper_envelope_buffer_size_factor")
+    if buffer_size_factor is None:
+        n_refined_max = None
+    else:
+        n_refined_max = int(buffer_size_factor * exogenous_savings_grid.shape[0])
+
+    def solve_period(carry, period_objects):
+        # Once the refined grid of a period overflows, the solution of all earlier
+        # periods is invalid. Their computation is skipped.
+        return lax.cond(
+            carry[-1], skip_period, solve_valid_period, carry, period_objects
+        )
+
+    def skip_period(carry, period_objects):
+        _, solution_shape = eval_shape(solve_valid_period, carry, period_objects)
+        solution = tuple(
+            jnp.zeros(array.shape, array.dtype) for array in solution_shape
         )
+        return carry, solution
+
+    def solve_valid_period(carry, period_objects):
+        marg_util, emax, _ = carry
+        (
+            state_choices,
+            map_state_to_child_nodes,
+            transition_probs,
+            idxs_parent_states,
+        ) = period_objects
+        state_choices = state_choices.astype(int)
 
         (
             endog_grid_candidate,
             value_candidate,
             policy_candidate,
             expected_values,
-        ) = calculate_candidate_solutions_from_euler_equation(
-            marg_util=marg_util,
-            emax=emax,
-            idx_state_choices_period=idx_state_choices_period,
-            map_state_to_post_decision_child_nodes=map_state_to_post_decision_child_nodes,
-            exogenous_savings_grid=exogenous_savings_grid,
-            transition_vector_by_state=transition_vector_by_state,
-            discount_factor=discount_factor,
-            interest_rate=interest_rate,
-            state_choices_period=state_choices_period,
-            compute_inverse_marginal_utility=compute_inverse_marginal_utility,
-            compute_value=compute_value,
+        ) = calculate_candidate_solutions_period(
+            marg_util,
+            emax,
+            state_choices,
+            map_state_to_child_nodes,
+            transition_probs,
+            exogenous_savings_grid,
+            params_dict,
+            model_functions=model_functions,
         )
 
-        # Run upper envolope to remove suboptimal candidates
-        for state_choice_idx, state_choice_vec in enumerate(state_choices_period):
-            choice = state_choice_vec[-1]
-
-            endog_grid, policy, value = compute_upper_envelope(
-                endog_grid=endog_grid_candidate[state_choice_idx],
-                policy=policy_candidate[state_choice_idx],
-                value=value_candidate[state_choice_idx],
-                expected_value_zero_savings=expected_values[state_choice_idx, 0],
-                exog_grid=exogenous_savings_grid,
-                choice=choice,
-                compute_value=compute_value,
-            )
-
-            _idx_state_choice_full = idx_state_choices_period[state_choice_idx]
-            endog_grid_container[_idx_state_choice_full, : len(endog_grid)] = endog_grid
-            policy_container[_idx_state_choice_full, : len(policy)] = policy
-            value_container[_idx_state_choice_full, : len(value)] = value
-
-        marg_util_interpolated, value_interpolated = vmap(
-            interpolate_and_calc_marginal_utilities, in_axes=(None, None, 0, 0, 0, 0, 0)
+        # The intersections of the value function segments are computed in the
+        # default floating point dtype, i.e. double precision if it is enabled.
+        envelope_dtype = jnp.result_type(float)
+        endog_grid, policy, value, n_grid = vmap(
+            partial(compute_upper_envelope, n_refined_max=n_refined_max),
+            in_axes=(0, 0, 0, 0, 0, None, None),
         )(
-            compute_marginal_utility,
+            endog_grid_candidate.astype(envelope_dtype),
+            policy_candidate.astype(envelope_dtype),
+            value_candidate.astype(envelope_dtype),
+            expected_values[:, 0].astype(envelope_dtype),
+            state_choices[:, -1],
+            exogenous_savings_grid.astype(envelope_dtype),
             compute_value,
-            state_choices_period[:, -1],
-            resources_period,
-            endog_grid_container[idx_state_choices_period, :],
-            policy_container[idx_state_choices_period, :],
-            value_container[idx_state_choices_period, :],
         )
+        endog_grid, policy, value = (
+            array.astype(exogenous_savings_grid.dtype)
+            for array in (endog_grid, policy, value)
+        )
+
+        marg_util_interpolated, value_interpolated = interpolate_period(
+            state_choices,
+            idxs_parent_states,
+            endog_grid,
+            policy,
+            value,
+            jnp.minimum(n_grid, endog_grid.shape[1]),
+            exogenous_savings_grid,
+            income_shock_draws,
+            budget_table,
+            params_dict,
+            n_states=n_states_max,
+            model_functions=model_functions,
+            options=options,
+        )
+
+        marg_util, emax = aggregate_marg_utils_exp_values(
+            value_state_choice_specific=value_interpolated,
+            marg_util_state_choice_specific=marg_util_interpolated,
+            idxs_parent_states=idxs_parent_states,
+            n_states=n_states_max,
+            taste_shock_scale=params_dict["lambda"],
+            income_shock_weights=income_shock_weights,
+        )
+
+        is_overflow = jnp.any(n_grid > endog_grid.shape[1])
+
+        return (marg_util, emax, is_overflow), (endog_grid, policy, value, n_grid)
+
+    return lax.scan(
+        solve_period, (marg_util, emax, False), period_objects, reverse=True
+    )
+
+
+@partial(jit, static_argnames=("model_functions",))
+def calculate_candidate_solutions_period(
+    marg_util: jnp.ndarray,
+    emax: jnp.ndarray,
+    state_choices_period: jnp.ndarray,
+    map_state_to_post_decision_child_nodes_period: jnp.ndarray,
+    transition_probs_period: jnp.ndarray,
+    exogenous_savings_grid: jnp.ndarray,
+    params_dict: dict,
+    model_functions: ModelFunctions,
+) -> Tuple[jnp.ndarray, jnp.ndarray, jnp.ndarray, jnp.ndarray]:
+    """Calculate the candidate solutions of a period from the Euler equation.
+
+    Args:
+        marg_util (jnp.ndarray): 2d array of shape (n_states_next, n_grid_wealth)
+            containing the marginal utilities of the next period's states.
+        emax (jnp.ndarray): 2d array of shape (n_states_next, n_grid_wealth)
+            containing the expected maximum values of the next period's states.
+        state_choices_period (jnp.ndarray): 2d array of shape
+            (n_state_choices_period, n_state_and_exog_variables + 1) containing the
+            state-choice combinations of the period. They may be stored with a
+            compact integer dtype and are cast to the default integer dtype.
+        map_state_to_post_decision_child_nodes_period (jnp.ndarray): 2d array of
+            shape (n_state_choices_period, n_exog_processes) containing the indices
+            of the child states in the next period.
+        transition_probs_period (jnp.ndarray): 2d array of shape
+            (n_state_choices_period, n_exog_processes) containing the transition
+            probabilities of the exogenous processes.
+        exogenous_savings_grid (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the exogenous savings grid.
+        params_dict (dict): Dictionary containing model parameters.
+        model_functions (ModelFunctions): The user-supplied functions without
+            parameters partialled in.
+
+    Returns:
+        tuple: The candidate endogenous grid, value and policy function and the
+            expected values of each state-choice combination of the period.
+
+    """
+    (
+        _compute_utility,
+        _compute_marginal_utility,
+        compute_inverse_marginal_utility,
+        compute_value,
+        _transition_vector_by_state,
+    ) = partial_params_into_model_functions(params_dict, model_functions)
+    state_choices_period = state_choices_period.astype(int)
+
+    return calculate_candidate_solutions_from_euler_equation(
+        marg_util=marg_util,
+        emax=emax,
+        idx_state_choices_period=jnp.arange(state_choices_period.shape[0]),
+        map_state_to_post_decision_child_nodes=(
+            map_state_to_post_decision_child_nodes_period
+        ),
+        exogenous_savings_grid=exogenous_savings_grid,
+        transition_probs=transition_probs_period,
+        discount_factor=params_dict["beta"],
+        interest_rate=params_dict["interest_rate"],
+        state_choices_period=state_choices_period,
+        compute_inverse_marginal_utility=compute_inverse_marginal_utility,
+        compute_value=compute_value,
+    )
+
+
+@partial(jit, static_argnames=("n_states", "model_functions", "options"))
+def interpolate_period(
+    state_choices_period: jnp.ndarray,
+    idxs_parent_states: jnp.ndarray,
+    endog_grid: jnp.ndarray,
+    policy: jnp.ndarray,
+    value: jnp.ndarray,
+    n_grid: jnp.ndarray,
+    exogenous_savings_grid: jnp.ndarray,
+    income_shock_draws: jnp.ndarray,
+    budget_table: Optional[Any],
+    params_dict: dict,
+    n_states: int,
+    model_functions: ModelFunctions,
+    options: Tuple[Tuple[str, Any], ...],
+) -> Tuple[jnp.ndarray, jnp.ndarray]:
+    """Interpolate the solution of a period on the beginning of period resources.
+
+    The beginning of period resources are computed from the budget constraint
+    inside this function. Thus, they are only ever computed for a single period.
+    The budget constraint is evaluated once for each state of the period, and each
+    state-choice combination takes the resources of its parent state.
+
+    Args:
+        state_choices_period (jnp.ndarray): 2d array of shape
+            (n_state_choices_period, n_state_and_exog_variables + 1) containing the
+            state-choice combinations of the period. They may be stored with a
+            compact integer dtype and are cast to the default integer dtype.
+        idxs_parent_states (jnp.ndarray): 1d array of shape
+            (n_state_choices_period,) containing the index of the parent state of
+            each state-choice combination within the period. Indices of at least
+            ``n_states`` mark padded state-choice combinations.
+        endog_grid (jnp.ndarray): 2d array of shape
+            (n_state_choices_period, n_refined_max) containing the refined
+            endogenous grids.
+        policy (jnp.ndarray): 2d array of shape
+            (n_state_choices_period, n_refined_max) containing the refined policy
+            functions.
+        value (jnp.ndarray): 2d array of shape
+            (n_state_choices_period, n_refined_max) containing the refined value
+            functions.
+        n_grid (jnp.ndarray): 1d array of shape (n_state_choices_period,)
+            containing the number of refined points of each state-choice
+            combination.
+        exogenous_savings_grid (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the exogenous savings grid of the previous period.
+        income_shock_draws (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points,) containing the income shock draws.
+        budget_table (Any): The inputs of the budget constraint by period and
+            income shock. See :func:`calc_budget_table`.
+        params_dict (dict): Dictionary containing model parameters.
+        n_states (int): Number of states in the period.
+        model_functions (ModelFunctions): The user-supplied functions without
+            parameters partialled in.
+        options (tuple): The frozen options dictionary.
 
-        # TODO: save arrays to disc
+    Returns:
+        tuple: The interpolated marginal utilities and values of each state-choice
+            combination of the period.
+
+    """
+    (
+        _compute_utility,
+        compute_marginal_utility,
+        _compute_inverse_marginal_utility,
+        compute_value,
+        _transition_vector_by_state,
+    ) = partial_params_into_model_functions(params_dict, model_functions)
+    compute_next_period_wealth = partial(
+        model_functions.budget_constraint,
+        params_dict=params_dict,
+        options=dict(options),
+    )
+    state_choices_period = state_choices_period.astype(int)
 
-    # TODO: return None
+    # All state-choice combinations of a state share its state variables.
+    states_period = (
+        jnp.zeros((n_states, state_choices_period.shape[1] - 1), dtype=int)
+        .at[idxs_parent_states]
+        .set(state_choices_period[:, :-1], mode="drop")
+    )
+    resources_states = calc_resources_beginning_of_period(
+        states_period,
+        exogenous_savings_grid,
+        income_shock_draws,
+        compute_next_period_wealth,
+        budget_table,
+    )
+
+    return vmap(
+        interpolate_and_calc_marginal_utilities,
+        in_axes=(None, None, 0, 0, 0, 0, 0, 0),
+    )(
+        compute_marginal_utility,
+        compute_value,
+        state_choices_period[:, -1],
+        jnp.take(resources_states, idxs_parent_states, axis=0, mode="clip"),
+        endog_grid,
+        policy,
+        value,
+        n_grid,
+    )
+
+
+def calc_budget_table(
+    income_shock_draws: jnp.ndarray,
+    params_dict: dict,
+    options: Dict[str, Any],
+    model_functions: ModelFunctions,
+) -> Optional[Any]:
+    """Tabulate the inputs of the budget constraint by period and income shock.
+
+    The table is computed once per solve, outside of the functions that map the
+    budget constraint over states, savings and income shocks.
+
+    Args:
+        income_shock_draws (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points,) containing the income shock draws.
+        params_dict (dict): Dictionary containing model parameters.
+        options (dict): Options dictionary.
+        model_functions (ModelFunctions): The user-supplied functions without
+            parameters partialled in.
+
+    Returns:
+        Any: None if no budget table function is supplied. Otherwise, an array or
+            a pytree of arrays of shape (n_periods, n_stochastic_quad_points).
+
+    """
+    if model_functions.budget_table_function is None:
+        return None
+
+    return model_functions.budget_table_function(
+        income_shock_draws, params_dict=params_dict, options=options
+    )
 
-    return endog_grid_container, policy_container, value_container
+
+def calc_resources_beginning_of_period(
+    states: jnp.ndarray,
+    exogenous_savings_grid: jnp.ndarray,
+    income_shock_draws: jnp.ndarray,
+    compute_next_period_wealth: Callable,
+    budget_table: Optional[Any] = None,
+) -> jnp.ndarray:
+    """Compute the beginning of period resources of states.
+
+    Args:
+        states (jnp.ndarray): 2d array of shape
+            (n_states, n_state_and_exog_variables) containing the states, e.g. the
+            parent states of state-choice combinations.
+        exogenous_savings_grid (jnp.ndarray): 1d array of shape (n_grid_wealth,)
+            containing the exogenous savings grid of the previous period.
+        income_shock_draws (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points,) containing the income shock draws.
+        compute_next_period_wealth (callable): Function to compute the agent's
+            wealth from the state, savings and the income shock.
+        budget_table (Any, optional): The inputs of the budget constraint by period
+            and income shock. If given, the budget constraint receives the column
+            of its income shock as keyword argument ``budget_table``.
+
+    Returns:
+        jnp.ndarray: 3d array of shape
+            (n_states, n_grid_wealth, n_stochastic_quad_points) containing the
+            beginning of period resources.
+
+    """
+    if budget_table is None:
+        return vmap(
+            vmap(
+                vmap(compute_next_period_wealth, in_axes=(None, None, 0)),
+                in_axes=(None, 0, None),
+            ),
+            in_axes=(0, None, None),
+        )(states, exogenous_savings_grid, income_shock_draws)
+
+    return vmap(
+        vmap(
+            vmap(
+                partial(
+                    _calc_next_period_wealth_from_table,
+                    compute_next_period_wealth=compute_next_period_wealth,
+                ),
+                in_axes=(None, None, 0, 1),
+            ),
+            in_axes=(None, 0, None, None),
+        ),
+        in_axes=(0, None, None, None),
+    )(states, exogenous_savings_grid, income_shock_draws, budget_table)
+
+
+def _calc_next_period_wealth_from_table(
+    state: jnp.ndarray,
+    saving: float,
+    income_shock: float,
+    budget_table: Any,
+    compute_next_period_wealth: Callable,
+) -> float:
+    return compute_next_period_wealth(
+        state, saving, income_shock, budget_table=budget_table
+    )
+
+
+def collect_period_solution(
+    period: int,
+    idx_state_choices: np.ndarray,  # noqa: U100
+    endog_grid: RaggedArray,
+    policy: RaggedArray,
+    value: RaggedArray,
+    period_solutions: Dict[int, Tuple[RaggedArray, RaggedArray, RaggedArray]],
+) -> None:
+    """Collect the solution of a period in memory.
+
+    This is the default period solution sink of :func:`solve_dcegm`. As the
+    state-choice space is sorted by period, the solution of all periods is obtained
+    by concatenating the collected periods in ascending order.
+
+    Args:
+        period (int): The period.
+        idx_state_choices (np.ndarray): 1d array of shape
+            (n_state_choice_combs_period,) containing the indices of the period's
+            state-choice combinations in the state-choice space.
+        endog_grid (RaggedArray): The endogenous grid of each state-choice
+            combination of the period.
+        policy (RaggedArray): The policy function of each state-choice combination
+            of the period.
+        value (RaggedArray): The value function of each state-choice combination of
+            the period.
+        period_solutions (dict): Dictionary mapping periods to their solution, to
+            which the solution of ``period`` is added.
+
+    """
+    period_solutions[period] = (endog_grid, policy, value)
+
+
+def _pad_rows_to_multiple(
+    ragged_arrays: Tuple[RaggedArray, ...], multiple: int
+) -> Tuple[np.ndarray, ...]:
+    lengths = ragged_arrays[0].lengths
+    n_cols = lengths.max(initial=0)
+    n_cols += -n_cols % multiple
+
+    return tuple(
+        get_padded_rows(ragged, np.arange(lengths.shape[0]), n_cols=n_cols)
+        for ragged in ragged_arrays
+    )
@@ -1,18 +1,109 @@
 """Functions for creating internal state space objects."""
+from pathlib import Path
+from typing import Callable
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
 import numpy as np
 
+MISSING_STATE_INDEX = -9999
+
+
+class CompactStateIndexer(NamedTuple):
+    """Indexer that maps states to indexes with memory linear in the states.
+
+    Each state is identified by its position in the flattened Cartesian product of
+    all state variables. The positions are stored in sorted order, such that the
+    index of a state is found with a binary search. Unlike the dense indexer array,
+    the Cartesian product is never allocated.
+
+    Attributes:
+        keys (np.ndarray): 1d array of shape (n_states,) containing the sorted
+            positions of the states in the flattened Cartesian product.
+        idx_states (np.ndarray): 1d array of shape (n_states,) containing the index
+            of the state in the state space for each entry of ``keys``.
+        shape (tuple): Number of possible values of each state variable, i.e.
+            (n_poss_states_state_var_1, n_poss_states_state_var_2, ....). This is
+            the shape of the corresponding dense indexer array.
+
+    """
+
+    keys: np.ndarray
+    idx_states: np.ndarray
+    shape: Tuple[int, ...]
+
+
+def create_compact_state_indexer(
+    state_space: np.ndarray, shape: Optional[Tuple[int, ...]] = None
+) -> CompactStateIndexer:
+    """Create a compact indexer that maps states to indexes.
+
+    Args:
+        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
+            which serves as a collection of all possible states.
+        shape (tuple, optional): Number of possible values of each state variable.
+            Defaults to the maximum value of each state variable plus one.
+
+    Returns:
+        CompactStateIndexer: The compact indexer.
+
+    """
+    if shape is None:
+        shape = tuple(int(n) for n in state_space.max(axis=0) + 1)
+
+    keys = np.ravel_multi_index(tuple(state_space.T), dims=shape)
+    idx_states = np.argsort(keys, kind="stable")
+
+    return CompactStateIndexer(
+        keys=keys[idx_states], idx_states=idx_states, shape=tuple(shape)
+    )
+
+
+def get_state_indices(
+    map_state_to_index: Union[np.ndarray, CompactStateIndexer], states: np.ndarray
+) -> np.ndarray:
+    """Look up the indexes of states.
+
+    Args:
+        map_state_to_index (np.ndarray or CompactStateIndexer): Dense indexer array
+            or compact indexer that maps states to indexes.
+        states (np.ndarray): 2d array of shape (n, n_state_variables + 1) containing
+            the states to look up.
+
+    Returns:
+        np.ndarray: 1d array of shape (n,) containing the index of each state in the
+            state space, or ``MISSING_STATE_INDEX`` if the state is not in the state
+            space.
+
+    """
+    if not isinstance(map_state_to_index, CompactStateIndexer):
+        return map_state_to_index[tuple(states.T)]
+
+    keys = np.ravel_multi_index(tuple(states.T), dims=map_state_to_index.shape)
+    position = np.searchsorted(map_state_to_index.keys, keys)
+    position = np.minimum(position, map_state_to_index.keys.shape[0] - 1)
+    is_found = map_state_to_index.keys[position] == keys
+
+    return np.where(
+        is_found, map_state_to_index.idx_states[position], MISSING_STATE_INDEX
+    )
+
 
 def get_map_from_state_to_child_nodes(
     state_space: np.ndarray,
     state_choice_space: np.ndarray,
-    map_state_to_index: np.ndarray,
+    map_state_to_index: Union[np.ndarray, CompactStateIndexer],
+    get_next_period_state: Optional[Callable] = None,
 ) -> np.ndarray:
     """Create indexer array that maps states to state-specific child nodes.
 
-    Will be a user defined function later.
-
-    ToDo: We need to think about how to incorporate updating from state variables,
-    e.g. experience.
+    The law of motion of the endogenous state variables is given by
+    ``get_next_period_state``. The exogenous processes are always on the last entry
+    of the state space and all of their realizations are child nodes. If there
+    exists an absorbing state, this is reflected by a 0 percent transition
+    probability. The indices of all child nodes are looked up at once.
 
     Args:
         state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
@@ -25,54 +116,212 @@ def get_map_from_state_to_child_nodes(
         state_choice_space (np.ndarray): 2d array of shape
             (n_feasible_states, n_state_and_exog_variables + 1) containing all feasible
             state-choice combinations.
-        map_state_to_index (np.ndarray): Indexer array that maps states to indexes.
-            The shape of this object is quite complicated. For each state variable it
-            has the number of possible states as rows, i.e.
-            (n_poss_states_state_var_1, n_poss_states_state_var_2, ....).
+        map_state_to_index (np.ndarray or CompactStateIndexer): Indexer array that
+            maps states to indexes. The shape of this object is quite complicated.
+            For each state variable it has the number of possible states as rows,
+            i.e. (n_poss_states_state_var_1, n_poss_states_state_var_2, ....).
+            Alternatively, the compact indexer of
+            :func:`create_compact_state_indexer`.
+        get_next_period_state (Callable, optional): User-supplied function that
+            receives the state-choice space and returns a 2d array of shape
+            (n_feasible_state_choice_combs, n_state_variables) with the next
+            period's state variables of each state-choice combination, i.e. all
+            columns of the state space but the exogenous processes. By default, the
+            period is incremented and the choice becomes the lagged choice in the
+            second column.
 
     Returns:
         np.ndarray: 2d array of shape
-            (n_feasible_state_choice_combs, n_choices * n_exog_processes)
+            (n_feasible_state_choice_combs, n_exog_processes)
             containing indices of all child nodes the agent can reach
-            from a given state.
+            from a given state. The indices are relative to the first state of the
+            next period. State-choice combinations of the last period have no child
+            nodes and are assigned 0.
 
     """
-    # Exogenous processes are always on the last entry of the state space. Moreover, we
-    # treat all of them as admissible in each period. If there exists an absorbing
-    # state, this is reflected by a 0 percent transition probability.
-    n_periods, n_choices, n_exog_processes = map_state_to_index.shape
-    n_feasible_state_choice_combs = state_choice_space.shape[0]
+    if get_next_period_state is None:
+        get_next_period_state = _get_next_period_state_with_lagged_choice
 
-    n_states_over_periods = state_space.shape[0] // n_periods
+    n_periods = map_state_to_index.shape[0]
+    n_exog_processes = map_state_to_index.shape[-1]
 
-    map_state_to_feasible_child_nodes = np.empty(
-        (n_feasible_state_choice_combs, n_exog_processes),
-        dtype=int,
-    )
+    state_vec_next = np.asarray(get_next_period_state(state_choice_space))
 
-    for idx in range(n_feasible_state_choice_combs):
-        state_choice_vec = state_choice_space[idx]
-        period = state_choice_vec[0]
-        state_vec = state_choice_vec[:-1]
-        lagged_choice = state_choice_vec[-1]
+    # State-choice combinations of the last period have no child nodes.
+    has_child_nodes = state_vec_next[:, 0] < n_periods
+    state_vec_next = state_vec_next[has_child_nodes]
 
-        state_vec_next = state_vec.copy()
-        state_vec_next[0] += 1  # Increment period
+    n_state_choices_with_child_nodes = state_vec_next.shape[0]
+    child_states = np.column_stack(
+        [
+            np.repeat(state_vec_next, n_exog_processes, axis=0),
+            np.tile(np.arange(n_exog_processes), n_state_choices_with_child_nodes),
+        ]
+    )
+    idx_child_states = get_state_indices(map_state_to_index, child_states).reshape(
+        n_state_choices_with_child_nodes, n_exog_processes
+    )
 
-        if state_vec_next[0] < n_periods:
-            state_vec_next[1] = lagged_choice
+    if np.any(idx_child_states < 0):
+        raise ValueError(
+            "The next period state of a state-choice combination is not in the state "
+            "space."
+        )
 
-            for exog_process in range(n_exog_processes):
-                state_vec_next[-1] = exog_process
+    idx_first_state_next_period = np.searchsorted(
+        state_space[:, 0], state_vec_next[:, 0], side="left"
+    )
 
-                map_state_to_feasible_child_nodes[idx, exog_process] = (
-                    map_state_to_index[tuple(state_vec_next)]
-                    - (period + 1) * n_states_over_periods
-                )
+    map_state_to_feasible_child_nodes = np.zeros(
+        (state_choice_space.shape[0], n_exog_processes), dtype=int
+    )
+    map_state_to_feasible_child_nodes[has_child_nodes] = (
+        idx_child_states - idx_first_state_next_period[:, None]
+    )
 
     return map_state_to_feasible_child_nodes
 
 
+def prune_unreachable_states(
+    state_space: np.ndarray,
+    state_choice_space: np.ndarray,
+    map_state_choice_vec_to_parent_state: np.ndarray,
+    map_state_to_post_decision_child_nodes: np.ndarray,
+    map_state_to_index: Union[np.ndarray, CompactStateIndexer],
+    initial_states: np.ndarray,
+    transition_matrix: Optional[np.ndarray] = None,
+):
+    """Drop all states that cannot be reached from the initial states.
+
+    Starting from the initial states, the reachable states are propagated forward
+    period by period. A state is reachable if it is the child node of a feasible
+    state-choice combination of a reachable state. If ``transition_matrix`` is
+    given, child nodes that are reached with zero probability are not propagated.
+
+    Args:
+        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
+            containing the state space, sorted by period.
+        state_choice_space (np.ndarray): 2d array of shape
+            (n_feasible_state_choice_combs, n_state_and_exog_variables + 1)
+            containing the space of all feasible state-choice combinations.
+        map_state_choice_vec_to_parent_state (np.ndarray): 1d array of shape
+            (n_feasible_state_choice_combs,) that maps from any vector of
+            state-choice combinations to the respective parent state.
+        map_state_to_post_decision_child_nodes (np.ndarray): 2d array of shape
+            (n_feasible_state_choice_combs, n_exog_processes) containing indices of
+            all child nodes relative to the first state of the next period.
+        map_state_to_index (np.ndarray or CompactStateIndexer): Indexer that maps
+            states to indexes.
+        initial_states (np.ndarray): 2d array of shape
+            (n_initial_states, n_state_variables + 1) containing the states the
+            agents start in.
+        transition_matrix (np.ndarray, optional): 2d array of shape
+            (n_states, n_exog_processes) containing for each state the transition
+            probabilities of the exogenous processes.
+
+    Returns:
+        tuple:
+
+        - state_space (np.ndarray): 2d array of shape
+            (n_reachable_states, n_state_variables + 1) containing the reachable
+            states.
+        - map_state_to_index (np.ndarray or CompactStateIndexer): Indexer of the
+            same type as the input that maps the reachable states to their new
+            indexes.
+        - state_choice_space (np.ndarray): 2d array containing the state-choice
+            combinations of the reachable states.
+        - map_state_choice_vec_to_parent_state (np.ndarray): 1d array that maps the
+            remaining state-choice combinations to their parent states.
+        - map_state_to_post_decision_child_nodes (np.ndarray): 2d array containing
+            the child nodes of the remaining state-choice combinations. Child nodes
+            that are reached with zero probability and have been dropped are
+            assigned 0.
+
+    """
+    state_space_structure = create_state_space_structure(
+        state_space, state_choice_space, map_state_choice_vec_to_parent_state
+    )
+    start_states = state_space_structure.start_states
+    start_state_choices = state_space_structure.start_state_choices
+    stop_state_choices = state_space_structure.stop_state_choices
+    n_periods = start_states.shape[0]
+
+    idx_initial_states = get_state_indices(map_state_to_index, initial_states)
+    if np.any(idx_initial_states < 0):
+        raise ValueError("An initial state is not in the state space.")
+
+    if transition_matrix is None:
+        has_inflow = np.ones(map_state_to_post_decision_child_nodes.shape, dtype=bool)
+    else:
+        has_inflow = (
+            np.asarray(transition_matrix)[map_state_choice_vec_to_parent_state] > 0
+        )
+
+    is_reachable = np.zeros(state_space.shape[0], dtype=bool)
+    is_reachable[idx_initial_states] = True
+
+    for period in range(n_periods - 1):
+        idxs = slice(start_state_choices[period], stop_state_choices[period])
+        is_reachable_state_choice = is_reachable[
+            map_state_choice_vec_to_parent_state[idxs]
+        ]
+        child_nodes = map_state_to_post_decision_child_nodes[idxs][
+            is_reachable_state_choice
+        ]
+        is_reached = has_inflow[idxs][is_reachable_state_choice]
+        is_reachable[start_states[period + 1] + child_nodes[is_reached]] = True
+
+    # New index of each reachable state. Entries of unreachable states are unused.
+    idx_new_states = np.cumsum(is_reachable) - 1
+
+    is_kept = is_reachable[map_state_choice_vec_to_parent_state]
+    state_space_pruned = state_space[is_reachable]
+    state_choice_space_pruned = state_choice_space[is_kept]
+    map_state_choice_vec_to_parent_state_pruned = idx_new_states[
+        map_state_choice_vec_to_parent_state[is_kept]
+    ]
+
+    start_states_pruned = np.searchsorted(
+        state_space_pruned[:, 0], np.arange(n_periods), side="left"
+    )
+    periods = state_choice_space_pruned[:, 0]
+    has_child_nodes = periods < n_periods - 1
+    periods_next = periods[has_child_nodes] + 1
+
+    idx_child_states = (
+        start_states[periods_next][:, None]
+        + map_state_to_post_decision_child_nodes[is_kept][has_child_nodes]
+    )
+    map_state_to_post_decision_child_nodes_pruned = np.zeros(
+        (state_choice_space_pruned.shape[0], has_inflow.shape[1]), dtype=int
+    )
+    map_state_to_post_decision_child_nodes_pruned[has_child_nodes] = np.where(
+        has_inflow[is_kept][has_child_nodes],
+        idx_new_states[idx_child_states] - start_states_pruned[periods_next][:, None],
+        0,
+    )
+
+    if isinstance(map_state_to_index, CompactStateIndexer):
+        map_state_to_index_pruned = create_compact_state_indexer(
+            state_space_pruned, shape=map_state_to_index.shape
+        )
+    else:
+        map_state_to_index_pruned = np.full_like(
+            map_state_to_index, MISSING_STATE_INDEX
+        )
+        map_state_to_index_pruned[tuple(state_space_pruned.T)] = np.arange(
+            state_space_pruned.shape[0]
+        )
+
+    return (
+        state_space_pruned,
+        map_state_to_index_pruned,
+        state_choice_space_pruned,
+        map_state_choice_vec_to_parent_state_pruned,
+        map_state_to_post_decision_child_nodes_pruned,
+    )
+
+
 def create_state_choice_space(
     state_space, map_state_to_state_space_index, get_state_specific_choice_set
 ):
@@ -93,6 +342,8 @@ def create_state_choice_space(
             The shape of this object is quite complicated. For each state variable it
             has the number of possible states as rows, i.e.
             (n_poss_states_state_var_1, n_poss_states_state_var_2, ....).
+            Alternatively, the compact indexer of
+            :func:`create_compact_state_indexer`.
         get_state_specific_choice_set (Callable): User-supplied function that returns
             the set of feasible choices for a given state.
 
@@ -108,22 +359,10 @@ def create_state_choice_space(
         - map_state_choice_vec_to_parent_state (np.ndarray): 1d array of shape
             (n_states * n_feasible_choices,) that maps from any vector of state-choice
             combinations to the respective parent state.
-        - reshape_state_choice_vec_to_mat (np.ndarray): 2d array of shape
-            (n_states, n_feasible_choices). For each parent state, this array can be
-            used to reshape the vector of feasible state-choice combinations
-            to a matrix of lagged and current choice combinations of
-            shape (n_choices, n_choices).
-        - transform_between_state_and_state_choice_space (jnp.ndarray): 2d boolean
-            array of shape (n_states, n_states * n_feasible_choices) indicating which
-            state belongs to which state-choice combination in the entire state and
-            state choice space. The array is used to
-            (i) contract state-choice level arrays to the state level by summing
-                over state-choice combinations.
-            (ii) to expand state level arrays to the state-choice level.
 
     """
     n_states, n_state_and_exog_variables = state_space.shape
-    _n_periods, n_choices, _n_exog_processes = map_state_to_state_space_index.shape
+    n_choices = map_state_to_state_space_index.shape[1]
 
     state_choice_space = np.zeros(
         (n_states * n_choices, n_state_and_exog_variables + 1),
@@ -131,24 +370,11 @@ def create_state_choice_space(
     )
 
     map_state_choice_vec_to_parent_state = np.zeros((n_states * n_choices), dtype=int)
-    reshape_state_choice_vec_to_mat = np.zeros((n_states, n_choices), dtype=int)
-    transform_between_state_and_state_choice_space = np.full(
-        (n_states, n_states * n_choices), fill_value=False, dtype=bool
-    )
-
-    # Ensure that states are ordered.
-    period = state_space[0, 0]
 
     idx = 0
-    idx_min = -1
-
     for state_idx in range(n_states):
         state_vec = state_space[state_idx]
 
-        if period == state_vec[0]:
-            idx_min = idx
-            period += 1
-
         feasible_choice_set = get_state_specific_choice_set(
             state_vec, state_space, map_state_to_state_space_index
         )
@@ -158,107 +384,441 @@ def create_state_choice_space(
             state_choice_space[idx, -1] = choice
 
             map_state_choice_vec_to_parent_state[idx] = state_idx
-            reshape_state_choice_vec_to_mat[state_idx, choice] = idx - idx_min
-            transform_between_state_and_state_choice_space[state_idx, idx] = True
 
             idx += 1
 
-        # Fill up matrix with some state_choice index from the state, as we only use
-        # this matrix to get the maximum across state_choice values and two times the
-        # same value doesn't change the maximum.
-        # Only used in aggregation function.
-        for choice in range(n_choices):
-            if choice not in feasible_choice_set:
-                reshape_state_choice_vec_to_mat[state_idx, choice] = idx - idx_min - 1
+    return state_choice_space[:idx], map_state_choice_vec_to_parent_state[:idx]
 
-    return (
-        state_choice_space[:idx],
-        map_state_choice_vec_to_parent_state[:idx],
-        reshape_state_choice_vec_to_mat,
-        transform_between_state_and_state_choice_space[:, :idx],
+
+def create_state_choice_space_from_mask(
+    state_space, map_state_to_state_space_index, get_state_specific_choice_mask
+):
+    """Create state choice space of all feasible state-choice combinations.
+
+    This is the vectorized counterpart of :func:`create_state_choice_space`. The
+    user-supplied function returns the feasible choices of all states at once as a
+    boolean mask, from which all objects are derived without looping over states.
+
+    Args:
+        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
+            which serves as a collection of all possible states. By convention,
+            the first column must contain the period and the last column the
+            exogenous processes. Any other state variables are in between.
+        map_state_to_state_space_index (np.ndarray): Indexer array that maps states to
+            the respective index positions in the state space.
+        get_state_specific_choice_mask (Callable): User-supplied function that returns
+            a boolean array of shape (n_states, n_choices), which is True if a choice
+            is feasible in a state. It is called with the state space and the
+            indexer.
+
+    Returns:
+        tuple: See :func:`create_state_choice_space`.
+
+    """
+    n_states = state_space.shape[0]
+    n_choices = map_state_to_state_space_index.shape[1]
+
+    is_feasible = np.asarray(
+        get_state_specific_choice_mask(state_space, map_state_to_state_space_index),
+        dtype=bool,
     )
+    if is_feasible.shape != (n_states, n_choices):
+        raise ValueError(
+            f"The choice mask must have shape {(n_states, n_choices)}, but has shape "
+            f"{is_feasible.shape}."
+        )
 
+    map_state_choice_vec_to_parent_state, choices = np.nonzero(is_feasible)
+    state_choice_space = np.column_stack(
+        [state_space[map_state_choice_vec_to_parent_state], choices]
+    )
 
-def create_current_state_and_state_choice_objects(
-    period,
-    state_space,
-    state_choice_space,
-    resources_beginning_of_period,
-    map_state_choice_vec_to_parent_state,
-    reshape_state_choice_vec_to_mat,
-    transform_between_state_and_state_choice_space,
+    return state_choice_space, map_state_choice_vec_to_parent_state
+
+
+def create_state_choice_space_from_functions(
+    state_space, map_state_to_state_space_index, state_space_functions
 ):
-    """Create state and state-choice objects for the current period.
+    """Create the state choice space with the user-supplied state space functions.
+
+    If the user supplies the feasible choices of all states as a boolean mask under
+    the key ``"get_state_specific_choice_mask"``, the state choice space is created
+    without looping over states. Otherwise, the state specific choice set is
+    requested for each state.
+
+    Args:
+        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
+            which serves as a collection of all possible states.
+        map_state_to_state_space_index (np.ndarray): Indexer array that maps states to
+            the respective index positions in the state space.
+        state_space_functions (Dict[str, callable]): Dictionary of user-supplied
+            state space functions.
+
+    Returns:
+        tuple: See :func:`create_state_choice_space`.
+
+    """
+    if "get_state_specific_choice_mask" in state_space_functions:
+        return create_state_choice_space_from_mask(
+            state_space,
+            map_state_to_state_space_index,
+            state_space_functions["get_state_specific_choice_mask"],
+        )
+
+    return create_state_choice_space(
+        state_space,
+        map_state_to_state_space_index,
+        state_space_functions["get_state_specific_choice_set"],
+    )
+
+
+class StateSpace(NamedTuple):
+    """State space and state-choice space together with their period blocks.
+
+    The state space and the state-choice space are sorted by period, such that the
+    states and state-choice combinations of each period form a contiguous block.
+    The bounds of the blocks are computed once, such that the objects of a period
+    are obtained as slices instead of scans over the whole space.
+
+    Attributes:
+        state_space (np.ndarray): 2d array of shape
+            (n_states, n_state_variables + 1) containing the state space.
+        state_choice_space (np.ndarray): 2d array of shape
+            (n_feasible_state_choice_combs, n_state_and_exog_variables + 1)
+            containing the space of all feasible state-choice combinations.
+        map_state_choice_vec_to_parent_state (np.ndarray): 1d array of shape
+            (n_feasible_state_choice_combs,) that maps from any vector of
+            state-choice combinations to the respective parent state.
+        idxs_parent_states_period (np.ndarray): 1d array of shape
+            (n_feasible_state_choice_combs,) containing for each state-choice
+            combination the index of its parent state within its period.
+        start_states (np.ndarray): 1d array of shape (n_periods,) containing the
+            index of the first state of each period.
+        stop_states (np.ndarray): 1d array of shape (n_periods,) containing the
+            index after the last state of each period.
+        start_state_choices (np.ndarray): 1d array of shape (n_periods,)
+            containing the index of the first state-choice combination of each
+            period.
+        stop_state_choices (np.ndarray): 1d array of shape (n_periods,)
+            containing the index after the last state-choice combination of each
+            period.
+
+    """
+
+    state_space: np.ndarray
+    state_choice_space: np.ndarray
+    map_state_choice_vec_to_parent_state: np.ndarray
+    idxs_parent_states_period: np.ndarray
+    start_states: np.ndarray
+    stop_states: np.ndarray
+    start_state_choices: np.ndarray
+    stop_state_choices: np.ndarray
+
+
+class ModelStructure(NamedTuple):
+    """State space objects of a model, which do not depend on the parameters.
+
+    Attributes:
+        state_space_structure (StateSpace): The state space, the state-choice space,
+            the map from state-choice combinations to their parent states and the
+            period blocks of the spaces.
+        map_state_to_post_decision_child_nodes (np.ndarray): 2d array of shape
+            (n_feasible_state_choice_combs, n_exog_processes) containing indices of
+            all child nodes the agent can reach from any given state.
+
+    """
+
+    state_space_structure: StateSpace
+    map_state_to_post_decision_child_nodes: np.ndarray
+
+
+def save_model_structure(
+    model_structure: ModelStructure, path: Union[str, Path]
+) -> None:
+    """Save the arrays of a model structure to a directory.
+
+    Args:
+        model_structure (ModelStructure): The model structure.
+        path (str or pathlib.Path): Directory to which the arrays are written as
+            ``.npy`` files. It is created if it does not exist.
+
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    for name, array in model_structure.state_space_structure._asdict().items():
+        np.save(path / f"{name}.npy", array)
+    np.save(
+        path / "map_state_to_post_decision_child_nodes.npy",
+        model_structure.map_state_to_post_decision_child_nodes,
+    )
+
+
+def load_model_structure(path: Union[str, Path]) -> ModelStructure:
+    """Load a model structure saved with :func:`save_model_structure`.
+
+    The arrays are memory-mapped, i.e. only the parts that are accessed are read
+    from disk.
+
+    Args:
+        path (str or pathlib.Path): Directory of the saved model structure.
+
+    Returns:
+        ModelStructure: The model structure.
+
+    """
+    path = Path(path)
+
+    state_space_structure = StateSpace(
+        **{
+            name: np.load(path / f"{name}.npy", mmap_mode="r")
+            for name in StateSpace._fields
+        }
+    )
+
+    return ModelStructure(
+        state_space_structure=state_space_structure,
+        map_state_to_post_decision_child_nodes=np.load(
+            path / "map_state_to_post_decision_child_nodes.npy", mmap_mode="r"
+        ),
+    )
+
+
+def get_smallest_int_dtype(array: np.ndarray) -> np.dtype:
+    """Get the smallest signed integer dtype that holds all values of an array.
+
+    Args:
+        array (np.ndarray): Integer array.
+
+    Returns:
+        np.dtype: One of int8, int16, int32 and int64.
+
+    """
+    if array.size == 0:
+        return np.dtype(np.int8)
+
+    min_value, max_value = array.min(), array.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.int64)
+
+
+def get_index_dtype(n_elements: int) -> np.dtype:
+    """Get the integer dtype of indices into an array with ``n_elements`` entries.
+
+    Args:
+        n_elements (int): Number of entries of the indexed array.
+
+    Returns:
+        np.dtype: int32 if all indices fit into 32 bit, else int64.
+
+    """
+    if n_elements <= np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+
+    return np.dtype(np.int64)
+
+
+def create_state_space_structure(
+    state_space: np.ndarray,
+    state_choice_space: np.ndarray,
+    map_state_choice_vec_to_parent_state: np.ndarray,
+) -> StateSpace:
+    """Compute the period blocks of the state space and the state-choice space.
+
+    The state space and the state-choice space are stored with the smallest integer
+    dtype that holds all of their values and the maps to parent states with 32 bit
+    integers if the number of states allows it. This reduces the memory that is
+    read when the objects of a period are gathered. User-supplied functions must
+    receive the state-choice combinations cast back to the default integer dtype.
 
     Args:
-        period (int): Current period.
         state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
-            containing the state space.
+            containing the state space, sorted by period.
         state_choice_space (np.ndarray): 2d array of shape
-            (n_feasible_state_choice_combs, n_states + 1) containing the space of all
-            feasible state-choice combinations.
-        resources_beginning_of_period (np.ndarray): 3d array of shape
-            (n_states, n_exog_savings, n_stochastic_quad_points) containing the
-            resourcesat the beginning of the current period for each state and
-            stochastic income shock.
+            (n_feasible_state_choice_combs, n_state_and_exog_variables + 1)
+            containing the space of all feasible state-choice combinations, sorted
+            by period.
         map_state_choice_vec_to_parent_state (np.ndarray): 1d array of shape
-            (n_states * n_feasible_choices,) that maps from any vector of state-choice
-            combinations to the respective parent state.
-        reshape_state_choice_vec_to_mat (np.ndarray): 2d array of shape
-            (n_states, n_feasible_choices). For each parent state, this array can be
-            used to reshape the vector of feasible state-choice combinations
-            to a matrix of lagged and current choice combinations of
-            shape (n_choices, n_choices).
-        transform_between_state_and_state_choice_space (jnp.ndarray): 2d boolean
-            array of shape (n_states, n_states * n_feasible_choices) indicating which
-            state belongs to which state-choice combination in the entire state space
-            and state-choice space. The array is used to
-            (i) contract state-choice level arrays to the state level by summing
-                over state-choice combinations.
-            (ii) to expand state level arrays to the state-choice level.
+            (n_feasible_state_choice_combs,) that maps from any vector of
+            state-choice combinations to the respective parent state.
+
+    Returns:
+        StateSpace: The state space and state-choice space with their period
+            blocks.
+
+    """
+    periods = np.arange(int(state_space[-1, 0]) + 1)
+    start_states = np.searchsorted(state_space[:, 0], periods, side="left")
+    stop_states = np.searchsorted(state_space[:, 0], periods, side="right")
+    start_state_choices = np.searchsorted(
+        state_choice_space[:, 0], periods, side="left"
+    )
+    stop_state_choices = np.searchsorted(
+        state_choice_space[:, 0], periods, side="right"
+    )
+
+    idxs_parent_states_period = (
+        map_state_choice_vec_to_parent_state - start_states[state_choice_space[:, 0]]
+    )
+
+    index_dtype = get_index_dtype(state_space.shape[0])
+    state_space = state_space.astype(get_smallest_int_dtype(state_space))
+    state_choice_space = state_choice_space.astype(
+        get_smallest_int_dtype(state_choice_space)
+    )
+    map_state_choice_vec_to_parent_state = map_state_choice_vec_to_parent_state.astype(
+        index_dtype
+    )
+    idxs_parent_states_period = idxs_parent_states_period.astype(index_dtype)
+
+    return StateSpace(
+        state_space=state_space,
+        state_choice_space=state_choice_space,
+        map_state_choice_vec_to_parent_state=map_state_choice_vec_to_parent_state,
+        idxs_parent_states_period=idxs_parent_states_period,
+        start_states=start_states,
+        stop_states=stop_states,
+        start_state_choices=start_state_choices,
+        stop_state_choices=stop_state_choices,
+    )
+
+
+def create_current_state_and_state_choice_objects(
+    period: int, state_space_structure: StateSpace
+):
+    """Create state and state-choice objects for the current period.
+
+    The state-choice combinations and parent states are views into the arrays of
+    ``state_space_structure``.
+
+    Args:
+        period (int): Current period.
+        state_space_structure (StateSpace): The state space and state-choice space
+            with their period blocks.
 
     Returns:
         tuple:
 
         - idxs_state_choice_combs (np.ndarray): 1d array of shape
             (n_state_choice_combs_current,).
-        - resources_current_period (np.ndarray): 3d array of shape
-            (n_state_choice_combs_current, n_exog_savings, n_stochastic_quad_points)
-            containing the resources at the beginning of the current period.
-        - reshape_current_state_choice_vec_to_mat (np.ndarray): 2d array of shape
-            (n_states_current, n_choices_current) that reshapes the current period
-            vector of feasible state-choice combinations to a matrix of shape
-            (n_choices, n_choices).
-        - transform_between_state_and_state_choice_vec (np.ndarray): 2d boolean
-            array of shape (n_states_current, n_feasible_state_choice_combs_current)
-            indicating which state vector belongs to which state-choice combination in
-            the current period.
+        - state_choice_combs (np.ndarray): 2d array of shape
+            (n_state_choice_combs_current, n_state_and_exog_variables + 1)
+            containing the state-choice combinations of the current period.
+        - idxs_parent_states (np.ndarray): 1d array of shape
+            (n_state_choice_combs_current,) containing for each state-choice
+            combination the index of its parent state within the current period.
+        - n_states_current (int): Number of states in the current period.
 
     """
+    start = state_space_structure.start_state_choices[period]
+    stop = state_space_structure.stop_state_choices[period]
+
+    n_states_current = int(
+        state_space_structure.stop_states[period]
+        - state_space_structure.start_states[period]
+    )
+
+    return (
+        np.arange(start, stop),
+        state_space_structure.state_choice_space[start:stop],
+        state_space_structure.idxs_parent_states_period[start:stop],
+        n_states_current,
+    )
 
-    _idxs_parent_states = np.where(state_space[:, 0] == period)[0]
-    idxs_state_choice_combs = np.where(state_choice_space[:, 0] == period)[0]
 
-    state_choice_combs = state_choice_space[idxs_state_choice_combs]
+def create_period_padded_state_and_state_choice_objects(
+    state_space_structure: StateSpace,
+    map_state_to_post_decision_child_nodes: np.ndarray,
+):
+    """Create state and state-choice objects of all periods padded to a common shape.
 
-    resources_current_period = resources_beginning_of_period[
-        map_state_choice_vec_to_parent_state[idxs_state_choice_combs]
-    ]
+    As the state space and the state-choice space are sorted by period, the objects
+    of each period are contiguous blocks. Each block is padded to the size of the
+    largest block, such that the objects of all periods can be stacked along a
+    leading period axis. Padded state-choice combinations repeat the first
+    state-choice combination of the period, but are assigned to the parent state
+    ``n_states_max`` within the period, which is ignored in the aggregation.
+
+    Args:
+        state_space_structure (StateSpace): The state space and state-choice space
+            with their period blocks.
+        map_state_to_post_decision_child_nodes (np.ndarray): 2d array of shape
+            (n_feasible_state_choice_combs, n_choices * n_exog_processes)
+            containing indices of all child nodes the agent can reach
+            from any given state.
+
+    Returns:
+        tuple:
 
-    reshape_current_state_choice_vec_to_mat = reshape_state_choice_vec_to_mat[
-        _idxs_parent_states
+        - idxs_state_choice_combs (np.ndarray): 2d array of shape
+            (n_periods, n_state_choice_combs_max) containing the indices of the
+            state-choice combinations of each period.
+        - is_valid_state_choice_comb (np.ndarray): 2d boolean array of shape
+            (n_periods, n_state_choice_combs_max) indicating which entries of
+            ``idxs_state_choice_combs`` are not padded.
+        - idxs_parent_states (np.ndarray): 2d array of shape
+            (n_periods, n_state_choice_combs_max) containing the index of the parent
+            state of each state-choice combination.
+        - idxs_parent_states_period (np.ndarray): 2d array of shape
+            (n_periods, n_state_choice_combs_max) containing the index of the parent
+            state of each state-choice combination within its period. Padded
+            state-choice combinations are assigned to ``n_states_max``.
+        - map_state_to_post_decision_child_nodes_period (np.ndarray): 3d array of
+            shape (n_periods, n_state_choice_combs_max, n_exog_processes) containing
+            the child nodes of the state-choice combinations of each period.
+        - n_states_max (int): Number of states in the largest period.
+
+    """
+    start_states = state_space_structure.start_states
+    stop_states = state_space_structure.stop_states
+    start_state_choices = state_space_structure.start_state_choices
+    stop_state_choices = state_space_structure.stop_state_choices
+
+    n_states_max = int(np.max(stop_states - start_states))
+    n_state_choices_max = np.max(stop_state_choices - start_state_choices)
+
+    idxs_state_choice_combs = start_state_choices[:, np.newaxis] + np.arange(
+        n_state_choices_max
+    )
+    is_valid_state_choice_comb = (
+        idxs_state_choice_combs < stop_state_choices[:, np.newaxis]
+    )
+    idxs_state_choice_combs = np.where(
+        is_valid_state_choice_comb,
+        idxs_state_choice_combs,
+        start_state_choices[:, np.newaxis],
+    )
+
+    idxs_parent_states = state_space_structure.map_state_choice_vec_to_parent_state[
+        idxs_state_choice_combs
     ]
+    idxs_parent_states_period = np.where(
+        is_valid_state_choice_comb,
+        state_space_structure.idxs_parent_states_period[idxs_state_choice_combs],
+        n_states_max,
+    )
 
-    transform_between_state_and_state_choice_vec = (
-        transform_between_state_and_state_choice_space[_idxs_parent_states][
-            :, idxs_state_choice_combs
-        ]
+    map_state_to_post_decision_child_nodes_period = (
+        map_state_to_post_decision_child_nodes[idxs_state_choice_combs]
     )
 
     return (
         idxs_state_choice_combs,
-        state_choice_combs,
-        resources_current_period,
-        reshape_current_state_choice_vec_to_mat,
-        transform_between_state_and_state_choice_vec,
+        is_valid_state_choice_comb,
+        idxs_parent_states,
+        idxs_parent_states_period,
+        map_state_to_post_decision_child_nodes_period,
+        n_states_max,
     )
+
+
+def _get_next_period_state_with_lagged_choice(state_choice_space):
+    state_vec_next = state_choice_space[:, :-2].copy()
+    state_vec_next[:, 0] += 1
+    state_vec_next[:, 1] = state_choice_space[:, -1]
+
+    return state_vec_next
@@ -0,0 +1,68 @@
+"""Functions for measuring the wall time of the stages of the backward induction."""
+import time
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import jax
+import pandas as pd
+
+
+def time_stage(
+    timings: Optional[List[Tuple[Optional[int], str, float]]],
+    period: Optional[int],
+    stage: str,
+    func: Callable,
+    *args,
+    **kwargs,
+):
+    """Call a function and record its wall time.
+
+    JAX dispatches computations asynchronously. The wall time is therefore measured
+    until all arrays returned by ``func`` are computed. If ``timings`` is None,
+    ``func`` is called without any measurement or synchronization.
+
+    Args:
+        timings (list, optional): List to which the period, the stage and the wall
+            time in seconds are appended.
+        period (int, optional): The period of the stage. None for stages that span
+            several periods.
+        stage (str): Name of the stage.
+        func (callable): The function.
+        *args: Positional arguments of ``func``.
+        **kwargs: Keyword arguments of ``func``.
+
+    Returns:
+        The return value of ``func``.
+
+    """
+    if timings is None:
+        return func(*args, **kwargs)
+
+    start = time.perf_counter()
+    out = jax.block_until_ready(func(*args, **kwargs))
+    timings.append((period, stage, time.perf_counter() - start))
+
+    return out
+
+
+def create_timing_report(
+    timings: List[Tuple[Optional[int], str, float]]
+) -> pd.DataFrame:
+    """Create a report of the wall times of the stages of the backward induction.
+
+    Args:
+        timings (list): List of the period, the stage and the wall time in seconds
+            of each recorded stage.
+
+    Returns:
+        pd.DataFrame: DataFrame with the columns "period", "stage" and "seconds" and
+            one row per recorded stage, in the order of execution. Use
+            ``to_json`` for a JSON report.
+
+    """
+    report = pd.DataFrame(timings, columns=["period", "stage", "seconds"])
+    report["period"] = report["period"].astype("Int64")
+
+    return report
@@ -1,6 +1,5 @@
 from typing import Dict
 
-import jax
 import jax.numpy as jnp
 
 
@@ -48,7 +47,86 @@ def budget_constraint(
     return beginning_period_wealth
 
 
-@jax.jit
+def budget_constraint_with_income_table(
+    state: jnp.ndarray,
+    saving: float,
+    income_shock: float,  # noqa: U100
+    params_dict: dict,
+    options: Dict[str, int],  # noqa: U100
+    budget_table: jnp.ndarray,
+) -> float:
+    """Compute possible current beginning of period resources from the income table.
+
+    The labor income of each period and income shock is tabulated once per solve by
+    :func:`calc_income_table`, which is passed to the solver as budget table
+    function. The budget constraint only looks up the income of the period in the
+    column of its income shock.
+
+    Args:
+        state (np.ndarray): 1d array of shape (n_state_variables,) denoting
+            the current child state.
+        saving (float): Entry of exogenous savings grid.
+        income_shock (float): Stochastic shock on labor income. It already enters
+            the income table.
+        params_dict (dict): Dictionary containing model parameters.
+        options (dict): Options dictionary.
+        budget_table (jnp.ndarray): 1d array of shape (n_periods,) containing the
+            labor income of each period given the income shock.
+
+    Returns:
+        beginning_period_wealth (float): The current beginning of period resources.
+
+    """
+    r = params_dict["interest_rate"]
+
+    income_from_last_period = (1 - state[1]) * budget_table[state[0]]
+    beginning_period_wealth = income_from_last_period + (1 + r) * saving
+
+    # Retirement safety net, only in retirement model, but we require to have it always
+    # as a parameter
+    beginning_period_wealth = jnp.maximum(
+        beginning_period_wealth, params_dict["consumption_floor"]
+    )
+
+    return beginning_period_wealth
+
+
+def calc_income_table(
+    income_shock_draws: jnp.ndarray, params_dict: dict, options: Dict[str, int]
+) -> jnp.ndarray:
+    """Tabulate the labor income of all periods and income shocks.
+
+    Relevant for the wage equation (deterministic income) are age-dependent
+    coefficients of work experience:
+    labor_income = constant + alpha_1 * age + alpha_2 * age**2
+    They include a constant as well as two coefficients on age and age squared,
+    respectively. Note that the last one (alpha_2) typically has a negative sign.
+
+    Args:
+        income_shock_draws (jnp.ndarray): 1d array of shape
+            (n_stochastic_quad_points,) containing the income shock draws.
+        params_dict (dict): Dictionary containing model parameters.
+            Relevant here are the coefficients of the wage equation.
+        options (dict): Options dictionary.
+
+    Returns:
+        jnp.ndarray: 2d array of shape (n_periods, n_stochastic_quad_points)
+            containing the labor income of each period and income shock.
+
+    """
+    # For simplicity, assume current_age - min_age = experience
+    age = jnp.arange(options["n_periods"]) + options["min_age"]
+
+    # Determinisctic component of income depending on experience:
+    # constant + alpha_1 * age + alpha_2 * age**2
+    exp_coeffs = jnp.array(
+        [params_dict["constant"], params_dict["exp"], params_dict["exp_squared"]]
+    )
+    labor_income = (age[:, None] ** jnp.arange(len(exp_coeffs))) @ exp_coeffs
+
+    return jnp.exp(labor_income[:, None] + income_shock_draws[None, :])
+
+
 def _calc_stochastic_income(
     state: jnp.ndarray,
     wage_shock: float,
@@ -97,3 +97,76 @@ def get_state_specific_feasible_choice_set(
         feasible_choice_set = np.arange(n_choices)
 
     return feasible_choice_set
+
+
+def get_state_specific_feasible_choice_mask(
+    state_space: np.ndarray, map_state_to_index: np.ndarray
+) -> np.ndarray:
+    """Select the feasible choices of all states at once.
+
+    This is the vectorized counterpart of
+    :func:`get_state_specific_feasible_choice_set`.
+
+    Args:
+        state_space (np.ndarray): 2d array of shape (n_states, n_state_variables + 1)
+            which serves as a collection of all possible states.
+        map_state_to_index (np.ndarray): Indexer array that maps states to indexes.
+
+    Returns:
+        np.ndarray: 2d boolean array of shape (n_states, n_choices), which is True if
+            a choice is feasible in a state.
+
+    """
+    n_choices = map_state_to_index.shape[1]  # lagged_choice is a state variable
+
+    # Once the agent choses retirement, she can only choose retirement thereafter.
+    # Hence, retirement is an absorbing state.
+    is_retired = state_space[:, [1]] == 1
+
+    return ~is_retired | (np.arange(n_choices) == 1)
+
+
+def get_next_period_state(state_choice_space: np.ndarray) -> np.ndarray:
+    """Get the next period's state variables of all state-choice combinations.
+
+    The period is incremented and the current choice becomes the lagged choice.
+
+    Args:
+        state_choice_space (np.ndarray): 2d array of shape
+            (n_feasible_state_choice_combs, n_state_and_exog_variables + 1)
+            containing all feasible state-choice combinations.
+
+    Returns:
+        np.ndarray: 2d array of shape (n_feasible_state_choice_combs, 2) containing
+            the next period and the lagged choice of each state-choice combination.
+
+    """
+    period = state_choice_space[:, 0]
+    choice = state_choice_space[:, -1]
+
+    return np.column_stack([period + 1, choice])
+
+
+def get_initial_states(options: Dict[str, int]) -> np.ndarray:
+    """Get the states the agents start in.
+
+    All agents start working in the first period, with any realization of the
+    exogenous processes.
+
+    Args:
+        options (dict): Options dictionary.
+
+    Returns:
+        np.ndarray: 2d array of shape (n_exog_processes, 3) containing the initial
+            states.
+
+    """
+    n_exog_process = options["n_exog_processes"]
+
+    return np.column_stack(
+        [
+            np.zeros(n_exog_process, dtype=np.int64),
+            np.zeros(n_exog_process, dtype=np.int64),
+            np.arange(n_exog_process),
+        ]
+    )
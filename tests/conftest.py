@@ -5,6 +5,27 @@ from pathlib import Path
 import pandas as pd
 import pytest
 import yaml
+from dcegm.solve import solve_dcegm
+from toy_models.consumption_retirement_model.budget_functions import budget_constraint
+from toy_models.consumption_retirement_model.exogenous_processes import (
+    get_transition_matrix_by_state,
+)
+from toy_models.consumption_retirement_model.final_period_solution import (
+    solve_final_period_scalar,
+)
+from toy_models.consumption_retirement_model.state_space_objects import (
+    create_state_space,
+)
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_state_specific_feasible_choice_set,
+)
+from toy_models.consumption_retirement_model.utility_functions import (
+    inverse_marginal_utility_crra,
+)
+from toy_models.consumption_retirement_model.utility_functions import (
+    marginal_utility_crra,
+)
+from toy_models.consumption_retirement_model.utility_functions import utility_func_crra
 
 # Obtain the test directory of the package.
 TEST_DIR = Path(__file__).parent
@@ -27,3 +48,30 @@ def load_example_model():
         return params, options
 
     return load_options_and_params
+
+
+@pytest.fixture()
+def model_functions():
+    return {
+        "utility_functions": {
+            "utility": utility_func_crra,
+            "inverse_marginal_utility": inverse_marginal_utility_crra,
+            "marginal_utility": marginal_utility_crra,
+        },
+        "budget_constraint": budget_constraint,
+        "final_period_solution": solve_final_period_scalar,
+        "state_space_functions": {
+            "create_state_space": create_state_space,
+            "get_state_specific_choice_set": get_state_specific_feasible_choice_set,
+        },
+        "transition_function": get_transition_matrix_by_state,
+    }
+
+
+@pytest.fixture()
+def solve_toy_model(model_functions):
+    def solve(params, options, **kwargs):
+        """Solve a model with the toy model functions, unless others are given."""
+        return solve_dcegm(params, options, **{**model_functions, **kwargs})
+
+    return solve
@@ -0,0 +1,62 @@
+"""The model solved by the benchmark scripts in this directory."""
+from pathlib import Path
+
+import pandas as pd
+import yaml
+from toy_models.consumption_retirement_model.budget_functions import budget_constraint
+from toy_models.consumption_retirement_model.exogenous_processes import (
+    get_transition_matrix_by_state,
+)
+from toy_models.consumption_retirement_model.final_period_solution import (
+    solve_final_period_scalar,
+)
+from toy_models.consumption_retirement_model.state_space_objects import (
+    create_state_space,
+)
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_state_specific_feasible_choice_set,
+)
+from toy_models.consumption_retirement_model.utility_functions import (
+    inverse_marginal_utility_crra,
+)
+from toy_models.consumption_retirement_model.utility_functions import (
+    marginal_utility_crra,
+)
+from toy_models.consumption_retirement_model.utility_functions import utility_func_crra
+
+RESOURCES_DIR = Path(__file__).parent.parent / "resources"
+
+MODEL_FUNCTIONS = {
+    "utility_functions": {
+        "utility": utility_func_crra,
+        "inverse_marginal_utility": inverse_marginal_utility_crra,
+        "marginal_utility": marginal_utility_crra,
+    },
+    "budget_constraint": budget_constraint,
+    "final_period_solution": solve_final_period_scalar,
+    "state_space_functions": {
+        "create_state_space": create_state_space,
+        "get_state_specific_choice_set": get_state_specific_feasible_choice_set,
+    },
+    "transition_function": get_transition_matrix_by_state,
+}
+
+
+def load_params_and_options(model):
+    """Load the params and options of a model from the test resources.
+
+    Args:
+        model (str): Name of the model, e.g. "retirement_taste_shocks".
+
+    Returns:
+        tuple:
+
+        - params (pd.DataFrame): Params DataFrame.
+        - options (dict): Options dictionary.
+
+    """
+    params = pd.read_csv(RESOURCES_DIR / f"{model}.csv", index_col=["category", "name"])
+    options = yaml.safe_load((RESOURCES_DIR / f"{model}.yaml").read_text())
+    options["n_exog_processes"] = 1
+
+    return params, options
@@ -0,0 +1,209 @@
+"""Benchmark solving the model in single instead of double precision.
+
+The speed gain is measured in solves per second after compilation. The accuracy
+cost is measured by the Euler equation errors of the solutions in both precisions.
+For each state-choice combination before the final period, the consumption policy
+is evaluated at the midpoints between the unconstrained points of the endogenous
+grid of the double precision solution, where the Euler equation does not hold by
+construction of the endogenous grid method. The consumption implied by the Euler
+equation,
+
+    u'(c) = beta * (1 + r) * E[sum_d' P(d' | M') * u'(c_d'(M'))],
+
+is computed from the next period's choice-specific policy and value functions of
+the same solution, where the choice probabilities P follow from the extreme value
+taste shocks. The error is the log10 of the absolute relative difference of the
+implied and the policy consumption, bounded below by the machine epsilon of double
+precision.
+
+Run as ``python tests/sandbox/benchmark_precision.py`` from the root of the
+repository.
+
+"""
+import time
+
+import numpy as np
+from benchmark_model import load_params_and_options
+from benchmark_model import MODEL_FUNCTIONS
+from dcegm.integration import quadrature_legendre
+from dcegm.pre_processing import convert_params_to_dict
+from dcegm.ragged_array import get_row
+from dcegm.solve import get_model_structure
+from dcegm.solve import solve_dcegm
+from jax.config import config
+
+config.update("jax_enable_x64", True)
+
+
+def benchmark_precision(model="retirement_taste_shocks", n_solves=10):
+    params, options = load_params_and_options(model)
+
+    solutions = {}
+    solves_per_second = {}
+    for precision in ("float64", "float32"):
+        options_precision = {**options, "precision": precision}
+
+        # Compile once, so that the timings measure the solves only.
+        solutions[precision] = solve_dcegm(params, options_precision, **MODEL_FUNCTIONS)
+
+        start = time.perf_counter()
+        for _ in range(n_solves):
+            solve_dcegm(params, options_precision, **MODEL_FUNCTIONS)
+        solves_per_second[precision] = n_solves / (time.perf_counter() - start)
+
+    state_choice_space = get_model_structure(
+        options, MODEL_FUNCTIONS["state_space_functions"]
+    )[0].state_choice_space
+    wealth_samples = _get_unconstrained_wealth(solutions["float64"])
+
+    result = {
+        "solves_per_second_float64": solves_per_second["float64"],
+        "solves_per_second_float32": solves_per_second["float32"],
+        "speedup": solves_per_second["float32"] / solves_per_second["float64"],
+    }
+    for precision, solution in solutions.items():
+        log10_errors = _log10_euler_errors(
+            solution,
+            wealth_samples,
+            state_choice_space,
+            params_dict=convert_params_to_dict(params),
+            options=options,
+        )
+        result[f"solution_bytes_{precision}"] = sum(a.data.nbytes for a in solution)
+        result[f"max_log10_euler_error_{precision}"] = np.max(log10_errors)
+        result[f"mean_log10_euler_error_{precision}"] = np.mean(log10_errors)
+
+    return result
+
+
+def _get_unconstrained_wealth(solution):
+    """Select wealth levels between the unconstrained points of the endogenous grid.
+
+    The first two points of each refined endogenous grid are the zero wealth point
+    and the kink of the credit constraint. Below the kink, everything is consumed.
+
+    """
+    endog_grid, _, _ = solution
+
+    wealth_samples = []
+    for idx in range(len(endog_grid.lengths)):
+        grid = get_row(endog_grid, idx).astype(np.float64)
+        wealth_samples.append((grid[2:-1] + grid[3:]) / 2)
+
+    return wealth_samples
+
+
+def _log10_euler_errors(
+    solution, wealth_samples, state_choice_space, params_dict, options
+):
+    utility = MODEL_FUNCTIONS["utility_functions"]["utility"]
+    marginal_utility = MODEL_FUNCTIONS["utility_functions"]["marginal_utility"]
+    inverse_marginal_utility = MODEL_FUNCTIONS["utility_functions"][
+        "inverse_marginal_utility"
+    ]
+    budget_constraint = MODEL_FUNCTIONS["budget_constraint"]
+
+    income_shock_draws, income_shock_weights = quadrature_legendre(
+        options["quadrature_points_stochastic"], params_dict["sigma"]
+    )
+    discount_factor = params_dict["beta"]
+    taste_shock_scale = params_dict["lambda"]
+
+    endog_grid, policy, value = (
+        [get_row(array, idx).astype(np.float64) for idx in range(len(array.lengths))]
+        for array in solution
+    )
+    idx_by_state_choice = {
+        tuple(state_choice): idx for idx, state_choice in enumerate(state_choice_space)
+    }
+
+    errors = []
+    for idx, state_choice in enumerate(state_choice_space):
+        period, _, exog_process, choice = state_choice
+        wealth = wealth_samples[idx]
+        if period == options["n_periods"] - 1 or wealth.size == 0:
+            continue
+
+        consumption = np.interp(wealth, endog_grid[idx], policy[idx])
+
+        # Next period's wealth of shape (n_quad_stochastic, n_wealth).
+        child_state = np.array([period + 1, choice, exog_process])
+        wealth_next = np.asarray(
+            budget_constraint(
+                child_state,
+                (wealth - consumption)[None, :],
+                income_shock_draws[:, None],
+                params_dict,
+                options,
+            )
+        )
+
+        idxs_child = [
+            idx_child
+            for (*state, _), idx_child in idx_by_state_choice.items()
+            if tuple(state) == tuple(child_state)
+        ]
+        values_next = []
+        marginal_utilities_next = []
+        for idx_child in idxs_child:
+            consumption_next = _interpolate_with_credit_constraint(
+                wealth_next, endog_grid[idx_child], policy[idx_child], wealth_next
+            )
+            value_constrained = (
+                np.asarray(
+                    utility(wealth_next, state_choice_space[idx_child, -1], params_dict)
+                )
+                + discount_factor * value[idx_child][0]
+            )
+            values_next.append(
+                _interpolate_with_credit_constraint(
+                    wealth_next,
+                    endog_grid[idx_child],
+                    value[idx_child],
+                    value_constrained,
+                )
+            )
+            marginal_utilities_next.append(
+                np.asarray(marginal_utility(consumption_next, params_dict))
+            )
+
+        values_next = np.stack(values_next) / taste_shock_scale
+        choice_probs = np.exp(values_next - values_next.max(axis=0))
+        choice_probs /= choice_probs.sum(axis=0)
+
+        expected_marginal_utility = income_shock_weights @ (
+            choice_probs * np.stack(marginal_utilities_next)
+        ).sum(axis=0)
+        consumption_implied = np.asarray(
+            inverse_marginal_utility(
+                discount_factor
+                * (1 + params_dict["interest_rate"])
+                * expected_marginal_utility,
+                params_dict,
+            )
+        )
+
+        errors.append(np.abs(consumption_implied / consumption - 1))
+
+    return np.log10(np.maximum(np.concatenate(errors), np.finfo(np.float64).eps))
+
+
+def _interpolate_with_credit_constraint(wealth, grid, values, values_constrained):
+    """Interpolate linearly with extrapolation above the grid.
+
+    Below the kink of the credit constraint, the closed-form values are returned.
+
+    """
+    is_constrained = wealth < grid[1]
+    ind_high = np.clip(np.searchsorted(grid, wealth), 1, grid.shape[0] - 1)
+    slope = (values[ind_high] - values[ind_high - 1]) / (
+        grid[ind_high] - grid[ind_high - 1]
+    )
+    interpolated = values[ind_high - 1] + slope * (wealth - grid[ind_high - 1])
+
+    return np.where(is_constrained, values_constrained, interpolated)
+
+
+if __name__ == "__main__":
+    for name, result in benchmark_precision().items():
+        print(f"{name}: {result:.4g}")
@@ -0,0 +1,53 @@
+"""Benchmark the throughput of solving a model for many parameter vectors.
+
+Run as ``python tests/sandbox/benchmark_solve_dcegm_batch.py`` from the root of the
+repository.
+
+"""
+import time
+
+import numpy as np
+from benchmark_model import load_params_and_options
+from benchmark_model import MODEL_FUNCTIONS
+from dcegm.solve import solve_dcegm
+from dcegm.solve import solve_dcegm_batch
+from jax.config import config
+
+config.update("jax_enable_x64", True)
+
+
+def benchmark_solve_dcegm_batch(model="retirement_taste_shocks", n_params=20):
+    params, options = load_params_and_options(model)
+    options_scan = {**options, "backwards_induction_scan": True}
+
+    params_list = []
+    for theta in np.linspace(1.5, 2.5, n_params):
+        params_single = params.copy()
+        params_single.loc[("utility_function", "theta"), "value"] = theta
+        params_list.append(params_single)
+
+    # Compile once, so that all timings measure the solves only.
+    solve_dcegm(params, options, **MODEL_FUNCTIONS)
+    solve_dcegm(params, options_scan, **MODEL_FUNCTIONS)
+    solve_dcegm_batch(params_list, options, **MODEL_FUNCTIONS)
+
+    solves_per_second = {}
+    for name, options_single in (
+        ("solve_dcegm", options),
+        ("solve_dcegm_scan", options_scan),
+    ):
+        start = time.perf_counter()
+        for params_single in params_list:
+            solve_dcegm(params_single, options_single, **MODEL_FUNCTIONS)
+        solves_per_second[name] = n_params / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    solve_dcegm_batch(params_list, options, **MODEL_FUNCTIONS)
+    solves_per_second["solve_dcegm_batch"] = n_params / (time.perf_counter() - start)
+
+    return solves_per_second
+
+
+if __name__ == "__main__":
+    for name, solves_per_second in benchmark_solve_dcegm_batch().items():
+        print(f"{name}: {solves_per_second:.2f} solves/sec")
@@ -1,8 +1,10 @@
 from itertools import product
 
+import jax
 import numpy as np
 import pytest
 from dcegm.pre_processing import convert_params_to_dict
+from numpy.testing import assert_allclose
 from numpy.testing import assert_array_almost_equal as aaae
 from scipy.special import roots_sh_legendre
 from scipy.stats import norm
@@ -10,6 +12,12 @@ from toy_models.consumption_retirement_model.budget_functions import (
     _calc_stochastic_income,
 )
 from toy_models.consumption_retirement_model.budget_functions import budget_constraint
+from toy_models.consumption_retirement_model.budget_functions import (
+    budget_constraint_with_income_table,
+)
+from toy_models.consumption_retirement_model.budget_functions import (
+    calc_income_table,
+)
 
 # ======================================================================================
 # next_period_wealth_matrices
@@ -68,3 +76,64 @@ def test_get_next_period_wealth_matrices(
     expected_budget = (1 + r) * savings_grid[random_saving_ind] + _income
 
     aaae(wealth_next_period, max(consump_floor, expected_budget))
+
+
+@pytest.mark.parametrize("model", model)
+def test_income_table(model, load_example_model):
+    params, options = load_example_model(f"{model}")
+    params_dict = convert_params_to_dict(params)
+
+    _quad_points, _ = roots_sh_legendre(options["quadrature_points_stochastic"])
+    quad_points = norm.ppf(_quad_points) * params_dict["sigma"]
+
+    income_table = calc_income_table(quad_points, params_dict, options)
+
+    assert income_table.shape == (options["n_periods"], quad_points.shape[0])
+    for period_, idx_shock in product(
+        range(options["n_periods"]), range(quad_points.shape[0])
+    ):
+        income = _calc_stochastic_income(
+            np.array([period_, 0]),
+            wage_shock=quad_points[idx_shock],
+            params_dict=params_dict,
+            options=options,
+        )
+
+        assert_allclose(income_table[period_, idx_shock], income, rtol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "model, period, labor_choice", product(model, period, labor_choice)
+)
+def test_budget_constraint_with_income_table(
+    model, period, labor_choice, load_example_model
+):
+    params, options = load_example_model(f"{model}")
+    params_dict = convert_params_to_dict(params)
+
+    # Any table is looked up as is, as the budget constraint must not compute it.
+    income_table_column = np.random.uniform(size=options["n_periods"])
+    state = np.array([period, labor_choice])
+    saving = 3.0
+
+    wealth_next_period = budget_constraint_with_income_table(
+        state,
+        saving=saving,
+        income_shock=0.0,
+        params_dict=params_dict,
+        options=options,
+        budget_table=income_table_column,
+    )
+    jaxpr = jax.make_jaxpr(
+        lambda budget_table: budget_constraint_with_income_table(
+            state, saving, 0.0, params_dict, options, budget_table=budget_table
+        )
+    )(income_table_column)
+
+    expected_budget = (1 - labor_choice) * income_table_column[period] + (
+        1 + params_dict["interest_rate"]
+    ) * saving
+    aaae(wealth_next_period, max(params_dict["consumption_floor"], expected_budget))
+    assert not {"exp", "pow", "integer_pow"} & {
+        eqn.primitive.name for eqn in jaxpr.jaxpr.eqns
+    }
@@ -1,16 +1,23 @@
 from functools import partial
 from pathlib import Path
 
+import jax
 import numpy as np
 import pytest
+from dcegm import fast_upper_envelope as fast_upper_envelope_module
 from dcegm.fast_upper_envelope import fast_upper_envelope
 from dcegm.fast_upper_envelope import fast_upper_envelope_wrapper
+from dcegm.fast_upper_envelope import fast_upper_envelope_wrapper_batch
+from dcegm.fast_upper_envelope import fast_upper_envelope_wrapper_jax
 from dcegm.pre_processing import calc_current_value
+from dcegm.ragged_array import get_row
 from numpy.testing import assert_array_almost_equal as aaae
 from toy_models.consumption_retirement_model.utility_functions import utility_func_crra
 from utils.fast_upper_envelope_org import fast_upper_envelope_wrapper_org
 from utils.upper_envelope_fedor import upper_envelope
 
+jax.config.update("jax_enable_x64", True)
+
 # Obtain the test directory of the package.
 TEST_DIR = Path(__file__).parent
 
@@ -162,3 +169,129 @@ def test_fast_upper_envelope_against_fedor(period, setup_model):
         endog_grid_got, value_expected[0], value_expected[1]
     )
     aaae(value_got, value_expected_interp)
+
+
+@pytest.mark.parametrize("buffer_size_factor", [1.1, 0.5])
+def test_fast_upper_envelope_wrapper_batch(
+    buffer_size_factor, setup_model, monkeypatch
+):
+    # Refined arrays that do not fit into the buffers are scanned again.
+    monkeypatch.setattr(
+        fast_upper_envelope_module, "REFINED_BUFFER_SIZE_FACTOR", buffer_size_factor
+    )
+
+    periods = [2, 4, 9, 10, 18]
+    policy_egm = np.stack(
+        [
+            np.genfromtxt(
+                TEST_RESOURCES_DIR / f"period_tests/pol{period}.csv", delimiter=","
+            )
+            for period in periods
+        ]
+    )
+    value_egm = np.stack(
+        [
+            np.genfromtxt(
+                TEST_RESOURCES_DIR / f"period_tests/val{period}.csv", delimiter=","
+            )
+            for period in periods
+        ]
+    )
+    choice, exogenous_savings_grid, compute_value = setup_model
+    exog_grid = np.append(0, exogenous_savings_grid)
+
+    n_rows = len(periods)
+
+    endog_grid_got, policy_got, value_got = fast_upper_envelope_wrapper_batch(
+        endog_grid=policy_egm[:, 0, 1:],
+        policy=policy_egm[:, 1, 1:],
+        value=value_egm[:, 1, 1:],
+        expected_value_zero_savings=value_egm[:, 1, 0],
+        choices=np.full(n_rows, choice),
+        exog_grid=exog_grid,
+        compute_value=compute_value,
+    )
+
+    assert endog_grid_got.data.shape == (endog_grid_got.lengths.sum(),)
+
+    for row in range(n_rows):
+        (
+            endog_grid_expected,
+            policy_expected,
+            value_expected,
+        ) = fast_upper_envelope_wrapper(
+            endog_grid=policy_egm[row, 0, 1:],
+            policy=policy_egm[row, 1, 1:],
+            value=value_egm[row, 1, 1:],
+            expected_value_zero_savings=value_egm[row, 1, 0],
+            exog_grid=exog_grid,
+            choice=choice,
+            compute_value=compute_value,
+        )
+        n_expected = np.sum(~np.isnan(endog_grid_expected))
+
+        assert endog_grid_got.lengths[row] == n_expected
+        aaae(get_row(endog_grid_got, row), endog_grid_expected[:n_expected])
+        aaae(get_row(policy_got, row), policy_expected[:n_expected])
+        aaae(get_row(value_got, row), value_expected[:n_expected])
+
+
+def test_fast_upper_envelope_wrapper_jax_vmap(setup_model):
+    periods = [2, 4, 9, 10, 18]
+    policy_egm = np.stack(
+        [
+            np.genfromtxt(
+                TEST_RESOURCES_DIR / f"period_tests/pol{period}.csv", delimiter=","
+            )
+            for period in periods
+        ]
+    )
+    value_egm = np.stack(
+        [
+            np.genfromtxt(
+                TEST_RESOURCES_DIR / f"period_tests/val{period}.csv", delimiter=","
+            )
+            for period in periods
+        ]
+    )
+    choice, exogenous_savings_grid, compute_value = setup_model
+    exog_grid = np.append(0, exogenous_savings_grid)
+    n_rows = len(periods)
+
+    endog_grid_got, policy_got, value_got, n_refined_got = jax.jit(
+        jax.vmap(
+            partial(
+                fast_upper_envelope_wrapper_jax,
+                exog_grid=exog_grid,
+                compute_value=compute_value,
+            )
+        )
+    )(
+        policy_egm[:, 0, 1:],
+        policy_egm[:, 1, 1:],
+        value_egm[:, 1, 1:],
+        value_egm[:, 1, 0],
+        np.full(n_rows, choice),
+    )
+
+    for row in range(n_rows):
+        (
+            endog_grid_expected,
+            policy_expected,
+            value_expected,
+        ) = fast_upper_envelope_wrapper(
+            endog_grid=policy_egm[row, 0, 1:],
+            policy=policy_egm[row, 1, 1:],
+            value=value_egm[row, 1, 1:],
+            expected_value_zero_savings=value_egm[row, 1, 0],
+            exog_grid=exog_grid,
+            choice=choice,
+            compute_value=compute_value,
+        )
+
+        n_expected = np.sum(~np.isnan(endog_grid_expected))
+        assert n_refined_got[row] == n_expected
+        aaae(endog_grid_got[row, :n_expected], endog_grid_expected[:n_expected])
+        aaae(policy_got[row, :n_expected], policy_expected[:n_expected])
+        aaae(value_got[row, :n_expected], value_expected[:n_expected])
+        assert np.all(np.isnan(endog_grid_got[row, n_expected:]))
@@ -1,13 +1,32 @@
 import pickle
+from functools import partial
 from pathlib import Path
 
+import jax.numpy as jnp
 import numpy as np
 import pytest
+from dcegm.ragged_array import get_padded_rows
+from dcegm.ragged_array import get_row
+from dcegm.solve import calculate_candidate_solutions_period
+from dcegm.solve import create_state_space_and_choice_objects
+from dcegm.solve import get_model_structure
+from dcegm.solve import interpolate_period
 from dcegm.solve import solve_dcegm
+from dcegm.solve import solve_dcegm_batch
+from dcegm.solve import solve_periods_scan
+from dcegm.solve import solve_scan_batch
 from dcegm.state_space import create_state_choice_space
+from dcegm.state_space import load_model_structure
+from dcegm.state_space import save_model_structure
 from jax.config import config
 from numpy.testing import assert_array_almost_equal as aaae
 from toy_models.consumption_retirement_model.budget_functions import budget_constraint
+from toy_models.consumption_retirement_model.budget_functions import (
+    budget_constraint_with_income_table,
+)
+from toy_models.consumption_retirement_model.budget_functions import (
+    calc_income_table,
+)
 from toy_models.consumption_retirement_model.exogenous_processes import (
     get_transition_matrix_by_state,
 )
@@ -17,6 +36,12 @@ from toy_models.consumption_retirement_model.final_period_solution import (
 from toy_models.consumption_retirement_model.state_space_objects import (
     create_state_space,
 )
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_initial_states,
+)
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_state_specific_feasible_choice_mask,
+)
 from toy_models.consumption_retirement_model.state_space_objects import (
     get_state_specific_feasible_choice_set,
 )
@@ -68,23 +93,21 @@ def state_space_functions():
         ("deaton", [0]),
     ],
 )
+@pytest.mark.parametrize("backwards_induction_scan", [False, True])
 def test_benchmark_models(
     model,
     choice_range,
+    backwards_induction_scan,
     utility_functions,
     state_space_functions,
     load_example_model,
 ):
     params, options = load_example_model(f"{model}")
     options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = backwards_induction_scan
 
     state_space, map_state_to_index = create_state_space(options)
-    (
-        state_choice_space,
-        sum_state_choices_to_state,
-        map_state_choice_to_state,
-        _,
-    ) = create_state_choice_space(
+    state_choice_space, _ = create_state_choice_space(
         state_space,
         map_state_to_index,
         state_space_functions["get_state_specific_choice_set"],
@@ -120,15 +143,11 @@ def test_benchmark_models(
                 policy_expec = policy_expected[period][1 - choice].T
                 value_expec = value_expected[period][1 - choice].T
 
-            endog_grid_got = endog_grid_calculated[state_choice_idx][
-                ~np.isnan(endog_grid_calculated[state_choice_idx]),
-            ]
+            endog_grid_got = get_row(endog_grid_calculated, state_choice_idx)
 
             aaae(endog_grid_got, policy_expec[0])
 
-            policy_got = policy_calculated[state_choice_idx][
-                ~np.isnan(policy_calculated[state_choice_idx]),
-            ]
+            policy_got = get_row(policy_calculated, state_choice_idx)
             aaae(policy_got, policy_expec[1])
 
             # In Fedor's upper envelope, there are two endogenous wealth grids;
@@ -141,8 +160,408 @@ def test_benchmark_models(
             value_expec_interp = np.interp(
                 policy_expec[0], value_expec[0], value_expec[1]
             )
-            value_got = value_calculated[state_choice_idx][
-                ~np.isnan(value_calculated[state_choice_idx])
-            ]
+            value_got = get_row(value_calculated, state_choice_idx)
 
             aaae(value_got, value_expec_interp)
+
+
+@pytest.mark.parametrize("backwards_induction_scan", [False, True])
+def test_period_solution_sink(
+    backwards_induction_scan, solve_toy_model, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = backwards_induction_scan
+
+    endog_grid_expected, policy_expected, value_expected = solve_toy_model(
+        params, options
+    )
+
+    periods_received = []
+
+    def period_solution_sink(period, idx_state_choices, endog_grid, policy, value):
+        periods_received.append(period)
+        aaae(endog_grid.lengths, endog_grid_expected.lengths[idx_state_choices])
+        for got, expected in zip(
+            (endog_grid, policy, value),
+            (endog_grid_expected, policy_expected, value_expected),
+        ):
+            aaae(
+                get_padded_rows(got, np.arange(len(idx_state_choices))),
+                get_padded_rows(expected, idx_state_choices),
+            )
+
+    out = solve_toy_model(params, options, period_solution_sink=period_solution_sink)
+
+    assert out is None
+    assert periods_received == list(range(options["n_periods"] - 1, -1, -1))
+
+
+def test_scan_with_too_small_upper_envelope_buffer(solve_toy_model, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = True
+    options["upper_envelope_buffer_size_factor"] = 0.5
+
+    periods_received = []
+
+    with pytest.raises(ValueError, match="period 23 has more points"):
+        solve_toy_model(
+            params,
+            options,
+            period_solution_sink=lambda period, *_: periods_received.append(period),
+        )
+
+    assert periods_received == []
+
+
+def test_solve_dcegm_batch(solve_toy_model, model_functions, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+
+    params_changed = params.copy()
+    params_changed.loc[("utility_function", "theta"), "value"] *= 1.5
+    params_list = [params, params_changed]
+
+    solutions = solve_dcegm_batch(params_list, options, **model_functions)
+
+    assert len(solutions) == len(params_list)
+    for params_single, solution in zip(params_list, solutions):
+        expected = solve_toy_model(params_single, options)
+        for got, exp in zip(solution, expected):
+            aaae(got.data, exp.data)
+            aaae(got.lengths, exp.lengths)
+
+    assert not np.allclose(solutions[0][2].data[:10], solutions[1][2].data[:10])
+
+    # Another batch of the same size reuses the compiled function.
+    cache_size = solve_scan_batch._cache_size()
+    solve_dcegm_batch(params_list[::-1], options, **model_functions)
+    assert solve_scan_batch._cache_size() == cache_size
+
+
+@pytest.mark.parametrize("backwards_induction_scan", [False, True])
+def test_solve_with_budget_table(
+    backwards_induction_scan, solve_toy_model, model_functions, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = backwards_induction_scan
+
+    n_calls = []
+
+    def calc_income_table_counted(*args, **kwargs):
+        n_calls.append(1)
+        return calc_income_table(*args, **kwargs)
+
+    got = solve_toy_model(
+        params,
+        options,
+        budget_constraint=budget_constraint_with_income_table,
+        budget_table_function=calc_income_table_counted,
+    )
+    (got_batch,) = solve_dcegm_batch(
+        [params],
+        options,
+        **{
+            **model_functions,
+            "budget_constraint": budget_constraint_with_income_table,
+            "budget_table_function": calc_income_table,
+        },
+    )
+    expected = solve_toy_model(params, options)
+
+    # The table is computed once per solve, not by the budget constraint.
+    assert len(n_calls) == 1
+    for solution in (got, got_batch):
+        for got_array, exp_array in zip(solution, expected):
+            aaae(got_array.data, exp_array.data)
+            aaae(got_array.lengths, exp_array.lengths)
+
+
+@pytest.mark.parametrize("backwards_induction_scan", [False, True])
+def test_solve_with_new_params_reuses_compiled_functions(
+    backwards_induction_scan, solve_toy_model, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = backwards_induction_scan
+
+    params_changed = params.copy()
+    params_changed.loc[("utility_function", "theta"), "value"] *= 1.5
+
+    jitted_functions = (
+        calculate_candidate_solutions_period,
+        interpolate_period,
+        solve_periods_scan,
+    )
+
+    solve_toy_model(params, options)
+    cache_sizes = [func._cache_size() for func in jitted_functions]
+    solve_toy_model(params_changed, options)
+
+    assert [func._cache_size() for func in jitted_functions] == cache_sizes
+
+
+def test_solve_with_state_specific_choice_mask(solve_toy_model, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+
+    expected = solve_toy_model(params, options)
+    got = solve_toy_model(
+        params,
+        options,
+        state_space_functions={
+            "create_state_space": create_state_space,
+            "get_state_specific_choice_mask": get_state_specific_feasible_choice_mask,
+        },
+    )
+
+    for got_array, expected_array in zip(got, expected):
+        aaae(got_array.data, expected_array.data)
+        aaae(got_array.lengths, expected_array.lengths)
+
+
+def test_solve_with_unreachable_states_dropped(
+    solve_toy_model, model_functions, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    state_space_functions = model_functions["state_space_functions"]
+    state_space_functions_pruned = {
+        **state_space_functions,
+        "get_initial_states": get_initial_states,
+    }
+
+    expected = solve_toy_model(params, options)
+    got = solve_toy_model(
+        params, options, state_space_functions=state_space_functions_pruned
+    )
+
+    state_choice_space = create_state_space_and_choice_objects(
+        options, state_space_functions
+    )[0].state_choice_space
+    state_choice_space_pruned = create_state_space_and_choice_objects(
+        options, state_space_functions_pruned
+    )[0].state_choice_space
+
+    # Being retired in the first period is not reachable.
+    is_retired_first_period = (state_choice_space[:, 0] == 0) & (
+        state_choice_space[:, 1] == 1
+    )
+    idx_kept = np.where(~is_retired_first_period)[0]
+    aaae(state_choice_space_pruned, state_choice_space[idx_kept])
+
+    for got_array, expected_array in zip(got, expected):
+        aaae(got_array.lengths, expected_array.lengths[idx_kept])
+        aaae(
+            get_padded_rows(got_array, np.arange(len(idx_kept))),
+            get_padded_rows(expected_array, idx_kept),
+        )
+
+    # The batched solve drops the same states.
+    (got_batch,) = solve_dcegm_batch(
+        [params],
+        options,
+        **{**model_functions, "state_space_functions": state_space_functions_pruned},
+    )
+    for got_array, got_batch_array in zip(got, got_batch):
+        aaae(got_batch_array.lengths, got_array.lengths)
+        aaae(got_batch_array.data, got_array.data)
+
+
+def test_get_model_structure_is_memoized(state_space_functions, load_example_model):
+    _, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+
+    model_structure = get_model_structure(options, state_space_functions)
+
+    assert get_model_structure(dict(options), dict(state_space_functions)) is (
+        model_structure
+    )
+    assert (
+        get_model_structure(
+            {**options, "n_periods": options["n_periods"] - 1}, state_space_functions
+        )
+        is not model_structure
+    )
+    assert not model_structure.state_space_structure.state_choice_space.flags.writeable
+
+
+def test_solve_with_saved_model_structure(
+    solve_toy_model, state_space_functions, load_example_model, tmp_path
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+
+    save_model_structure(
+        create_state_space_and_choice_objects(options, state_space_functions),
+        tmp_path,
+    )
+    model_structure = load_model_structure(tmp_path)
+    assert isinstance(model_structure.map_state_to_post_decision_child_nodes, np.memmap)
+
+    expected = solve_toy_model(params, options)
+    got = solve_toy_model(params, options, model_structure=model_structure)
+
+    for got_array, expected_array in zip(got, expected):
+        aaae(got_array.data, expected_array.data)
+        aaae(got_array.lengths, expected_array.lengths)
+
+
+def budget_constraint_with_transfer(state, saving, income_shock, params_dict, options):
+    """Budget constraint with a transfer up to options["last_transfer_period"]."""
+    transfer = jnp.where(
+        state[0] <= options["last_transfer_period"], params_dict["transfer"], 0
+    )
+    return transfer + budget_constraint(
+        state, saving, income_shock, params_dict=params_dict, options=options
+    )
+
+
+@pytest.mark.parametrize("last_affected_period", [5, 10, 23])
+def test_resume_from_previous_solution(
+    last_affected_period, solve_toy_model, load_example_model, monkeypatch
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["last_transfer_period"] = last_affected_period
+    params.loc[("assets", "transfer"), "value"] = 0.0
+
+    # The transfer only enters the budget constraint of the first periods.
+    params_changed = params.copy()
+    params_changed.loc[("assets", "transfer"), "value"] = 2.0
+
+    solve_with_transfer = partial(
+        solve_toy_model, budget_constraint=budget_constraint_with_transfer
+    )
+    previous_solution = solve_with_transfer(params, options)
+    expected = solve_with_transfer(params_changed, options)
+
+    periods_solved = []
+
+    def calculate_candidate_solutions_period_tracked(*args, **kwargs):
+        periods_solved.append(np.asarray(args[2])[0, 0])
+        return calculate_candidate_solutions_period(*args, **kwargs)
+
+    monkeypatch.setattr(
+        "dcegm.solve.calculate_candidate_solutions_period",
+        calculate_candidate_solutions_period_tracked,
+    )
+    got = solve_with_transfer(
+        params_changed,
+        options,
+        previous_solution=previous_solution,
+        affected_periods=range(last_affected_period + 1),
+    )
+
+    assert periods_solved == list(range(last_affected_period, -1, -1))
+    assert not np.allclose(previous_solution[1].data, expected[1].data)
+    for got_array, expected_array in zip(got, expected):
+        aaae(got_array.data, expected_array.data)
+        aaae(got_array.lengths, expected_array.lengths)
+
+
+@pytest.mark.parametrize(
+    "affected_periods, match",
+    [
+        (None, "must be given with a previous solution"),
+        ([], "At least one period"),
+        ([-1, 1], "must be between 0 and 2"),
+        ([3], "must be between 0 and 2"),
+    ],
+)
+def test_resume_from_previous_solution_with_invalid_affected_periods(
+    affected_periods, match, solve_toy_model, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["n_periods"] = 3
+
+    previous_solution = solve_toy_model(params, options)
+
+    with pytest.raises(ValueError, match=match):
+        solve_toy_model(
+            params,
+            options,
+            previous_solution=previous_solution,
+            affected_periods=affected_periods,
+        )
+
+
+@pytest.mark.parametrize("backwards_induction_scan", [False, True])
+def test_solve_in_single_precision(
+    backwards_induction_scan, solve_toy_model, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = backwards_induction_scan
+
+    expected = solve_toy_model(params, options)
+    got = solve_toy_model(params, {**options, "precision": "float32"})
+
+    _, policy_expected, _ = expected
+    _, policy_got, _ = got
+    assert policy_got.data.dtype == np.float32
+    aaae(policy_got.lengths, policy_expected.lengths)
+    aaae(policy_got.data, policy_expected.data, decimal=3)
+
+
+def test_solve_with_unknown_precision(solve_toy_model, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["precision"] = "float16"
+
+    with pytest.raises(ValueError, match="Unknown precision"):
+        solve_toy_model(params, options)
+
+
+def test_solve_with_unhashable_option(solve_toy_model, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["income_table"] = np.ones(options["n_periods"])
+
+    with pytest.raises(TypeError, match=r"options\['income_table'\] is not hashable"):
+        solve_toy_model(params, options)
+
+
+@pytest.mark.parametrize(
+    "backwards_induction_scan, expected_stages",
+    [
+        (
+            False,
+            {
+                "resources",
+                "final_period",
+                "aggregate",
+                "euler_equation",
+                "upper_envelope",
+                "interpolate",
+            },
+        ),
+        (True, {"resources", "final_period", "aggregate", "solve_periods_scan"}),
+    ],
+)
+def test_solve_with_timings(
+    backwards_induction_scan, expected_stages, solve_toy_model, load_example_model
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["backwards_induction_scan"] = backwards_induction_scan
+
+    expected = solve_toy_model(params, options)
+    got, report = solve_toy_model(params, options, return_timings=True)
+
+    for ragged_got, ragged_expected in zip(got, expected):
+        aaae(ragged_got.lengths, ragged_expected.lengths)
+        aaae(ragged_got.data, ragged_expected.data)
+
+    assert list(report.columns) == ["period", "stage", "seconds"]
+    assert set(report["stage"]) == expected_stages
+    assert (report["seconds"] >= 0).all()
+    assert report["period"].max() == options["n_periods"] - 1
+    if not backwards_induction_scan:
+        assert set(report["period"]) == set(range(options["n_periods"]))
+        assert (
+            report.groupby("period").size().drop(options["n_periods"] - 1) == 4
+        ).all()
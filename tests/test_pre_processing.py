@@ -1,10 +1,12 @@
 from functools import partial
 from pathlib import Path
 
+import jax.numpy as jnp
 import numpy as np
 import pytest
 from dcegm.pre_processing import calc_current_value
 from dcegm.pre_processing import convert_params_to_dict
+from dcegm.pre_processing import create_transition_matrix
 from numpy.testing import assert_array_almost_equal as aaae
 from toy_models.consumption_retirement_model.utility_functions import (
     utiility_func_log_crra,
@@ -107,3 +109,19 @@ def test_missing_taste_shock_scale(
         ValueError, match="Taste shock scale must be provided in params."
     ):
         convert_params_to_dict(params_without_lambda)
+
+
+def test_create_transition_matrix():
+    state_space = np.array([[0, 0, 0], [0, 0, 1], [1, 1, 0], [1, 1, 1]])
+
+    def transition_vector_by_state(state):
+        prob_stay = 0.9 - 0.1 * state[0]
+        return jnp.where(
+            state[-1] == 0,
+            jnp.array([prob_stay, 1 - prob_stay]),
+            jnp.array([1 - prob_stay, prob_stay]),
+        )
+
+    got = create_transition_matrix(transition_vector_by_state, state_space)
+
+    aaae(got, [[0.9, 0.1], [0.1, 0.9], [0.8, 0.2], [0.2, 0.8]])
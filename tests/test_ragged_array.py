@@ -0,0 +1,56 @@
+import numpy as np
+from dcegm.ragged_array import concatenate_ragged_arrays
+from dcegm.ragged_array import create_ragged_array
+from dcegm.ragged_array import get_padded_rows
+from dcegm.ragged_array import get_row
+from dcegm.ragged_array import get_rows
+from numpy.testing import assert_array_equal as aae
+
+
+def test_ragged_array_round_trip():
+    lengths = np.array([3, 0, 1, 2])
+    padded = np.array(
+        [
+            [1.0, 2.0, 3.0],
+            [np.nan, np.nan, np.nan],
+            [4.0, np.nan, np.nan],
+            [5.0, 6.0, np.nan],
+        ]
+    )
+
+    ragged = create_ragged_array(padded, lengths)
+
+    aae(ragged.data, np.arange(1, 7))
+    aae(ragged.offsets, [0, 3, 3, 4])
+    aae(get_row(ragged, 3), [5.0, 6.0])
+    aae(get_row(ragged, 1), [])
+    aae(get_padded_rows(ragged, np.arange(4)), padded)
+    aae(get_padded_rows(ragged, np.array([3, 2])), [[5.0, 6.0], [4.0, np.nan]])
+    aae(
+        get_padded_rows(ragged, np.array([3]), n_cols=4),
+        [[5.0, 6.0, np.nan, np.nan]],
+    )
+
+
+def test_get_rows():
+    ragged = create_ragged_array(
+        np.array([[1.0, 2.0, 3.0], [4.0, 0.0, 0.0], [5.0, 6.0, 0.0]]),
+        np.array([3, 1, 2]),
+    )
+
+    rows = get_rows(ragged, np.array([2, 0]))
+
+    aae(rows.data, [5.0, 6.0, 1.0, 2.0, 3.0])
+    aae(rows.offsets, [0, 2])
+    aae(rows.lengths, [2, 3])
+
+
+def test_concatenate_ragged_arrays():
+    first = create_ragged_array(np.array([[1.0, 2.0]]), np.array([2]))
+    second = create_ragged_array(np.array([[3.0, 0.0], [4.0, 5.0]]), np.array([1, 2]))
+
+    ragged = concatenate_ragged_arrays([first, second])
+
+    aae(ragged.data, [1.0, 2.0, 3.0, 4.0, 5.0])
+    aae(ragged.offsets, [0, 2, 3])
+    aae(ragged.lengths, [2, 1, 2])
@@ -0,0 +1,168 @@
+import importlib
+import sys
+
+import numpy as np
+from dcegm.solution_cache import get_function_fingerprint
+from dcegm.solution_cache import get_solution_cache_key
+from dcegm.solution_cache import solve_dcegm_cached
+from jax.config import config
+from numpy.testing import assert_array_almost_equal as aaae
+from toy_models.consumption_retirement_model.utility_functions import (
+    marginal_utility_crra,
+)
+from toy_models.consumption_retirement_model.utility_functions import (
+    utiility_func_log_crra,
+)
+from toy_models.consumption_retirement_model.utility_functions import utility_func_crra
+
+config.update("jax_enable_x64", True)
+
+
+def test_solve_dcegm_cached(
+    solve_toy_model, model_functions, load_example_model, tmp_path, monkeypatch
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+
+    expected = solve_toy_model(params, options)
+    got_miss = solve_dcegm_cached(
+        params, options, **model_functions, cache_dir=tmp_path
+    )
+
+    def _fail(*args, **kwargs):  # noqa: U100
+        raise AssertionError("The model is solved despite a cached solution.")
+
+    monkeypatch.setattr("dcegm.solution_cache.solve_dcegm", _fail)
+    got_hit = solve_dcegm_cached(params, options, **model_functions, cache_dir=tmp_path)
+
+    for got in (got_miss, got_hit):
+        for got_array, expected_array in zip(got, expected):
+            assert isinstance(got_array.data, np.memmap)
+            aaae(got_array.data, expected_array.data)
+            aaae(got_array.lengths, expected_array.lengths)
+            aaae(got_array.offsets, expected_array.offsets)
+
+
+def test_solution_cache_key(model_functions, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    key = get_solution_cache_key(params, options, **model_functions)
+
+    assert get_solution_cache_key(params.copy(), dict(options), **model_functions) == (
+        key
+    )
+
+    params_changed = params.copy()
+    params_changed.loc[("utility_function", "theta"), "value"] *= 1.5
+    assert get_solution_cache_key(params_changed, options, **model_functions) != key
+
+    options_changed = {**options, "grid_points_wealth": 10}
+    assert get_solution_cache_key(params, options_changed, **model_functions) != key
+
+    model_functions["utility_functions"]["utility"] = utiility_func_log_crra
+    assert get_solution_cache_key(params, options, **model_functions) != key
+
+
+def test_solution_cache_key_with_array_option(model_functions, load_example_model):
+    params, options = load_example_model("retirement_taste_shocks")
+    # The string representation of both arrays is the same, as it is truncated.
+    grid = np.linspace(0, 1, 2000)
+    grid_changed = grid.copy()
+    grid_changed[1000] += 0.1
+    key = get_solution_cache_key(params, {**options, "grid": grid}, **model_functions)
+
+    assert str(grid) == str(grid_changed)
+    assert (
+        get_solution_cache_key(
+            params, {**options, "grid": grid.copy()}, **model_functions
+        )
+        == key
+    )
+    for grid_other in (grid_changed, grid.astype(np.float32), grid.reshape(2, -1)):
+        assert (
+            get_solution_cache_key(
+                params, {**options, "grid": grid_other}, **model_functions
+            )
+            != key
+        )
+
+
+def test_function_fingerprint_is_stable():
+    assert get_function_fingerprint(utility_func_crra) == get_function_fingerprint(
+        utility_func_crra
+    )
+    assert get_function_fingerprint(utility_func_crra) != get_function_fingerprint(
+        marginal_utility_crra
+    )
+
+
+def test_function_fingerprint_changes_with_helper_function(tmp_path, monkeypatch):
+    package_path = tmp_path / "fingerprinted_package"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    # Make sure the edited module is compiled from source when it is reloaded.
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+
+    fingerprints = []
+    for exponent in (2, 3):
+        (package_path / "budget.py").write_text(
+            "def budget(wealth):\n"
+            "    return _income(wealth) * SCALE\n"
+            "\n\n"
+            "def _income(wealth):\n"
+            f"    return wealth**{exponent}\n"
+            "\n\n"
+            "SCALE = 2\n"
+        )
+        module = importlib.import_module("fingerprinted_package.budget")
+        module = importlib.reload(module)
+        fingerprints.append(get_function_fingerprint(module.budget))
+
+        monkeypatch.setattr(module, "SCALE", 3)
+        fingerprints.append(get_function_fingerprint(module.budget))
+
+    assert len(set(fingerprints)) == len(fingerprints)
+
+
+def test_solution_cache_key_changes_with_version_and_precision(
+    model_functions, load_example_model, monkeypatch
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    key = get_solution_cache_key(params, options, **model_functions)
+
+    assert (
+        get_solution_cache_key(
+            params, {**options, "precision": "float32"}, **model_functions
+        )
+        != key
+    )
+
+    try:
+        config.update("jax_enable_x64", False)
+        assert get_solution_cache_key(params, options, **model_functions) != key
+    finally:
+        config.update("jax_enable_x64", True)
+
+    monkeypatch.setattr("dcegm.solution_cache._get_dcegm_version", lambda: "0.0.0")
+    assert get_solution_cache_key(params, options, **model_functions) != key
+
+
+def test_solution_cache_evicts_least_recently_used(
+    model_functions, load_example_model, tmp_path
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    options["n_periods"] = 5
+
+    params_changed = params.copy()
+    params_changed.loc[("utility_function", "theta"), "value"] *= 1.5
+
+    solve_dcegm_cached(params, options, **model_functions, cache_dir=tmp_path)
+    solve_dcegm_cached(
+        params_changed, options, **model_functions, cache_dir=tmp_path, max_cache_size=1
+    )
+
+    entries = [path.name for path in tmp_path.iterdir()]
+    assert entries == [
+        get_solution_cache_key(params_changed, options, **model_functions)
+    ]
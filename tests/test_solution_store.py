@@ -0,0 +1,81 @@
+import numpy as np
+from dcegm.ragged_array import get_padded_rows
+from dcegm.solution_store import get_params_hash
+from dcegm.solution_store import initialize_solution_store
+from dcegm.solution_store import load_period_solution
+from dcegm.solution_store import load_solution
+from dcegm.solution_store import load_solution_metadata
+from jax.config import config
+from numpy.testing import assert_array_almost_equal as aaae
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_initial_states,
+)
+
+config.update("jax_enable_x64", True)
+
+
+def test_solution_store(solve_toy_model, model_functions, load_example_model, tmp_path):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+
+    endog_grid_expected, policy_expected, value_expected = solve_toy_model(
+        params, options
+    )
+
+    sink = initialize_solution_store(
+        tmp_path, params, options, model_functions["state_space_functions"]
+    )
+    out = solve_toy_model(params, options, period_solution_sink=sink)
+    assert out is None
+
+    metadata = load_solution_metadata(tmp_path)
+    assert metadata["params_hash"] == get_params_hash(params)
+    assert metadata["options"] == options
+    assert metadata["state_choice_space"].shape[0] == len(endog_grid_expected.lengths)
+
+    period = options["n_periods"] // 2
+    idx_state_choices, endog_grid, policy, value = load_period_solution(
+        tmp_path, period
+    )
+    assert isinstance(value.data, np.memmap)
+    assert np.all(metadata["state_choice_space"][idx_state_choices, 0] == period)
+    aaae(
+        get_padded_rows(policy, np.arange(len(idx_state_choices))),
+        get_padded_rows(policy_expected, idx_state_choices),
+    )
+
+    for got, expected in zip(
+        load_solution(tmp_path), (endog_grid_expected, policy_expected, value_expected)
+    ):
+        aaae(got.data, expected.data)
+        aaae(got.offsets, expected.offsets)
+        aaae(got.lengths, expected.lengths)
+
+
+def test_solution_store_with_unreachable_states_dropped(
+    solve_toy_model, model_functions, load_example_model, tmp_path
+):
+    params, options = load_example_model("retirement_taste_shocks")
+    options["n_exog_processes"] = 1
+    model_functions["state_space_functions"]["get_initial_states"] = get_initial_states
+
+    sink = initialize_solution_store(
+        tmp_path, params, options, model_functions["state_space_functions"]
+    )
+    solve_toy_model(params, options, period_solution_sink=sink)
+    endog_grid_expected, _, _ = solve_toy_model(params, options)
+
+    metadata = load_solution_metadata(tmp_path)
+    endog_grid, _, _ = load_solution(tmp_path)
+    assert metadata["state_choice_space"].shape[0] == len(endog_grid_expected.lengths)
+    aaae(endog_grid.lengths, endog_grid_expected.lengths)
+    aaae(endog_grid.data, endog_grid_expected.data)
+
+
+def test_params_hash(load_example_model):
+    params, _ = load_example_model("retirement_taste_shocks")
+    params_changed = params.copy()
+    params_changed.iloc[0, params.columns.get_loc("value")] += 1
+
+    assert get_params_hash(params) == get_params_hash(params.copy())
+    assert get_params_hash(params) != get_params_hash(params_changed)
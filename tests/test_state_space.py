@@ -2,9 +2,26 @@ from itertools import product
 
 import numpy as np
 import pytest
+from dcegm.state_space import create_compact_state_indexer
+from dcegm.state_space import create_current_state_and_state_choice_objects
+from dcegm.state_space import create_state_choice_space
+from dcegm.state_space import create_state_choice_space_from_mask
+from dcegm.state_space import create_state_space_structure
+from dcegm.state_space import get_map_from_state_to_child_nodes
+from dcegm.state_space import get_smallest_int_dtype
+from dcegm.state_space import get_state_indices
+from dcegm.state_space import MISSING_STATE_INDEX
+from dcegm.state_space import prune_unreachable_states
+from numpy.testing import assert_array_equal as aae
 from toy_models.consumption_retirement_model.state_space_objects import (
     create_state_space,
 )
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_next_period_state,
+)
+from toy_models.consumption_retirement_model.state_space_objects import (
+    get_state_specific_feasible_choice_mask,
+)
 from toy_models.consumption_retirement_model.state_space_objects import (
     get_state_specific_feasible_choice_set,
 )
@@ -73,3 +90,319 @@ def test_state_choice_set(lagged_choice, n_periods, n_choices, n_exog_processes)
     )
 
     np.allclose(choice_set, np.arange(n_choices))
+
+
+TEST_CASES = list(product([2, 15], [1, 2, 5], [1, 3]))
+
+
+@pytest.mark.parametrize("n_periods, n_choices, n_exog_processes", TEST_CASES)
+def test_state_choice_space_from_mask(n_periods, n_choices, n_exog_processes):
+    state_space, state_indexer = expected_state_space_and_indexer(
+        n_periods, n_choices, n_exog_processes
+    )
+
+    expected = create_state_choice_space(
+        state_space, state_indexer, get_state_specific_feasible_choice_set
+    )
+    got = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+
+    for got_array, expected_array in zip(got, expected):
+        aae(got_array, expected_array)
+
+
+@pytest.mark.parametrize("n_periods, n_choices, n_exog_processes", TEST_CASES)
+def test_map_from_state_to_child_nodes(n_periods, n_choices, n_exog_processes):
+    state_space, state_indexer = expected_state_space_and_indexer(
+        n_periods, n_choices, n_exog_processes
+    )
+    state_choice_space, *_ = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+
+    got = get_map_from_state_to_child_nodes(
+        state_space, state_choice_space, state_indexer
+    )
+
+    # Within the next period, the child state with lagged choice c and exogenous
+    # process e has index c * n_exog_processes + e.
+    choices = state_choice_space[:, -1]
+    expected = choices[:, None] * n_exog_processes + np.arange(n_exog_processes)
+    is_last_period = state_choice_space[:, 0] == n_periods - 1
+    expected[is_last_period] = 0
+
+    aae(got, expected)
+
+
+@pytest.mark.parametrize("n_periods, n_choices, n_exog_processes", TEST_CASES)
+def test_current_state_and_state_choice_objects_are_period_blocks(
+    n_periods, n_choices, n_exog_processes
+):
+    state_space, state_indexer = expected_state_space_and_indexer(
+        n_periods, n_choices, n_exog_processes
+    )
+    (
+        state_choice_space,
+        map_state_choice_vec_to_parent_state,
+    ) = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+    state_space_structure = create_state_space_structure(
+        state_space, state_choice_space, map_state_choice_vec_to_parent_state
+    )
+
+    for period in range(n_periods):
+        (
+            idxs_state_choice_combs,
+            state_choice_combs,
+            idxs_parent_states,
+            n_states,
+        ) = create_current_state_and_state_choice_objects(period, state_space_structure)
+        idxs_states = np.where(state_space[:, 0] == period)[0]
+        expected_idxs = np.where(state_choice_space[:, 0] == period)[0]
+
+        aae(idxs_state_choice_combs, expected_idxs)
+        aae(state_choice_combs, state_choice_space[expected_idxs])
+        aae(
+            idxs_parent_states,
+            map_state_choice_vec_to_parent_state[expected_idxs] - idxs_states[0],
+        )
+        assert n_states == idxs_states.shape[0]
+        assert np.shares_memory(
+            state_choice_combs, state_space_structure.state_choice_space
+        )
+
+
+def test_state_choice_space_from_mask_wrong_shape():
+    state_space, state_indexer = expected_state_space_and_indexer(3, 2, 1)
+
+    with pytest.raises(ValueError, match="The choice mask must have shape"):
+        create_state_choice_space_from_mask(
+            state_space,
+            state_indexer,
+            lambda state_space, indexer: np.ones(state_space.shape[0], dtype=bool),
+        )
+
+
+@pytest.mark.parametrize("n_periods, n_choices, n_exog_processes", TEST_CASES)
+def test_map_from_state_to_child_nodes_with_next_period_state(
+    n_periods, n_choices, n_exog_processes
+):
+    state_space, state_indexer = expected_state_space_and_indexer(
+        n_periods, n_choices, n_exog_processes
+    )
+    state_choice_space, *_ = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+
+    got = get_map_from_state_to_child_nodes(
+        state_space,
+        state_choice_space,
+        state_indexer,
+        get_next_period_state=get_next_period_state,
+    )
+    expected = get_map_from_state_to_child_nodes(
+        state_space, state_choice_space, state_indexer
+    )
+
+    aae(got, expected)
+
+
+def test_map_from_state_to_child_nodes_with_experience():
+    n_periods, n_choices, n_exog_processes = 4, 2, 2
+
+    # States are period, lagged choice, experience and the exogenous process. Working
+    # (choice 0) adds a year of experience, which is at most the period.
+    state_indexer = np.full((n_periods, n_choices, n_periods, n_exog_processes), -1)
+    state_space = []
+    for period, lagged_choice, experience, exog_process in product(
+        range(n_periods), range(n_choices), range(n_periods), range(n_exog_processes)
+    ):
+        if experience <= period:
+            state_indexer[period, lagged_choice, experience, exog_process] = len(
+                state_space
+            )
+            state_space.append([period, lagged_choice, experience, exog_process])
+    state_space = np.array(state_space)
+
+    state_choice_space, *_ = create_state_choice_space_from_mask(
+        state_space,
+        state_indexer,
+        lambda state_space, indexer: np.ones((state_space.shape[0], n_choices), bool),
+    )
+
+    def get_next_period_state_with_experience(state_choice_space):
+        period, lagged_choice, experience, _, choice = state_choice_space.T
+        return np.column_stack([period + 1, choice, experience + (choice == 0)])
+
+    got = get_map_from_state_to_child_nodes(
+        state_space,
+        state_choice_space,
+        state_indexer,
+        get_next_period_state=get_next_period_state_with_experience,
+    )
+
+    for row, (period, _, experience, _, choice) in enumerate(state_choice_space):
+        if period == n_periods - 1:
+            aae(got[row], 0)
+        else:
+            idx_first_state_next_period = np.argmax(state_space[:, 0] == period + 1)
+            expected = (
+                state_indexer[period + 1, choice, experience + (choice == 0)]
+                - idx_first_state_next_period
+            )
+            aae(got[row], expected)
+
+
+def test_compact_state_indexer():
+    state_space = np.array([[0, 0, 0], [0, 1, 0], [1, 0, 1], [1, 1, 0], [2, 1, 1]])
+    state_space = state_space[[3, 0, 4, 1, 2]]
+    dense_indexer = np.full((3, 2, 2), -9999)
+    dense_indexer[tuple(state_space.T)] = np.arange(state_space.shape[0])
+
+    compact_indexer = create_compact_state_indexer(state_space)
+
+    assert compact_indexer.shape == dense_indexer.shape
+    all_states = np.array(list(product(range(3), range(2), range(2))))
+    aae(
+        get_state_indices(compact_indexer, all_states),
+        get_state_indices(dense_indexer, all_states),
+    )
+
+
+def test_state_space_objects_with_compact_state_indexer():
+    n_periods, n_choices, n_exog_processes = 5, 2, 3
+    state_space, dense_indexer = expected_state_space_and_indexer(
+        n_periods, n_choices, n_exog_processes
+    )
+    compact_indexer = create_compact_state_indexer(
+        state_space, shape=dense_indexer.shape
+    )
+
+    expected = create_state_choice_space(
+        state_space, dense_indexer, get_state_specific_feasible_choice_set
+    )
+    got = create_state_choice_space(
+        state_space, compact_indexer, get_state_specific_feasible_choice_set
+    )
+    for got_array, expected_array in zip(got, expected):
+        aae(got_array, expected_array)
+
+    aae(
+        get_map_from_state_to_child_nodes(state_space, got[0], compact_indexer),
+        get_map_from_state_to_child_nodes(state_space, got[0], dense_indexer),
+    )
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_prune_unreachable_states(compact):
+    n_periods, n_choices, n_exog_processes = 4, 2, 3
+    state_space, state_indexer = expected_state_space_and_indexer(
+        n_periods, n_choices, n_exog_processes
+    )
+    if compact:
+        state_indexer = create_compact_state_indexer(state_space)
+    (
+        state_choice_space,
+        map_state_choice_vec_to_parent_state,
+    ) = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+    child_nodes = get_map_from_state_to_child_nodes(
+        state_space, state_choice_space, state_indexer
+    )
+
+    # Agents start working with exogenous process 0 and never move to process 2.
+    initial_states = np.array([[0, 0, 0]])
+    transition_matrix = np.tile([0.5, 0.5, 0.0], (state_space.shape[0], 1))
+
+    (
+        state_space_pruned,
+        state_indexer_pruned,
+        state_choice_space_pruned,
+        map_state_choice_vec_to_parent_state_pruned,
+        child_nodes_pruned,
+    ) = prune_unreachable_states(
+        state_space,
+        state_choice_space,
+        map_state_choice_vec_to_parent_state,
+        child_nodes,
+        state_indexer,
+        initial_states,
+        transition_matrix,
+    )
+
+    is_reachable = (state_space[:, 0] > 0) & (state_space[:, 2] < 2)
+    is_reachable[0] = True
+    aae(state_space_pruned, state_space[is_reachable])
+    aae(
+        get_state_indices(state_indexer_pruned, state_space_pruned),
+        np.arange(state_space_pruned.shape[0]),
+    )
+    aae(
+        state_space_pruned[map_state_choice_vec_to_parent_state_pruned],
+        state_choice_space_pruned[:, :-1],
+    )
+
+    # Within the next period, the reachable child state with lagged choice c and
+    # exogenous process e has index c * 2 + e. Process 2 is reached with zero
+    # probability and assigned 0.
+    choices = state_choice_space_pruned[:, [-1]]
+    expected = np.column_stack([choices * 2, choices * 2 + 1, np.zeros_like(choices)])
+    expected[state_choice_space_pruned[:, 0] == n_periods - 1] = 0
+    aae(child_nodes_pruned, expected)
+
+
+def test_prune_unreachable_states_with_missing_initial_state():
+    state_space, state_indexer = expected_state_space_and_indexer(2, 2, 1)
+    (
+        state_choice_space,
+        map_state_choice_vec_to_parent_state,
+    ) = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+    child_nodes = get_map_from_state_to_child_nodes(
+        state_space, state_choice_space, state_indexer
+    )
+    state_indexer[0, 0, 0] = -9999
+
+    with pytest.raises(ValueError, match="initial state"):
+        prune_unreachable_states(
+            state_space,
+            state_choice_space,
+            map_state_choice_vec_to_parent_state,
+            child_nodes,
+            state_indexer,
+            np.array([[0, 0, 0]]),
+        )
+
+
+def test_state_space_structure_has_compact_dtypes():
+    state_space, state_indexer = expected_state_space_and_indexer(200, 2, 3)
+    (
+        state_choice_space,
+        map_state_choice_vec_to_parent_state,
+    ) = create_state_choice_space_from_mask(
+        state_space, state_indexer, get_state_specific_feasible_choice_mask
+    )
+
+    state_space_structure = create_state_space_structure(
+        state_space, state_choice_space, map_state_choice_vec_to_parent_state
+    )
+
+    assert state_space_structure.state_space.dtype == np.int16
+    assert state_space_structure.state_choice_space.dtype == np.int16
+    assert state_space_structure.map_state_choice_vec_to_parent_state.dtype == (
+        np.int32
+    )
+    assert state_space_structure.idxs_parent_states_period.dtype == np.int32
+    aae(state_space_structure.state_space, state_space)
+    aae(state_space_structure.state_choice_space, state_choice_space)
+
+
+def test_get_smallest_int_dtype():
+    assert get_smallest_int_dtype(np.array([-128, 127])) == np.int8
+    assert get_smallest_int_dtype(np.array([0, 128])) == np.int16
+    assert get_smallest_int_dtype(np.array([MISSING_STATE_INDEX, 5])) == np.int16
+    assert get_smallest_int_dtype(np.array([0, 2**40])) == np.int64
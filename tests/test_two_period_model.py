@@ -9,6 +9,7 @@ import jax.numpy as jnp
 import numpy as np
 import pandas as pd
 import pytest
+from dcegm.ragged_array import get_padded_rows
 from dcegm.solve import solve_dcegm
 from dcegm.state_space import create_state_choice_space
 from numpy.testing import assert_allclose
@@ -188,8 +189,8 @@ def input_data():
     out = {}
     out["params"] = params
     out["options"] = options
-    out["endog_grid"] = endog_grid
-    out["policy"] = policy
+    out["endog_grid"] = get_padded_rows(endog_grid, np.arange(len(endog_grid.lengths)))
+    out["policy"] = get_padded_rows(policy, np.arange(len(policy.lengths)))
     return out
 
 
@@ -211,9 +212,7 @@ def test_two_period(input_data, wealth_idx, state_idx):
     state_space, map_state_to_index = create_state_space(input_data["options"])
     (
         state_choice_space,
-        _map_state_choice_vec_to_parent_state,
-        reshape_state_choice_vec_to_mat,
-        _transform_between_state_and_state_choice_space,
+        map_state_choice_vec_to_parent_state,
     ) = create_state_choice_space(
         state_space,
         map_state_to_index,
@@ -221,7 +220,9 @@ def test_two_period(input_data, wealth_idx, state_idx):
     )
     initial_cond = {}
     state = state_space[state_idx, :]
-    idxs_state_choice_combs = reshape_state_choice_vec_to_mat[state_idx]
+    idxs_state_choice_combs = np.where(
+        map_state_choice_vec_to_parent_state == state_idx
+    )[0]
     initial_cond["health"] = state[-1]
 
     for idx_state_choice in idxs_state_choice_combs: